@@ -0,0 +1 @@
+"""Офлайн-бенчмарки и инструменты оценки компонентов VoiceToNights."""
@@ -0,0 +1,57 @@
+"""Общие утилиты бенчмарков: чтение WAV и поиск корпуса."""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+
+def load_wav(path: Path | str) -> tuple[np.ndarray, int]:
+    """
+    Читает PCM16 WAV и сводит его в моно.
+
+    Args:
+        path: Путь к WAV-файлу
+
+    Returns:
+        Отсчёты int16 и частота дискретизации
+    """
+    with contextlib.closing(wave.open(str(path), "rb")) as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path}: поддерживаются только 16-битные WAV.")
+        channels = wav_file.getnchannels()
+        sample_rate = wav_file.getframerate()
+        data = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return data, sample_rate
+
+
+def collect_wavs(paths: list[str]) -> list[Path]:
+    """Раскрывает список файлов и каталогов в отсортированный список WAV-файлов."""
+    result: list[Path] = []
+    for item in paths:
+        path = Path(item)
+        if path.is_dir():
+            result.extend(sorted(path.rglob("*.wav")))
+        elif path.exists():
+            result.append(path)
+        else:
+            raise FileNotFoundError(f"Не найден файл или каталог: {path}")
+    return result
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковый объём резидентной памяти процесса, МБ (None, если платформа не сообщает)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS — байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
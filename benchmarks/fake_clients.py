@@ -0,0 +1,212 @@
+"""
+Нагрузочный прогон сетевого режима: несколько клиентов одновременно
+проигрывают WAV-записи в сервер реплик (src/net_server.py).
+
+    python main.py --serve 127.0.0.1:8765
+    python -m benchmarks.fake_clients data/corpus --url http://127.0.0.1:8765 --clients 4
+
+Каждый клиент — отдельная «комната» со своим client id. Печатаются
+перцентили времени до транскрипта, до первого аудио и до конца ответа
+по всем клиентам и по каждому отдельно. --slow-client добавляет клиента,
+который читает ответ с задержкой, чтобы проверить, что он не тормозит остальных.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import time
+import wave
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import collect_wavs, load_wav
+from src.tracing import percentile
+
+
+@dataclass
+class ClientTurn:
+    """Замеры одной реплики с точки зрения клиента, секунды."""
+
+    client: str
+    file: str
+    transcript_seconds: float
+    first_audio_seconds: float | None
+    total_seconds: float
+    sentences: int
+    audio_seconds: float  # Длительность полученного аудио
+    transcript: str
+    error: str | None = None
+
+
+def wav_bytes(path: Path) -> bytes:
+    """Переупаковывает запись в моно PCM16 WAV (формат тела запроса)."""
+    samples, sample_rate = load_wav(path)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+async def send_turn(
+    http: httpx.AsyncClient, url: str, client: str, path: Path, body: bytes, read_delay: float = 0.0
+) -> ClientTurn:
+    """Отправляет одну фразу и читает поток событий ответа."""
+    started = time.perf_counter()
+    transcript_at = first_audio_at = None
+    transcript = ""
+    sentences = 0
+    audio_seconds = 0.0
+    error = None
+    async with http.stream(
+        "POST", f"{url}/v1/turn", params={"client": client}, content=body
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            error = f"HTTP {response.status_code}: {response.text}"
+        else:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                now = time.perf_counter()
+                if event["event"] == "transcript":
+                    transcript_at, transcript = now, event["text"]
+                elif event["event"] == "audio":
+                    first_audio_at = first_audio_at or now
+                    sentences += 1
+                    # base64 PCM16: 4 символа на 3 байта, 2 байта на отсчёт
+                    samples = len(event["pcm16"]) * 3 // 4 // 2
+                    audio_seconds += samples / event["sample_rate"]
+                    if read_delay:
+                        await asyncio.sleep(read_delay)
+                elif event["event"] == "error":
+                    error = event["message"]
+    finished = time.perf_counter()
+    return ClientTurn(
+        client=client,
+        file=path.name,
+        transcript_seconds=(transcript_at or finished) - started,
+        first_audio_seconds=(first_audio_at - started) if first_audio_at else None,
+        total_seconds=finished - started,
+        sentences=sentences,
+        audio_seconds=audio_seconds,
+        transcript=transcript,
+        error=error,
+    )
+
+
+async def run_client(
+    url: str,
+    client: str,
+    files: list[Path],
+    repeat: int,
+    read_delay: float = 0.0,
+    timeout: float = 120.0,
+) -> list[ClientTurn]:
+    """Клиент-комната: последовательно проигрывает записи корпуса."""
+    bodies = {path: wav_bytes(path) for path in files}
+    results = []
+    async with httpx.AsyncClient(timeout=timeout) as http:
+        for _ in range(repeat):
+            for path in files:
+                results.append(await send_turn(http, url, client, path, bodies[path], read_delay))
+    return results
+
+
+async def run_clients(
+    url: str, files: list[Path], clients: int, repeat: int = 1, slow_client: float = 0.0
+) -> list[ClientTurn]:
+    """Запускает клиентов одновременно (и, при slow_client > 0, одного медленного)."""
+    jobs = [run_client(url, f"room-{idx + 1}", files, repeat) for idx in range(clients)]
+    if slow_client > 0:
+        jobs.append(run_client(url, "room-slow", files, repeat, read_delay=slow_client))
+    results: list[ClientTurn] = []
+    for client_results in await asyncio.gather(*jobs):
+        results.extend(client_results)
+    return results
+
+
+def build_report(results: list[ClientTurn], wall_seconds: float) -> dict:
+    """Перцентили по всем клиентам и по каждому клиенту."""
+
+    def stats(turns: list[ClientTurn]) -> dict:
+        ok = [t for t in turns if t.error is None]
+        first_audio = [t.first_audio_seconds * 1000 for t in ok if t.first_audio_seconds]
+        return {
+            "turns": len(turns),
+            "errors": len(turns) - len(ok),
+            "transcript_p50_ms": percentile([t.transcript_seconds * 1000 for t in ok], 50),
+            "first_audio_p50_ms": percentile(first_audio, 50),
+            "first_audio_p95_ms": percentile(first_audio, 95),
+            "total_p50_ms": percentile([t.total_seconds * 1000 for t in ok], 50),
+            "total_p95_ms": percentile([t.total_seconds * 1000 for t in ok], 95),
+        }
+
+    clients = sorted({t.client for t in results})
+    return {
+        "wall_seconds": wall_seconds,
+        "turns_per_minute": len(results) / wall_seconds * 60 if wall_seconds else 0.0,
+        "all": stats(results),
+        "clients": {c: stats([t for t in results if t.client == c]) for c in clients},
+    }
+
+
+def print_report(report: dict) -> None:
+    """Печатает таблицу по клиентам."""
+    print(
+        f"[Clients] {report['all']['turns']} реплик за {report['wall_seconds']:.1f} с, "
+        f"{report['turns_per_minute']:.1f} реплик/мин, ошибок: {report['all']['errors']}"
+    )
+    header = (
+        f"{'клиент':<12} {'реплик':>6} {'STT p50':>9} {'аудио p50':>10} "
+        f"{'аудио p95':>10} {'всего p50':>10} {'всего p95':>10}"
+    )
+    print(header)
+    rows = {**report["clients"], "все": report["all"]}
+    for client, row in rows.items():
+        print(
+            f"{client:<12} {row['turns']:>6} {row['transcript_p50_ms']:>9.0f} "
+            f"{row['first_audio_p50_ms']:>10.0f} {row['first_audio_p95_ms']:>10.0f} "
+            f"{row['total_p50_ms']:>10.0f} {row['total_p95_ms']:>10.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Фейковые клиенты сетевого режима")
+    parser.add_argument("corpus", nargs="+", help="WAV-файлы или каталоги с ними")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--clients", type=int, default=4, help="Число одновременных клиентов")
+    parser.add_argument("--repeat", type=int, default=1, help="Сколько раз прогнать корпус")
+    parser.add_argument(
+        "--slow-client", type=float, default=0.0, help="Задержка чтения медленного клиента, с"
+    )
+    parser.add_argument("--save", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    files = collect_wavs(args.corpus)
+    if not files:
+        parser.error("В корпусе нет WAV-файлов.")
+
+    started = time.perf_counter()
+    results = asyncio.run(
+        run_clients(args.url, files, args.clients, args.repeat, args.slow_client)
+    )
+    report = build_report(results, time.perf_counter() - started)
+    print_report(report)
+    if args.save:
+        report["turns_detail"] = [asdict(r) for r in results]
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Clients] Отчёт сохранён в {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Локальная заглушка HTTP API Ollama для бенчмарков и тестов.
+
+Имитирует потоковый /api/chat (NDJSON, как настоящий сервер) с настраиваемой
+задержкой первого токена и скоростью генерации, чтобы конвейер можно было
+измерять, а тесты — запускать без модели и GPU. Учитывает num_predict и
+stop из options и умеет отвечать ошибкой 503 (проверка повторов клиента).
+Запуск отдельным процессом:
+
+    python -m benchmarks.ollama_stub --port 11434 --tps 30 --ttft 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Конечно, сейчас расскажу. Сегодня хороший день для прогулки, на улице тепло. "
+    "Если понадобится что-то ещё, просто скажите мне об этом."
+)
+
+
+def split_tokens(text: str) -> list[str]:
+    """Грубо режет текст на «токены»: слова вместе с предшествующими пробелами."""
+    return re.findall(r"\s*\S+", text)
+
+
+class OllamaStub:
+    """HTTP-сервер, отвечающий как Ollama, с предсказуемой скоростью генерации."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens_per_second: float = 30.0,
+        first_token_delay: float = 0.2,
+        reply: str = DEFAULT_REPLY,
+    ):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — выбрать свободный)
+            tokens_per_second: Скорость выдачи токенов
+            first_token_delay: Задержка перед первым токеном (имитация prompt eval), с
+            reply: Текст ответа на любой запрос
+        """
+        self.tokens_per_second = tokens_per_second
+        self.first_token_delay = first_token_delay
+        self.reply = reply
+        self.requests = 0
+        self.last_request: dict = {}
+        # Сколько следующих запросов получат 503, как от перегруженного сервера
+        self.failures = 0
+        # Сообщения последнего запроса вместе с ответом: имитация кэша промпта Ollama
+        self._cached_messages: list = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Адрес сервера в формате OLLAMA_HOST."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> OllamaStub:
+        """Запускает сервер в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="ollama-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def __enter__(self) -> OllamaStub:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002 - сигнатура базового класса
+                pass
+
+            def _send_json(self, payload: dict, status: int = 200) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                return json.loads(raw or b"{}")
+
+            def do_GET(self):  # noqa: N802 - имя метода задаёт http.server
+                if self.path == "/api/version":
+                    self._send_json({"version": "0.0.0-stub"})
+                elif self.path == "/api/tags":
+                    self._send_json({"models": []})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):  # noqa: N802
+                request = self._read_json()
+                stub.requests += 1
+                stub.last_request = request
+                if stub.failures > 0:
+                    stub.failures -= 1
+                    self._send_json({"error": "server busy"}, status=503)
+                elif self.path == "/api/chat":
+                    stub._serve_generation(self, request, chat=True)
+                elif self.path == "/api/generate":
+                    stub._serve_generation(self, request, chat=False)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+        return Handler
+
+    def _prompt_eval_count(self, prompt, reply: str, chat: bool) -> int:
+        """
+        Сколько «токенов» промпта вычисляется заново.
+
+        Как у Ollama с одним слотом кэша: общий префикс сообщений с прошлым
+        запросом (включая сгенерированный ответ) берётся из кэша, считается
+        только остальное.
+        """
+        if not chat or not isinstance(prompt, list):
+            return len(json.dumps(prompt or "")) // 4
+        shared = 0
+        for cached, message in zip(self._cached_messages, prompt):
+            if cached != message:
+                break
+            shared += 1
+        self._cached_messages = [*prompt, {"role": "assistant", "content": reply}]
+        return len(json.dumps(prompt[shared:], ensure_ascii=False)) // 4
+
+    def _serve_generation(self, handler: BaseHTTPRequestHandler, request: dict, chat: bool) -> None:
+        """Отвечает на /api/chat или /api/generate потоково либо одним JSON."""
+        model = request.get("model", "stub")
+        prompt = request.get("messages") if chat else request.get("prompt")
+        options = request.get("options") or {}
+        reply = self.reply
+        for stop in options.get("stop") or []:
+            reply = reply.split(stop, 1)[0]
+        tokens = split_tokens(reply) if prompt else []
+        num_predict = options.get("num_predict", -1)
+        if num_predict is not None and num_predict >= 0:
+            tokens = tokens[:num_predict]
+        stream = request.get("stream", True)
+        delay = self.first_token_delay if tokens else 0.0
+        started = time.perf_counter()
+        prompt_eval_count = self._prompt_eval_count(prompt, "".join(tokens), chat)
+
+        def chunk(content: str, done: bool) -> dict:
+            payload = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done,
+            }
+            if chat:
+                payload["message"] = {"role": "assistant", "content": content}
+            else:
+                payload["response"] = content
+            if done:
+                elapsed_ns = int((time.perf_counter() - started) * 1e9)
+                payload.update(
+                    done_reason="stop",
+                    total_duration=elapsed_ns,
+                    load_duration=0,
+                    prompt_eval_count=prompt_eval_count,
+                    prompt_eval_duration=int(delay * 1e9),
+                    eval_count=len(tokens),
+                    eval_duration=max(0, elapsed_ns - int(delay * 1e9)),
+                )
+            return payload
+
+        time.sleep(delay)
+
+        if not stream:
+            time.sleep(len(tokens) / self.tokens_per_second)
+            handler._send_json(chunk("".join(tokens), done=True))
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def write_line(payload: dict) -> None:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+            handler.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+            handler.wfile.flush()
+
+        try:
+            interval = 1.0 / self.tokens_per_second
+            for idx, token in enumerate(tokens):
+                if idx:
+                    time.sleep(interval)
+                write_line(chunk(token, done=False))
+            write_line(chunk("", done=True))
+            handler.wfile.write(b"0\r\n\r\n")
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент закрыл поток раньше времени — для заглушки это нормально
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заглушка HTTP API Ollama")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--tps", type=float, default=30.0, help="Токенов в секунду")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Задержка первого токена, с")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Текст ответа")
+    args = parser.parse_args()
+
+    stub = OllamaStub(args.host, args.port, args.tps, args.ttft, args.reply)
+    print(f"[Stub] Заглушка Ollama слушает {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Офлайн-бенчмарк полного конвейера на корпусе WAV-записей.
+
+Каждая запись проходит тот же путь, что и реплика с микрофона, но без
+микрофона и динамиков: выделение фразы VAD → SpeechToText → OllamaClient
+(потоково, по умолчанию через локальную заглушку Ollama) → синтез
+SileroTTS по предложениям. В конце печатаются пропускная способность,
+распределения задержек по этапам и пиковый RSS.
+
+Отчёт можно сохранить и использовать как эталон для регрессионной проверки
+при смене моделей или параметров (whisper_model, recorder_chunk и т.п.):
+
+    python -m benchmarks.pipeline data/corpus --save baseline.json
+    python -m benchmarks.pipeline data/corpus --whisper-model small --baseline baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmarks.common import collect_wavs, load_wav, peak_rss_mb
+from benchmarks.ollama_stub import OllamaStub
+from core.voice_recorder import RecorderConfig, pcm16_to_float32, segment_phrase
+from src.config import AppConfig
+from src.tracing import percentile
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Этапы, по которым считаются распределения и регрессии
+STAGES = ("stt", "llm_ttft", "llm_total", "tts_first_audio", "tts_total", "turn_total")
+
+
+@dataclass
+class TurnResult:
+    """Замеры одной реплики, секунды."""
+
+    file: str
+    audio_seconds: float
+    stt: float
+    llm_ttft: float
+    llm_total: float
+    tts_first_audio: float  # От запроса к LLM до готового аудио первого предложения
+    tts_total: float  # Суммарное время синтеза
+    turn_total: float
+    speech_seconds: float  # Длительность синтезированного аудио
+    transcript: str
+    answer: str
+
+
+def run_turn(path: Path, recorder_config: RecorderConfig, stt, llm, tts) -> TurnResult | None:
+    """Прогоняет одну запись через конвейер и возвращает замеры."""
+    from src.tts import SentenceSplitter
+
+    samples, sample_rate = load_wav(path)
+    recorder_config.sample_rate = sample_rate
+    phrase = segment_phrase(samples, recorder_config)
+    if phrase is None:
+        print(f"[Bench] {path.name}: VAD не нашёл речь, пропускаем")
+        return None
+    audio = pcm16_to_float32(phrase.tobytes(), sample_rate)
+
+    turn_start = time.perf_counter()
+    transcript = stt.transcribe(audio)
+    stt_done = time.perf_counter()
+
+    first_token = first_audio = None
+    tts_total = speech_seconds = 0.0
+    answer: list[str] = []
+
+    def tokens():
+        nonlocal first_token
+        for token in llm.ask_stream(transcript or "Привет", echo=False):
+            if first_token is None:
+                first_token = time.perf_counter()
+            answer.append(token)
+            yield token
+
+    def sentences():
+        splitter = SentenceSplitter()
+        for token in tokens():
+            yield from splitter.feed(token)
+        tail = splitter.flush()
+        if tail:
+            yield tail
+
+    for sentence in sentences():
+        started = time.perf_counter()
+        wave = tts._synthesize(sentence)
+        finished = time.perf_counter()
+        tts_total += finished - started
+        speech_seconds += wave.size / tts.sample_rate
+        if first_audio is None:
+            first_audio = finished
+    llm_done = time.perf_counter()
+
+    return TurnResult(
+        file=path.name,
+        audio_seconds=phrase.size / sample_rate,
+        stt=stt_done - turn_start,
+        llm_ttft=(first_token or llm_done) - stt_done,
+        # Генерация идёт параллельно синтезу, поэтому время LLM — до конца потока
+        llm_total=llm_done - stt_done,
+        tts_first_audio=(first_audio or llm_done) - stt_done,
+        tts_total=tts_total,
+        turn_total=time.perf_counter() - turn_start,
+        speech_seconds=speech_seconds,
+        transcript=transcript,
+        answer="".join(answer).strip(),
+    )
+
+
+def build_report(results: list[TurnResult], wall_seconds: float) -> dict:
+    """Сводит замеры в отчёт: пропускная способность, перцентили, RSS."""
+    stages = {}
+    for stage in STAGES:
+        values = [getattr(r, stage) * 1000 for r in results]
+        stages[stage] = {
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": max(values, default=0.0),
+        }
+    audio = sum(r.audio_seconds for r in results)
+    stt = sum(r.stt for r in results)
+    speech = sum(r.speech_seconds for r in results)
+    tts = sum(r.tts_total for r in results)
+    return {
+        "turns": len(results),
+        "wall_seconds": wall_seconds,
+        "turns_per_minute": len(results) / wall_seconds * 60 if wall_seconds else 0.0,
+        "stt_rtf": stt / audio if audio else 0.0,
+        "tts_rtf": tts / speech if speech else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages_ms": stages,
+    }
+
+
+def print_report(report: dict) -> None:
+    """Печатает отчёт в консоль."""
+    print(
+        f"[Bench] Реплик: {report['turns']}, {report['turns_per_minute']:.1f} реплик/мин, "
+        f"RTF STT {report['stt_rtf']:.2f}, RTF TTS {report['tts_rtf']:.2f}"
+    )
+    if report["peak_rss_mb"] is not None:
+        print(f"[Bench] Пиковый RSS: {report['peak_rss_mb']:.0f} МБ")
+    print(f"{'этап':<18} {'p50, мс':>9} {'p95, мс':>9} {'max, мс':>9}")
+    for stage, row in report["stages_ms"].items():
+        print(f"{stage:<18} {row['p50']:>9.1f} {row['p95']:>9.1f} {row['max']:>9.1f}")
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Сравнивает отчёт с эталоном: p50 этапов и пиковый RSS не должны вырасти больше tolerance."""
+    problems = []
+    for stage, row in report["stages_ms"].items():
+        base = baseline.get("stages_ms", {}).get(stage)
+        if base and base["p50"] > 0 and row["p50"] > base["p50"] * (1 + tolerance):
+            problems.append(f"{stage}: p50 {row['p50']:.1f} мс против {base['p50']:.1f} мс")
+    rss, base_rss = report.get("peak_rss_mb"), baseline.get("peak_rss_mb")
+    if rss and base_rss and rss > base_rss * (1 + tolerance):
+        problems.append(f"peak_rss: {rss:.0f} МБ против {base_rss:.0f} МБ")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк конвейера STT → LLM → TTS")
+    parser.add_argument("corpus", nargs="+", help="WAV-файлы или каталоги с ними")
+    parser.add_argument("--config", default=str(PROJECT_ROOT / "config.json"))
+    parser.add_argument("--whisper-model", help="Переопределить whisper_model")
+    parser.add_argument("--stt-backend", help="Переопределить stt_backend")
+    parser.add_argument("--recorder-chunk", type=int, help="Переопределить recorder_chunk")
+    parser.add_argument("--ollama-host", help="Настоящий сервер Ollama вместо заглушки")
+    parser.add_argument("--stub-tps", type=float, default=30.0, help="Токенов/с заглушки")
+    parser.add_argument("--stub-ttft", type=float, default=0.2, help="Задержка первого токена, с")
+    parser.add_argument("--repeat", type=int, default=1, help="Сколько раз прогнать корпус")
+    parser.add_argument("--save", help="Сохранить отчёт в JSON")
+    parser.add_argument("--baseline", help="JSON-отчёт эталона для проверки регрессий")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Допустимый рост p50/RSS")
+    args = parser.parse_args()
+
+    config = AppConfig.from_file(args.config)
+    if config.system_prompt is None:
+        config.system_prompt = AppConfig.default().system_prompt
+    files = collect_wavs(args.corpus)
+    if not files:
+        parser.error("В корпусе нет WAV-файлов.")
+
+    stub = None
+    ollama_host = args.ollama_host
+    if not ollama_host:
+        stub = OllamaStub(tokens_per_second=args.stub_tps, first_token_delay=args.stub_ttft).start()
+        ollama_host = stub.url
+
+    # Тяжёлые модули (torch, whisper) импортируются только после разбора аргументов
+    from src.llm import OllamaClient
+    from src.stt import SpeechToText
+    from src.tts import SileroTTS
+
+    recorder_config = RecorderConfig(
+        sample_rate=config.recorder_sample_rate or 16000,
+        chunk=args.recorder_chunk or config.recorder_chunk or 1024,
+        silence_threshold=config.recorder_silence_threshold or 900,
+        silence_duration=config.recorder_silence_duration or 1.2,
+        max_recording=config.recorder_max_recording or 20.0,
+    )
+    stt_backend = args.stt_backend or config.stt_backend or "whisper"
+    stt = SpeechToText(args.whisper_model or config.whisper_model or "base", backend=stt_backend)
+    stt.warmup()
+    llm = OllamaClient(
+        model=config.ollama_model or "stub",
+        system_prompt=config.system_prompt,
+        host=ollama_host,
+    )
+    # Без кэша: бенчмарк измеряет синтез, а не попадания в кэш
+    tts = SileroTTS(
+        speaker=config.tts_model or "kseniya", sample_rate=config.tts_sample_rate or 48000
+    )
+    tts.warmup()
+
+    results: list[TurnResult] = []
+    started = time.perf_counter()
+    try:
+        for _ in range(args.repeat):
+            for path in files:
+                result = run_turn(path, recorder_config, stt, llm, tts)
+                if result is not None:
+                    results.append(result)
+                    print(
+                        f"[Bench] {path.name}: «{result.transcript}» "
+                        f"за {result.turn_total:.2f} с"
+                    )
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    report = build_report(results, time.perf_counter() - started)
+    report["settings"] = {
+        "whisper_model": args.whisper_model or config.whisper_model,
+        "stt_backend": stt_backend,
+        "recorder_chunk": recorder_config.chunk,
+        "ollama": args.ollama_host or f"stub {args.stub_tps} tok/s, ttft {args.stub_ttft} s",
+    }
+    print_report(report)
+
+    if args.save:
+        report["turns_detail"] = [asdict(r) for r in results]
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Bench] Отчёт сохранён в {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = find_regressions(report, baseline, args.tolerance)
+        if problems:
+            print("[Bench] Регрессии относительно эталона:")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("[Bench] Регрессий относительно эталона нет.")
+
+
+if __name__ == "__main__":
+    main()
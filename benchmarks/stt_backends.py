@@ -0,0 +1,141 @@
+"""
+Сравнение движков STT на одном и том же аудио: real-time factor и память.
+
+Каждый движок измеряется в отдельном подпроцессе, чтобы пиковый RSS
+отражал только его модель, а не остатки предыдущего прогона:
+
+    python -m benchmarks.stt_backends data/corpus --model small
+    python -m benchmarks.stt_backends data/corpus --backends whisper whisper-int8 --save stt.json
+
+RTF — время распознавания, делённое на длительность аудио (меньше 1 — быстрее
+реального времени). Совпадение текста считается относительно первого движка.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import collect_wavs, load_wav, peak_rss_mb
+from core.voice_recorder import pcm16_to_float32
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure_backend(backend: str, model: str, files: list[Path], language: str) -> dict:
+    """Загружает движок и распознаёт все файлы; вызывается в подпроцессе."""
+    from src.stt import SpeechToText
+
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    stt = SpeechToText(model, backend=backend)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = peak_rss_mb()
+    stt.warmup(language)
+
+    audio_seconds = stt_seconds = 0.0
+    texts: dict[str, str] = {}
+    for path in files:
+        samples, sample_rate = load_wav(path)
+        audio = pcm16_to_float32(samples.tobytes(), sample_rate)
+        started = time.perf_counter()
+        texts[path.name] = stt.transcribe(audio, language=language)
+        stt_seconds += time.perf_counter() - started
+        audio_seconds += audio.size / 16000
+
+    return {
+        "backend": backend,
+        "model": model,
+        "load_seconds": load_seconds,
+        "audio_seconds": audio_seconds,
+        "stt_seconds": stt_seconds,
+        "rtf": stt_seconds / audio_seconds if audio_seconds else 0.0,
+        "model_rss_mb": (rss_loaded - rss_before) if rss_before and rss_loaded else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "texts": texts,
+    }
+
+
+def run_isolated(backend: str, model: str, corpus: list[str], language: str) -> dict:
+    """Запускает measure_backend в отдельном процессе и возвращает его результат."""
+    command = [
+        sys.executable, "-m", "benchmarks.stt_backends", *corpus,
+        "--model", model, "--language", language, "--single", backend,
+    ]
+    completed = subprocess.run(
+        command, cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Движок {backend} завершился с ошибкой:\n{completed.stderr}")
+    # Результат — последняя строка вывода, перед ней — логи загрузки модели
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def text_agreement(reference: dict[str, str], texts: dict[str, str]) -> float:
+    """Среднее посимвольное сходство распознанных текстов с эталонным движком."""
+    if not reference:
+        return 1.0
+    ratios = [
+        difflib.SequenceMatcher(None, text.lower(), texts.get(name, "").lower()).ratio()
+        for name, text in reference.items()
+    ]
+    return sum(ratios) / len(ratios)
+
+
+def print_report(results: list[dict]) -> None:
+    """Печатает таблицу сравнения движков."""
+    print(
+        f"{'движок':<14} {'загрузка, с':>11} {'RTF':>6} {'модель, МБ':>11} "
+        f"{'пик RSS, МБ':>12} {'совпадение':>11}"
+    )
+    for row in results:
+        model_rss = f"{row['model_rss_mb']:.0f}" if row["model_rss_mb"] is not None else "—"
+        peak = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "—"
+        print(
+            f"{row['backend']:<14} {row['load_seconds']:>11.1f} {row['rtf']:>6.2f} "
+            f"{model_rss:>11} {peak:>12} {row['agreement']:>10.0%}"
+        )
+
+
+def main() -> None:
+    from src.stt_backends import STT_BACKENDS
+
+    parser = argparse.ArgumentParser(description="Сравнение движков STT: RTF и память")
+    parser.add_argument("corpus", nargs="+", help="WAV-файлы или каталоги с ними")
+    parser.add_argument("--model", default="base", help="Модель Whisper")
+    parser.add_argument("--language", default="ru")
+    parser.add_argument("--backends", nargs="+", default=list(STT_BACKENDS))
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    files = collect_wavs(args.corpus)
+    if not files:
+        parser.error("В корпусе нет WAV-файлов.")
+
+    if args.single:
+        result = measure_backend(args.single, args.model, files, args.language)
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    results = []
+    for backend in args.backends:
+        print(f"[Bench] Движок {backend}, модель {args.model}, файлов: {len(files)}...")
+        results.append(run_isolated(backend, args.model, args.corpus, args.language))
+    for row in results:
+        row["agreement"] = text_agreement(results[0]["texts"], row["texts"])
+    print_report(results)
+
+    if args.save:
+        payload = json.dumps(results, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Bench] Результаты сохранены в {args.save}")
+
+
+if __name__ == "__main__":
+    main()
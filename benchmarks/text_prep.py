@@ -0,0 +1,121 @@
+"""
+Микробенчмарк подготовки текста к синтезу (src/text_prep.py) без моделей.
+
+    python -m benchmarks.text_prep
+    python -m benchmarks.text_prep --max-chars 100 --rounds 500 --save prep.json
+
+На синтетических ответах в стиле LLM (Markdown, числа, сокращения, длинные
+предложения) измеряется время подготовки одного предложения, пропускная
+способность и длины кусков, которые уйдут в синтез. Для сравнения прогоняется
+прежняя нарезка SileroTTS: импорт razdel при каждом вызове и регулярное
+выражение, без нормализации и без ограничения длины.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+
+from src.text_prep import TextPreparer, split_sentences
+from src.tracing import percentile
+
+ANSWERS = [
+    "## Погода на неделю\n"
+    "- **Понедельник**: +12°, ветер 5 км в час\n"
+    "- **Вторник**: дождь, до 8°\n"
+    "- Среда — облачно, т.е. без осадков\n",
+    "В 2024 году компания выросла на 12 млн пользователей, и это важно; однако рост "
+    "замедлился, потому что рынок насыщен, а конкуренты снизили цены, предложили "
+    "бесплатный пробный период и вложили в рекламу больше 1 500 000 руб., что заметно "
+    "сказалось на притоке новых клиентов в регионах.",
+    "Чтобы приготовить омлет, взбейте 2 яйца с 100 мл молока, посолите и вылейте на "
+    "разогретую сковороду. Готовьте 5-7 минут на среднем огне под крышкой.",
+    "Курс сейчас около $1 = 92,5 руб., а 3 месяца назад было 89,1. Подробнее: "
+    "[ЦБ](https://cbr.ru) 📈",
+    "Встреча назначена на 14:30 в переговорной № 3. Возьмите ноутбук, распечатки и т.д.",
+]
+
+
+def legacy_split(text: str) -> list[str]:
+    """Прежняя нарезка SileroTTS._split_sentences."""
+    try:
+        from razdel import sentenize
+
+        return [s.text.strip() for s in sentenize(text)]
+    except Exception:
+        text = re.sub(r"\s+", " ", text).strip()
+        parts = re.split(r"(?<=[\.\!\?…])\s+", text)
+        return [p.strip() for p in parts if p.strip()]
+
+
+def measure(func, items: list[str], rounds: int) -> tuple[list[float], list[str], int]:
+    """Время вызова func на элемент (мкс), результаты последнего прогона и объём, символов."""
+    latencies: list[float] = []
+    outputs: list[str] = []
+    chars = 0
+    for round_idx in range(rounds):
+        for item in items:
+            started = time.perf_counter()
+            result = func(item)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            chars += len(item)
+            if round_idx == rounds - 1:
+                outputs.extend(result)
+    return latencies, outputs, chars
+
+
+def summarize(latencies: list[float], chunks: list[str], chars: int) -> dict:
+    lengths = [len(chunk) for chunk in chunks]
+    total_seconds = sum(latencies) / 1e6
+    return {
+        "p50_us": percentile(latencies, 50),
+        "p95_us": percentile(latencies, 95),
+        "chars_per_second": chars / total_seconds if total_seconds else 0.0,
+        "chunks": len(chunks),
+        "chunk_max_chars": max(lengths, default=0),
+        "chunk_mean_chars": sum(lengths) / len(lengths) if lengths else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Скорость и качество нарезки текста для TTS")
+    parser.add_argument("--max-chars", type=int, default=150, help="Бюджет длины куска")
+    parser.add_argument("--rounds", type=int, default=200, help="Сколько раз прогнать ответы")
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    # Как в конвейере: ответ сначала режется на предложения, затем каждое готовится отдельно
+    sentences = [sentence for answer in ANSWERS for sentence in split_sentences(answer)]
+    preparer = TextPreparer(args.max_chars)
+    results = {
+        "legacy": summarize(*measure(legacy_split, ANSWERS, args.rounds)),
+        "text_prep": summarize(*measure(preparer.prepare, sentences, args.rounds)),
+    }
+
+    print(f"[Bench] Предложений: {len(sentences)}, бюджет куска: {preparer.max_chars} символов")
+    print(
+        f"{'нарезка':<10} {'p50, мкс':>9} {'p95, мкс':>9} {'символов/с':>12} "
+        f"{'кусков':>7} {'макс':>6} {'средн':>6}"
+    )
+    for name, row in results.items():
+        print(
+            f"{name:<10} {row['p50_us']:>9.1f} {row['p95_us']:>9.1f} "
+            f"{row['chars_per_second']:>12.0f} {row['chunks']:>7} "
+            f"{row['chunk_max_chars']:>6} {row['chunk_mean_chars']:>6.1f}"
+        )
+    print("legacy — на ответ целиком, text_prep — на предложение (нормализация и нарезка).")
+    print("[Bench] Куски после подготовки:")
+    for chunk in preparer.prepare("\n".join(ANSWERS)):
+        print(f"  {len(chunk):>4}  {chunk}")
+
+    if args.save:
+        payload = json.dumps(results, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Bench] Результаты сохранены в {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Влияние бюджета потоков CPU на задержки, когда Whisper и Silero работают одновременно.
+
+    python -m benchmarks.thread_budget data/corpus --model base
+    python -m benchmarks.thread_budget data/corpus --stt-threads 4 --tts-threads 2 --save t.json
+
+Для каждой конфигурации потоков измеряются задержки распознавания фраз корпуса
+и синтеза предложений по отдельности, а затем одновременно (как при потоковом
+STT во время ответа или в сетевом режиме). Параллельно работает поток-метроном,
+который просыпается каждые 10 мс, как обратный вызов звука: его опоздание
+показывает, сколько CPU остаётся записи и воспроизведению.
+
+Конфигурации:
+    all-cores — каждая модель берёт все ядра (без бюджета)
+    budget    — бюджет из аргументов или config.json
+    pinned    — тот же бюджет с привязкой этапов к ядрам (только Linux)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import collect_wavs, load_wav
+from core.voice_recorder import pcm16_to_float32
+from src.config import AppConfig
+from src.threads import ThreadBudget, available_cores
+from src.tracing import percentile
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+SENTENCES = [
+    "Сегодня в Москве облачно, днём до восемнадцати градусов.",
+    "Напоминаю, что встреча с командой начнётся в три часа.",
+    "Чтобы приготовить омлет, взбейте два яйца с молоком и посолите.",
+    "Поезд прибывает на второй путь через пятнадцать минут.",
+]
+
+TICK_SECONDS = 0.01
+
+
+def timed_loop(func, items: list, rounds: int, latencies: list[float]) -> None:
+    """Вызывает func для каждого элемента rounds раз и записывает задержки, мс."""
+    for _ in range(rounds):
+        for item in items:
+            started = time.perf_counter()
+            func(item)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+
+def audio_jitter(stop: threading.Event, budget: ThreadBudget, lateness: list[float]) -> None:
+    """Метроном с периодом TICK_SECONDS на ядрах звука; записывает опоздания, мс."""
+    budget.bind("audio")
+    deadline = time.perf_counter() + TICK_SECONDS
+    while not stop.is_set():
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        lateness.append(max(0.0, time.perf_counter() - deadline) * 1000)
+        deadline += TICK_SECONDS
+
+
+def measure(stt, tts, audios: list, rounds: int, budget: ThreadBudget) -> dict:
+    """Задержки STT и TTS по отдельности и одновременно при заданном бюджете."""
+    stt.threads = tts.threads = budget
+    stt_alone: list[float] = []
+    tts_alone: list[float] = []
+    timed_loop(stt.transcribe, audios, rounds, stt_alone)
+    timed_loop(tts._synthesize, SENTENCES, rounds, tts_alone)
+
+    stt_together: list[float] = []
+    tts_together: list[float] = []
+    lateness: list[float] = []
+    stop = threading.Event()
+    metronome = threading.Thread(target=audio_jitter, args=(stop, budget, lateness))
+    workers = [
+        threading.Thread(target=timed_loop, args=(stt.transcribe, audios, rounds, stt_together)),
+        threading.Thread(
+            target=timed_loop, args=(tts._synthesize, SENTENCES, rounds, tts_together)
+        ),
+    ]
+    metronome.start()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - started
+    stop.set()
+    metronome.join()
+
+    return {
+        "plan": budget.describe(),
+        "stt_alone_p50_ms": percentile(stt_alone, 50),
+        "stt_together_p50_ms": percentile(stt_together, 50),
+        "stt_together_p95_ms": percentile(stt_together, 95),
+        "tts_alone_p50_ms": percentile(tts_alone, 50),
+        "tts_together_p50_ms": percentile(tts_together, 50),
+        "tts_together_p95_ms": percentile(tts_together, 95),
+        "together_wall_seconds": wall,
+        "audio_late_p95_ms": percentile(lateness, 95),
+        "audio_late_max_ms": max(lateness, default=0.0),
+    }
+
+
+def print_report(results: dict[str, dict]) -> None:
+    """Печатает таблицу по конфигурациям."""
+    for name, row in results.items():
+        print(f"[Bench] {name}: {row['plan']}")
+    print(
+        f"{'конфигурация':<12} {'STT один':>9} {'STT вместе':>11} {'p95':>7} "
+        f"{'TTS один':>9} {'TTS вместе':>11} {'p95':>7} {'всего, с':>9} {'звук p95':>9}"
+    )
+    for name, row in results.items():
+        print(
+            f"{name:<12} {row['stt_alone_p50_ms']:>9.0f} {row['stt_together_p50_ms']:>11.0f} "
+            f"{row['stt_together_p95_ms']:>7.0f} {row['tts_alone_p50_ms']:>9.0f} "
+            f"{row['tts_together_p50_ms']:>11.0f} {row['tts_together_p95_ms']:>7.0f} "
+            f"{row['together_wall_seconds']:>9.1f} {row['audio_late_p95_ms']:>9.1f}"
+        )
+    print("Задержки — p50/p95 одного вызова, мс; «звук p95» — опоздание метронома 10 мс, мс.")
+
+
+def main() -> None:
+    from src.stt import SpeechToText
+    from src.tts import SileroTTS
+
+    config = AppConfig.from_file(PROJECT_ROOT / "config.json")
+    parser = argparse.ArgumentParser(description="Задержки STT и TTS при разных бюджетах потоков")
+    parser.add_argument("corpus", nargs="+", help="WAV-файлы или каталоги с ними")
+    parser.add_argument("--model", default=config.whisper_model or "base", help="Модель Whisper")
+    parser.add_argument("--speaker", default=config.tts_model or "kseniya")
+    parser.add_argument("--stt-threads", type=int, default=config.cpu_stt_threads)
+    parser.add_argument("--tts-threads", type=int, default=config.cpu_tts_threads)
+    parser.add_argument("--audio-cores", type=int, default=config.cpu_audio_cores)
+    parser.add_argument("--rounds", type=int, default=2, help="Сколько раз прогнать корпус")
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    files = collect_wavs(args.corpus)
+    if not files:
+        parser.error("В корпусе нет WAV-файлов.")
+    audios = []
+    for path in files:
+        samples, sample_rate = load_wav(path)
+        audios.append(pcm16_to_float32(samples.tobytes(), sample_rate))
+
+    # Кэш TTS не нужен: каждое предложение должно синтезироваться заново
+    stt = SpeechToText(args.model)
+    tts = SileroTTS(speaker=args.speaker, device="cpu")
+    stt.warmup()
+    tts.warmup()
+
+    cores = len(available_cores())
+    audio_cores = args.audio_cores if args.audio_cores is not None else 1
+    budgets = {
+        "all-cores": ThreadBudget(stt_threads=cores, tts_threads=cores, audio_cores=0),
+        "budget": ThreadBudget(args.stt_threads, args.tts_threads, audio_cores),
+        "pinned": ThreadBudget(args.stt_threads, args.tts_threads, audio_cores, pin=True),
+    }
+    if not budgets["pinned"].pin:
+        del budgets["pinned"]
+
+    results = {}
+    for name, budget in budgets.items():
+        print(f"[Bench] Конфигурация {name}, файлов: {len(files)}, повторов: {args.rounds}...")
+        results[name] = measure(stt, tts, audios, args.rounds, budget)
+    print_report(results)
+
+    if args.save:
+        payload = json.dumps(results, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Bench] Результаты сохранены в {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Сравнение синтеза Silero по одному куску и пакетами (src/tts_batch.py) на CPU.
+
+    python -m benchmarks.tts_batch
+    python -m benchmarks.tts_batch --rates 24000 48000 --batch-chars 300 600 --save batch.json
+
+Ответы из нескольких предложений готовятся так же, как в конвейере
+(SileroTTS.prepare), и синтезируются без кэша аудио: сначала каждый кусок
+отдельным вызовом apply_tts, затем через synthesize_many с пакетами по
+batch_chars символов. RTF — время синтеза, делённое на длительность
+полученного аудио (меньше — быстрее). «Разделено» — доля пакетов, которые
+удалось разрезать обратно по паузам; остальные синтезировались по одному.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+ANSWERS = [
+    "Фотосинтез — это процесс, при котором растения превращают свет в энергию. "
+    "В листьях есть хлорофилл, он поглощает солнечный свет. Из воды и углекислого газа "
+    "образуются глюкоза и кислород. Кислород растение выделяет в воздух. "
+    "Поэтому леса называют лёгкими планеты.",
+    "Чтобы приготовить омлет, взбейте два яйца с молоком. Посолите по вкусу. "
+    "Разогрейте сковороду с маслом. Вылейте смесь и накройте крышкой. "
+    "Готовьте пять минут на среднем огне.",
+    "Луна — единственный естественный спутник Земли. Она всегда повёрнута к нам одной "
+    "стороной. Расстояние до неё около трёхсот восьмидесяти тысяч километров. "
+    "Свет от Луны доходит до Земли чуть больше чем за секунду.",
+]
+
+
+def run_rate(sample_rate: int, batch_sizes: list[int], rounds: int) -> dict:
+    """Синтезирует ответы по одному куску и пакетами на одной частоте дискретизации."""
+    from src.tts import SileroTTS
+    from src.tts_batch import group_chunks
+
+    tts = SileroTTS(sample_rate=sample_rate, device="cpu", cache=None)
+    tts.warmup()
+    answers = [
+        [chunk for sentence in tts._split_sentences(answer) for chunk in tts.prepare(sentence)]
+        for answer in ANSWERS
+    ]
+    chars = sum(len(chunk) for chunks in answers for chunk in chunks)
+
+    def measure(synthesize) -> dict:
+        seconds = audio_seconds = 0.0
+        for _ in range(rounds):
+            for chunks in answers:
+                started = time.perf_counter()
+                audios = synthesize(chunks)
+                seconds += time.perf_counter() - started
+                audio_seconds += sum(audio.size for audio in audios) / sample_rate
+        return {
+            "seconds": seconds / rounds,
+            "rtf": seconds / audio_seconds if audio_seconds else 0.0,
+            "chars_per_second": chars * rounds / seconds if seconds else 0.0,
+        }
+
+    result = {"per_chunk": measure(lambda chunks: [tts._synthesize(c) for c in chunks])}
+    for batch_chars in batch_sizes:
+        tts.batch_chars = batch_chars
+        row = measure(tts.synthesize_many)
+        groups = [
+            [chunks[idx] for idx in group]
+            for chunks in answers
+            for group in group_chunks(chunks, batch_chars)
+            if len(group) > 1
+        ]
+        split = sum(tts._synthesize_batch(group) is not None for group in groups)
+        row["calls"] = sum(len(group_chunks(chunks, batch_chars)) for chunks in answers)
+        row["split_ratio"] = split / len(groups) if groups else 1.0
+        row["speedup"] = result["per_chunk"]["seconds"] / row["seconds"] if row["seconds"] else 0.0
+        result[f"batch_{batch_chars}"] = row
+    result["per_chunk"]["calls"] = sum(len(chunks) for chunks in answers)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Синтез Silero по одному куску и пакетами")
+    parser.add_argument("--rates", type=int, nargs="+", default=[24000, 48000])
+    parser.add_argument("--batch-chars", type=int, nargs="+", default=[300, 600])
+    parser.add_argument("--rounds", type=int, default=3, help="Сколько раз прогнать ответы")
+    parser.add_argument("--threads", type=int, help="Потоков PyTorch (по умолчанию — все ядра)")
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+
+        torch.set_num_threads(args.threads)
+
+    results = {}
+    for rate in args.rates:
+        rows = run_rate(rate, args.batch_chars, args.rounds)
+        results[str(rate)] = rows
+        print(f"[Bench] {rate} Гц")
+        print(
+            f"{'режим':<12} {'вызовов':>8} {'с/прогон':>9} {'RTF':>6} "
+            f"{'символов/с':>11} {'ускорение':>10} {'разделено':>10}"
+        )
+        for name, row in rows.items():
+            speedup = f"{row['speedup']:.2f}x" if "speedup" in row else "—"
+            split = f"{row['split_ratio']:.0%}" if "split_ratio" in row else "—"
+            print(
+                f"{name:<12} {row['calls']:>8} {row['seconds']:>9.2f} {row['rtf']:>6.3f} "
+                f"{row['chars_per_second']:>11.0f} {speedup:>10} {split:>10}"
+            )
+
+    if args.save:
+        payload = json.dumps(results, ensure_ascii=False, indent=2)
+        Path(args.save).write_text(payload, encoding="utf-8")
+        print(f"[Bench] Результаты сохранены в {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Офлайн-оценка VAD на WAV-файлах.
+
+Прогоняет записи через детекторы из core.vad порциями того же размера, что
+и микрофон (recorder_chunk), и сообщает скорость принятия решения на кадр,
+долю ложных срабатываний на записях без речи и срабатывания на речи.
+
+Пример:
+    python -m benchmarks.vad_eval --noise data/noise --speech data/speech --vad adaptive energy
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.common import collect_wavs, load_wav
+from core.vad import VAD_REGISTRY, create_vad
+
+
+@dataclass
+class VadReport:
+    """Сводка по одному VAD на наборе файлов."""
+
+    name: str
+    frames: int = 0
+    seconds: float = 0.0  # Время обработки
+    noise_audio_seconds: float = 0.0
+    noise_triggers: int = 0  # Срабатывания (переходы в «речь») на записях без речи
+    noise_speech_frames: int = 0
+    noise_frames: int = 0
+    speech_files: int = 0
+    speech_files_detected: int = 0
+    per_file: list[tuple[str, int, float]] = field(default_factory=list)
+
+    @property
+    def us_per_frame(self) -> float:
+        return self.seconds / self.frames * 1e6 if self.frames else 0.0
+
+    @property
+    def false_triggers_per_minute(self) -> float:
+        if self.noise_audio_seconds <= 0:
+            return 0.0
+        return self.noise_triggers / self.noise_audio_seconds * 60.0
+
+    @property
+    def false_frame_rate(self) -> float:
+        return self.noise_speech_frames / self.noise_frames if self.noise_frames else 0.0
+
+    @property
+    def detection_rate(self) -> float:
+        return self.speech_files_detected / self.speech_files if self.speech_files else 0.0
+
+
+def run_file(name: str, path: Path, chunk: int, params: dict) -> tuple[np.ndarray, float, int]:
+    """
+    Прогоняет файл через VAD порциями по chunk отсчётов.
+
+    Returns:
+        Решения по кадрам, время обработки в секундах и частота дискретизации
+    """
+    samples, sample_rate = load_wav(path)
+    vad = create_vad(name, sample_rate, **params)
+    decisions: list[np.ndarray] = []
+    started = time.perf_counter()
+    for pos in range(0, samples.size, chunk):
+        decisions.append(vad.process(samples[pos : pos + chunk]))
+    elapsed = time.perf_counter() - started
+    flat = np.concatenate(decisions) if decisions else np.zeros(0, dtype=bool)
+    return flat, elapsed, sample_rate
+
+
+def count_triggers(decisions: np.ndarray) -> int:
+    """Считает переходы из «тишины» в «речь»."""
+    if decisions.size == 0:
+        return 0
+    rises = np.count_nonzero(decisions[1:] & ~decisions[:-1])
+    return int(rises + (1 if decisions[0] else 0))
+
+
+def speech_ratio(decisions: np.ndarray) -> float:
+    """Доля кадров, помеченных как речь."""
+    return float(decisions.mean()) if decisions.size else 0.0
+
+
+def evaluate(
+    name: str, noise: list[Path], speech: list[Path], chunk: int, params: dict
+) -> VadReport:
+    """Оценивает один VAD на наборах записей без речи и с речью."""
+    report = VadReport(name=name)
+    for path in noise:
+        decisions, elapsed, sample_rate = run_file(name, path, chunk, params)
+        frame_seconds = params.get("frame_ms", 20.0) / 1000.0
+        triggers = count_triggers(decisions)
+        report.frames += decisions.size
+        report.seconds += elapsed
+        report.noise_frames += decisions.size
+        report.noise_speech_frames += int(np.count_nonzero(decisions))
+        report.noise_triggers += triggers
+        report.noise_audio_seconds += decisions.size * frame_seconds
+        report.per_file.append((f"noise:{path.name}", triggers, speech_ratio(decisions)))
+    for path in speech:
+        decisions, elapsed, _ = run_file(name, path, chunk, params)
+        triggers = count_triggers(decisions)
+        report.frames += decisions.size
+        report.seconds += elapsed
+        report.speech_files += 1
+        report.speech_files_detected += int(triggers > 0)
+        report.per_file.append((f"speech:{path.name}", triggers, speech_ratio(decisions)))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-оценка VAD на WAV-файлах")
+    parser.add_argument("--noise", nargs="*", default=[], help="WAV/каталоги без речи")
+    parser.add_argument("--speech", nargs="*", default=[], help="WAV/каталоги с речью")
+    parser.add_argument(
+        "--vad", nargs="+", default=["adaptive", "energy"], choices=sorted(VAD_REGISTRY)
+    )
+    parser.add_argument("--chunk", type=int, default=1024, help="Размер порции, как recorder_chunk")
+    parser.add_argument("--onset-ms", type=float, default=60.0)
+    parser.add_argument("--hangover-ms", type=float, default=200.0)
+    parser.add_argument("--threshold", type=int, default=900, help="Порог для VAD 'energy'")
+    parser.add_argument("--verbose", action="store_true", help="Печатать результаты по файлам")
+    args = parser.parse_args()
+
+    noise = collect_wavs(args.noise)
+    speech = collect_wavs(args.speech)
+    if not noise and not speech:
+        parser.error("Укажите хотя бы один файл через --noise или --speech.")
+
+    print(f"{'VAD':<10} {'мкс/кадр':>9} {'ложн./мин':>10} {'ложн. кадры':>12} {'речь найдена':>13}")
+    for name in args.vad:
+        params: dict = {"onset_ms": args.onset_ms, "hangover_ms": args.hangover_ms}
+        if name == "energy":
+            params["threshold"] = args.threshold
+        report = evaluate(name, noise, speech, args.chunk, params)
+        print(
+            f"{name:<10} {report.us_per_frame:>9.1f} {report.false_triggers_per_minute:>10.2f} "
+            f"{report.false_frame_rate:>12.1%} {report.detection_rate:>13.1%}"
+        )
+        if args.verbose:
+            for label, triggers, ratio in report.per_file:
+                print(f"    {label:<40} срабатываний={triggers:<4} речь={ratio:.1%}")
+
+
+if __name__ == "__main__":
+    main()
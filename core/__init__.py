@@ -1,6 +1,42 @@
 """Основные модули для работы с голосом и аудио."""
 
-from core.voice_recorder import RecorderConfig, VoiceRecorder
+from core.ring_buffer import AudioRingBuffer
+from core.speech_gate import GateDecision, SpeechGate
+from core.vad import (
+    AdaptiveVAD,
+    EnergyVAD,
+    VoiceActivityDetector,
+    create_vad,
+    register_vad,
+)
 
-__all__ = ["RecorderConfig", "VoiceRecorder"]
+# Запись с микрофона требует pyaudio: импортируется при первом обращении,
+# чтобы VAD и проверка речи импортировались и без него
+_RECORDER_NAMES = frozenset(
+    {"PhraseTracker", "RecorderConfig", "VoiceRecorder", "pcm16_to_float32", "segment_phrase"}
+)
 
+
+def __getattr__(name: str):
+    if name in _RECORDER_NAMES:
+        from core import voice_recorder
+
+        return getattr(voice_recorder, name)
+    raise AttributeError(f"module 'core' has no attribute {name!r}")
+
+
+__all__ = [
+    "AdaptiveVAD",
+    "AudioRingBuffer",
+    "EnergyVAD",
+    "GateDecision",
+    "PhraseTracker",
+    "RecorderConfig",
+    "SpeechGate",
+    "VoiceActivityDetector",
+    "VoiceRecorder",
+    "create_vad",
+    "pcm16_to_float32",
+    "register_vad",
+    "segment_phrase",
+]
@@ -0,0 +1,91 @@
+"""Кольцевой буфер аудио для непрерывного захвата с микрофона."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Кольцевой буфер PCM16 отсчётов фиксированного размера.
+
+    Позиции адресуются абсолютным номером отсчёта с момента создания буфера,
+    поэтому читатель может держать собственный курсор и вырезать любой
+    ещё не перезаписанный отрезок без копирования всей истории.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Создаёт буфер.
+
+        Args:
+            capacity: Вместимость буфера в отсчётах
+        """
+        if capacity <= 0:
+            raise ValueError("Вместимость буфера должна быть положительной.")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._written = 0
+        self._cond = threading.Condition()
+
+    @property
+    def total_written(self) -> int:
+        """Абсолютная позиция конца записанных данных."""
+        with self._cond:
+            return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Абсолютная позиция самого старого доступного отсчёта."""
+        with self._cond:
+            return max(0, self._written - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        """
+        Дописывает отсчёты в буфер, затирая самые старые.
+
+        Args:
+            samples: Одномерный массив int16
+        """
+        samples = np.asarray(samples, dtype=np.int16)
+        # Позиция сдвигается на всю длину: отброшенное начало тоже было записано
+        total = samples.size
+        if total > self.capacity:
+            samples = samples[-self.capacity :]
+        with self._cond:
+            pos = (self._written + total - samples.size) % self.capacity
+            first = min(samples.size, self.capacity - pos)
+            self._data[pos : pos + first] = samples[:first]
+            self._data[: samples.size - first] = samples[first:]
+            self._written += total
+            self._cond.notify_all()
+
+    def wait_for(self, position: int, timeout: float | None = None) -> bool:
+        """
+        Ждёт, пока в буфер будет записано данных до позиции position.
+
+        Returns:
+            True, если данные доступны, False по таймауту
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= position, timeout=timeout)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Возвращает копию отсчётов в абсолютном диапазоне [start, end).
+
+        Начало диапазона, уже перезаписанное новыми данными, обрезается
+        до самого старого доступного отсчёта.
+        """
+        with self._cond:
+            start = max(start, self._written - self.capacity, 0)
+            end = min(end, self._written)
+            if end <= start:
+                return np.zeros(0, dtype=np.int16)
+            first = start % self.capacity
+            last = first + (end - start)
+            if last <= self.capacity:
+                return self._data[first:last].copy()
+            return np.concatenate((self._data[first:], self._data[: last - self.capacity]))
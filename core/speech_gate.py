@@ -0,0 +1,226 @@
+"""Быстрая проверка записанной фразы «речь или нет» перед распознаванием Whisper."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Диапазон основного тона голоса, Гц
+PITCH_MIN_HZ = 70.0
+PITCH_MAX_HZ = 400.0
+# Полоса, в которой сосредоточена энергия речи, Гц
+SPEECH_BAND_HZ = (250.0, 4000.0)
+# Кадр громче этого уровня (дБ FS) считается звучащим даже без тихого фона во фразе
+LOUD_DB = -30.0
+
+REASONS = {
+    "short": "слишком коротко",
+    "noise": "не похоже на речь",
+    "tone": "ровный тон или музыка",
+}
+
+
+@dataclass
+class GateDecision:
+    """Решение по одной фразе."""
+
+    passed: bool
+    reason: str  # "speech" или ключ REASONS
+    duration: float  # Длительность фразы, с
+    active_ms: float  # Сколько звучало громче фона, мс
+    voiced_ms: float  # Сколько из этого похоже на голос, мс
+    elapsed_ms: float  # Время проверки, мс
+
+
+@dataclass
+class GateStats:
+    """Счётчики отклонённых фраз и сэкономленного времени распознавания."""
+
+    checked: int = 0
+    rejected: dict[str, int] = field(default_factory=dict)
+    rejected_audio_seconds: float = 0.0
+    check_ms: float = 0.0  # Суммарное время проверок
+    # Измеренное время Whisper на секунду аудио (None — ещё не измерено)
+    stt_seconds_per_audio: float | None = None
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+    @property
+    def saved_stt_seconds(self) -> float:
+        """Оценка времени Whisper, которое ушло бы на отклонённые фразы."""
+        if self.stt_seconds_per_audio is None:
+            return 0.0
+        return self.rejected_audio_seconds * self.stt_seconds_per_audio
+
+
+class SpeechGate:
+    """
+    Отсеивает фразы без речи (хлопки, стук, музыка, шум) до вызова Whisper.
+
+    VAD записи реагирует на громкость, поэтому фразой становится любой
+    громкий звук. Здесь фраза целиком режется на кадры по frame_ms, и для
+    каждого считаются энергия, периодичность (пик нормированной
+    автокорреляции в диапазоне основного тона) и доля энергии в речевой
+    полосе — всё по одному БПФ кадра, несколько миллисекунд на фразу.
+
+    Фраза отклоняется, если:
+        short — громче фона звучало меньше min_speech_ms;
+        noise — голосоподобных кадров меньше min_voiced_ms или их доля среди
+                громких меньше min_voiced_ratio (хлопок, шорох, шум);
+        tone  — голосоподобный участок без перерыва длиннее max_voiced_run_ms
+                (гудок, ровная нота: в речи слоги разделены согласными и паузами).
+
+    Речь из телевизора остаётся речью: проверка отсеивает только то, что
+    Whisper всё равно распознал бы как пустую строку или галлюцинацию.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: float = 32.0,
+        min_speech_ms: float = 250.0,
+        min_voiced_ms: float = 120.0,
+        min_voiced_ratio: float = 0.2,
+        max_voiced_run_ms: float = 2000.0,
+        min_periodicity: float = 0.5,
+        min_band_ratio: float = 0.3,
+    ):
+        """
+        Args:
+            sample_rate: Частота дискретизации фраз (16 кГц — формат Whisper)
+            frame_ms: Длина кадра анализа, мс
+            min_speech_ms: Минимальная длительность звука громче фона, мс
+            min_voiced_ms: Минимальная длительность голосоподобных кадров, мс
+            min_voiced_ratio: Минимальная доля голосоподобных кадров среди громких
+            max_voiced_run_ms: Максимальный голосоподобный участок без перерыва, мс
+            min_periodicity: Порог пика автокорреляции для голосового кадра
+            min_band_ratio: Минимальная доля энергии кадра в полосе речи
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = max(64, int(sample_rate * frame_ms / 1000.0))
+        self.frame_ms = self.frame_size * 1000.0 / sample_rate
+        self.min_speech_ms = min_speech_ms
+        self.min_voiced_ms = min_voiced_ms
+        self.min_voiced_ratio = min_voiced_ratio
+        self.max_voiced_run_ms = max_voiced_run_ms
+        self.min_periodicity = min_periodicity
+        self.min_band_ratio = min_band_ratio
+        self.stats = GateStats()
+
+        # БПФ с запасом вдвое: автокорреляция без циклического наложения
+        self._n_fft = 1 << (2 * self.frame_size - 1).bit_length()
+        freqs = np.fft.rfftfreq(self._n_fft, 1.0 / sample_rate)
+        self._band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+        self._lag_min = max(1, int(sample_rate / PITCH_MAX_HZ))
+        self._lag_max = min(self.frame_size - 1, int(sample_rate / PITCH_MIN_HZ))
+        lags = np.arange(self._lag_min, self._lag_max + 1)
+        # Поправка на смещённую оценку автокорреляции по конечному кадру
+        self._unbias = self.frame_size / (self.frame_size - lags)
+
+    def _features(self, audio: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Энергия (дБ), периодичность и доля энергии в полосе речи по кадрам."""
+        n_frames = audio.size // self.frame_size
+        frames = audio[: n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        power = np.abs(np.fft.rfft(frames, n=self._n_fft, axis=1)) ** 2
+        total = power[:, 1:].sum(axis=1) + 1e-12
+        band_ratio = power[:, self._band].sum(axis=1) / total
+
+        autocorr = np.fft.irfft(power, n=self._n_fft, axis=1)
+        zero_lag = autocorr[:, 0] + 1e-12
+        peaks = autocorr[:, self._lag_min : self._lag_max + 1] * self._unbias
+        periodicity = peaks.max(axis=1) / zero_lag
+
+        energy_db = 10.0 * np.log10(zero_lag / self.frame_size)
+        return energy_db, periodicity, band_ratio
+
+    def check(self, audio: np.ndarray) -> GateDecision:
+        """
+        Проверяет фразу и обновляет счётчики.
+
+        Args:
+            audio: Моно float32 в диапазоне [-1, 1] с частотой sample_rate
+
+        Returns:
+            Решение: пропускать ли фразу в распознавание
+        """
+        started = time.perf_counter()
+        audio = np.asarray(audio, dtype=np.float32)
+        duration = audio.size / self.sample_rate
+        active_ms = voiced_ms = 0.0
+        reason = "short"
+
+        if audio.size >= self.frame_size:
+            energy_db, periodicity, band_ratio = self._features(audio)
+            # Фон — тихие кадры самой фразы (pre-roll и удержание VAD)
+            floor_db = float(np.percentile(energy_db, 10))
+            active = (energy_db > max(floor_db + 10.0, -55.0)) | (energy_db > LOUD_DB)
+            voiced = (
+                active
+                & (periodicity >= self.min_periodicity)
+                & (band_ratio >= self.min_band_ratio)
+            )
+            active_ms = float(active.sum()) * self.frame_ms
+            voiced_ms = float(voiced.sum()) * self.frame_ms
+            if active_ms < self.min_speech_ms:
+                reason = "short"
+            elif voiced_ms < self.min_voiced_ms or voiced_ms < self.min_voiced_ratio * active_ms:
+                reason = "noise"
+            elif _longest_run(voiced) * self.frame_ms > self.max_voiced_run_ms:
+                reason = "tone"
+            else:
+                reason = "speech"
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        decision = GateDecision(
+            reason == "speech", reason, duration, active_ms, voiced_ms, elapsed_ms
+        )
+        self.stats.checked += 1
+        self.stats.check_ms += elapsed_ms
+        if not decision.passed:
+            self.stats.rejected[reason] = self.stats.rejected.get(reason, 0) + 1
+            self.stats.rejected_audio_seconds += duration
+        return decision
+
+    def record_stt(self, audio_seconds: float, stt_seconds: float) -> None:
+        """
+        Учитывает фактическое время распознавания (для оценки сэкономленного).
+
+        Args:
+            audio_seconds: Длительность распознанной фразы
+            stt_seconds: Сколько заняло распознавание
+        """
+        if audio_seconds <= 0:
+            return
+        ratio = stt_seconds / audio_seconds
+        previous = self.stats.stt_seconds_per_audio
+        # Скользящее среднее: первые фразы часто медленнее из-за прогрева
+        self.stats.stt_seconds_per_audio = (
+            ratio if previous is None else 0.8 * previous + 0.2 * ratio
+        )
+
+    def summary(self) -> str:
+        """Однострочная сводка счётчиков."""
+        stats = self.stats
+        reasons = ", ".join(f"{REASONS[name]}: {count}" for name, count in stats.rejected.items())
+        line = (
+            f"отклонено {stats.rejected_total} из {stats.checked}"
+            f"{f' ({reasons})' if reasons else ''}, "
+            f"{stats.rejected_audio_seconds:.1f} с аудио"
+        )
+        if stats.stt_seconds_per_audio is not None:
+            line += f", сэкономлено ~{stats.saved_stt_seconds:.1f} с STT"
+        return line
+
+
+def _longest_run(mask: np.ndarray) -> int:
+    """Длина самого длинного участка True подряд."""
+    longest = run = 0
+    for value in mask:
+        run = run + 1 if value else 0
+        longest = max(longest, run)
+    return longest
@@ -0,0 +1,224 @@
+"""Детекторы голосовой активности (VAD) для записи фраз с микрофона."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class VoiceActivityDetector(ABC):
+    """
+    Базовый интерфейс VAD.
+
+    Детектор получает PCM16 отсчёты произвольными порциями, сам режет их на
+    кадры по frame_ms и принимает решение «речь/не речь» по каждому кадру.
+    Задержка срабатывания (onset) и удержание после речи (hangover)
+    задаются в миллисекундах и не зависят от размера порции микрофона.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: float = 20.0,
+        onset_ms: float = 60.0,
+        hangover_ms: float = 200.0,
+    ):
+        """
+        Args:
+            sample_rate: Частота дискретизации входного аудио
+            frame_ms: Длина кадра анализа в миллисекундах
+            onset_ms: Сколько речь должна длиться подряд, чтобы VAD сработал
+            hangover_ms: Сколько удерживать состояние «речь» после последнего речевого кадра
+        """
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000.0))
+        self.onset_frames = max(1, int(round(onset_ms / frame_ms)))
+        self.hangover_frames = max(0, int(round(hangover_ms / frame_ms)))
+        self.reset()
+
+    def reset(self) -> None:
+        """Сбрасывает внутреннее состояние детектора."""
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._speech = False
+        self._run = 0  # подряд идущие речевые кадры до срабатывания
+        self._hang = 0  # оставшиеся кадры удержания
+
+    @abstractmethod
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Сырые решения по кадрам без onset/hangover.
+
+        Args:
+            frames: Матрица float32 формы (кадры, frame_size) в диапазоне [-1, 1]
+
+        Returns:
+            Булев массив решений по каждому кадру
+        """
+
+    def _smooth(self, raw: np.ndarray) -> np.ndarray:
+        """Применяет onset/hangover к сырым решениям."""
+        out = np.empty(raw.size, dtype=bool)
+        for i, voiced in enumerate(raw):
+            if voiced:
+                self._run += 1
+                if self._speech or self._run >= self.onset_frames:
+                    self._speech = True
+                    self._hang = self.hangover_frames
+            else:
+                self._run = 0
+                if self._speech:
+                    if self._hang > 0:
+                        self._hang -= 1
+                    else:
+                        self._speech = False
+            out[i] = self._speech
+        return out
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Обрабатывает очередную порцию аудио.
+
+        Неполный кадр в конце порции сохраняется и дополняется следующей порцией.
+
+        Args:
+            samples: PCM16 отсчёты (int16)
+
+        Returns:
+            Булев массив решений по каждому завершённому кадру
+        """
+        samples = np.concatenate((self._pending, np.asarray(samples, dtype=np.int16)))
+        n_frames = samples.size // self.frame_size
+        self._pending = samples[n_frames * self.frame_size :]
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = samples[: n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        raw = self._classify(frames.astype(np.float32) / 32768.0)
+        return self._smooth(raw)
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        """
+        Решение по порции микрофона: True, если в ней есть речевые кадры.
+
+        Если порция короче кадра, возвращается текущее состояние детектора.
+        """
+        decisions = self.process(samples)
+        if decisions.size == 0:
+            return self._speech
+        return bool(decisions.any())
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """Пороговый VAD по RMS (поведение прежнего audioop.rms > порог)."""
+
+    def __init__(self, sample_rate: int, threshold: int = 900, **kwargs):
+        """
+        Args:
+            sample_rate: Частота дискретизации
+            threshold: Порог RMS в единицах PCM16 (как recorder_silence_threshold)
+        """
+        self.threshold = threshold / 32768.0
+        super().__init__(sample_rate, **kwargs)
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return rms > self.threshold
+
+
+class AdaptiveVAD(VoiceActivityDetector):
+    """
+    VAD по энергии, частоте переходов через ноль (ZCR) и адаптивному уровню шума.
+
+    Уровень шума отслеживается отдельно: быстро опускается вслед за тишиной
+    и медленно поднимается вслед за постоянным фоном (вентилятор, гул),
+    поэтому порог срабатывания — это превышение над текущим фоном, а не
+    фиксированное значение. Высокий ZCR при небольшой энергии характерен
+    для шипения и широкополосного шума и не считается речью.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        snr_db: float = 9.0,
+        min_energy_db: float = -55.0,
+        max_zcr: float = 0.35,
+        floor_rise: float = 0.02,
+        floor_fall: float = 0.3,
+        **kwargs,
+    ):
+        """
+        Args:
+            sample_rate: Частота дискретизации
+            snr_db: Насколько энергия кадра должна превышать уровень шума, дБ
+            min_energy_db: Абсолютный минимум энергии речевого кадра, дБ FS
+            max_zcr: Максимальная доля переходов через ноль для «тихой» речи
+            floor_rise: Скорость подъёма оценки шума (на кадр)
+            floor_fall: Скорость опускания оценки шума (на кадр)
+        """
+        self.snr_db = snr_db
+        self.min_energy_db = min_energy_db
+        self.max_zcr = max_zcr
+        self.floor_rise = floor_rise
+        self.floor_fall = floor_fall
+        super().__init__(sample_rate, **kwargs)
+
+    def reset(self) -> None:
+        super().reset()
+        self.noise_floor_db: float | None = None
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(energy_db.min())
+
+        raw = np.empty(energy_db.size, dtype=bool)
+        floor = self.noise_floor_db
+        for i, (energy, crossings) in enumerate(zip(energy_db, zcr)):
+            excess = energy - floor
+            loud = energy > self.min_energy_db and excess > self.snr_db
+            # Сильный сигнал — речь независимо от ZCR (в том числе шипящие)
+            voiced = loud and (crossings < self.max_zcr or excess > self.snr_db + 6.0)
+            raw[i] = voiced
+            if energy < floor:
+                floor += self.floor_fall * (energy - floor)
+            elif not voiced and not self._speech:
+                floor += self.floor_rise * (energy - floor)
+        self.noise_floor_db = floor
+        return raw
+
+
+VAD_REGISTRY: dict[str, type[VoiceActivityDetector]] = {
+    "energy": EnergyVAD,
+    "adaptive": AdaptiveVAD,
+}
+
+
+def register_vad(name: str, vad_cls: type[VoiceActivityDetector]) -> None:
+    """Регистрирует собственную реализацию VAD под именем name."""
+    VAD_REGISTRY[name] = vad_cls
+
+
+def create_vad(name: str, sample_rate: int, **params) -> VoiceActivityDetector:
+    """
+    Создаёт VAD по имени из реестра.
+
+    Args:
+        name: Имя реализации ('adaptive', 'energy' или зарегистрированное)
+        sample_rate: Частота дискретизации
+        **params: Параметры конструктора реализации
+
+    Returns:
+        Экземпляр детектора
+    """
+    try:
+        vad_cls = VAD_REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный VAD '{name}'. Доступные: {', '.join(sorted(VAD_REGISTRY))}"
+        ) from None
+    return vad_cls(sample_rate, **params)
@@ -2,88 +2,352 @@
 
 from __future__ import annotations
 
-import audioop
 import contextlib
+import copy
 import os
 import tempfile
-import time
+import threading
 import wave
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pyaudio
 
+from core.ring_buffer import AudioRingBuffer
+from core.vad import VoiceActivityDetector, create_vad
+
+# Частота дискретизации, которую ожидает Whisper на входе
+WHISPER_SAMPLE_RATE = 16000
+
 
 @dataclass
 class RecorderConfig:
     sample_rate: int
     chunk: int
-    silence_threshold: int  # Чем ниже значение, тем чувствительнее
+    silence_threshold: int  # Порог RMS для VAD 'energy': чем ниже, тем чувствительнее
     silence_duration: float  # секунд тишины прежде чем остановиться
     max_recording: float  # ограничение на длину записи, секунд
+    preroll_ms: float = 300.0  # сколько аудио до начала речи добавлять к фразе, мс
+    vad: str = "adaptive"  # реализация VAD из core.vad ('adaptive' или 'energy')
+    vad_onset_ms: float = 60.0  # сколько речь должна длиться, чтобы VAD сработал, мс
+    vad_hangover_ms: float = 200.0  # удержание состояния «речь» после её конца, мс
+    vad_snr_db: float = 9.0  # превышение над уровнем шума для VAD 'adaptive', дБ
+
+
+class PhraseTracker:
+    """
+    Определяет границы фразы по решениям VAD для последовательных порций аудио.
+
+    Не зависит от источника звука, поэтому одна и та же логика работает и для
+    микрофона, и для офлайн-прогона записей (см. segment_phrase).
+    """
+
+    def __init__(self, config: RecorderConfig, vad: VoiceActivityDetector, start: int = 0):
+        """
+        Args:
+            config: Параметры записи
+            vad: Детектор голосовой активности
+            start: Абсолютная позиция (в отсчётах), с которой начато прослушивание
+        """
+        self.vad = vad
+        self.listen_start = start
+        # Pre-roll отсчитывается от момента срабатывания VAD, то есть с учётом onset
+        self.preroll = int(config.sample_rate * (config.preroll_ms + config.vad_onset_ms) / 1000.0)
+        self.max_samples = int(config.sample_rate * config.max_recording)
+        self.max_silence_chunks = int((config.sample_rate / config.chunk) * config.silence_duration)
+        self.phrase_start: int | None = None
+        self.silent_chunks = 0
+
+    def feed(self, position: int, data: np.ndarray) -> bool:
+        """
+        Обрабатывает очередную порцию.
+
+        Args:
+            position: Абсолютная позиция начала порции
+            data: Отсчёты PCM16 порции
+
+        Returns:
+            True, если фраза завершилась (тишина после речи или лимит длины)
+        """
+        if self.vad.is_speech(data):
+            if self.phrase_start is None:
+                self.phrase_start = max(position - self.preroll, 0)
+            self.silent_chunks = 0
+        elif self.phrase_start is not None:
+            self.silent_chunks += 1
+            if self.silent_chunks >= self.max_silence_chunks:
+                return True
+        return position + data.size - self.listen_start >= self.max_samples
+
+
+def segment_phrase(
+    samples: np.ndarray, config: RecorderConfig, vad: VoiceActivityDetector | None = None
+) -> np.ndarray | None:
+    """
+    Выделяет первую фразу из записи так же, как это делает VoiceRecorder с микрофоном.
+
+    Args:
+        samples: Запись PCM16 с частотой config.sample_rate
+        config: Параметры записи (порция, VAD, pre-roll, лимиты)
+        vad: Детектор; по умолчанию создаётся по config.vad
+
+    Returns:
+        Отсчёты PCM16 фразы либо None, если речь не найдена
+    """
+    tracker = PhraseTracker(config, vad or create_recorder_vad(config))
+    end = samples.size
+    for pos in range(0, samples.size, config.chunk):
+        if tracker.feed(pos, samples[pos : pos + config.chunk]):
+            end = min(pos + config.chunk, samples.size)
+            break
+    if tracker.phrase_start is None:
+        return None
+    return samples[tracker.phrase_start : end]
+
+
+def create_recorder_vad(config: RecorderConfig) -> VoiceActivityDetector:
+    """Создаёт VAD по параметрам записи."""
+    params: dict[str, float] = {
+        "onset_ms": config.vad_onset_ms,
+        "hangover_ms": config.vad_hangover_ms,
+    }
+    if config.vad == "energy":
+        params["threshold"] = config.silence_threshold
+    elif config.vad == "adaptive":
+        params["snr_db"] = config.vad_snr_db
+    return create_vad(config.vad, config.sample_rate, **params)
 
 
 class VoiceRecorder:
-    """Захватывает короткие фразы с микрофона с автоматическим VAD."""
+    """
+    Захватывает короткие фразы с микрофона с автоматическим VAD.
 
-    def __init__(self, config: RecorderConfig):
+    Микрофон открывается один раз: фоновый поток непрерывно пишет отсчёты
+    в кольцевой буфер, а извлечение фразы сводится к срезу этого буфера.
+    Благодаря этому к фразе добавляется pre-roll — звук перед моментом,
+    когда сработал VAD, и начало речи не обрезается.
+    """
+
+    def __init__(self, config: RecorderConfig, vad: VoiceActivityDetector | None = None):
+        """
+        Args:
+            config: Параметры записи
+            vad: Детектор голосовой активности; по умолчанию создаётся по config.vad
+        """
         self.config = config
+        self.vad = vad if vad is not None else create_recorder_vad(config)
         self._pa = pyaudio.PyAudio()
+        # Запас по длине: максимальная фраза, pre-roll и несколько секунд на отставание читателя
+        capacity_seconds = config.max_recording + config.preroll_ms / 1000.0 + 5.0
+        self._ring = AudioRingBuffer(int(capacity_seconds * config.sample_rate))
+        self._stream = None
+        self._capture_thread: threading.Thread | None = None
+        self._running = threading.Event()
+        self._resume_from: int | None = None
+        self.trailing_silence = 0.0  # Тишина в конце последней фразы, с (по ней VAD её завершил)
 
     def __del__(self):
+        with contextlib.suppress(Exception):
+            self.close()
         with contextlib.suppress(Exception):
             self._pa.terminate()
 
-    def capture_phrase(self):
-        stream = self._pa.open(
+    def start(self) -> None:
+        """Открывает микрофон и запускает фоновый поток захвата (если ещё не запущен)."""
+        if self._capture_thread is not None and self._capture_thread.is_alive():
+            return
+        self._stream = self._pa.open(
             format=pyaudio.paInt16,
             channels=1,
             rate=self.config.sample_rate,
             input=True,
             frames_per_buffer=self.config.chunk,
         )
-
-        frames: list[bytes] = []
-        silent_chunks = 0
-        recording_started = False
-        start_ts = time.time()
-        max_silence_chunks = int(
-            (self.config.sample_rate / self.config.chunk) * self.config.silence_duration
+        self._running.set()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop, name="mic-capture", daemon=True
         )
+        self._capture_thread.start()
 
-        print("[Mic] Скажите команду (Ctrl+C — выход)...")
+    def close(self) -> None:
+        """Останавливает поток захвата и закрывает микрофон."""
+        self._running.clear()
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=1.0)
+            self._capture_thread = None
+        if self._stream is not None:
+            with contextlib.suppress(Exception):
+                self._stream.stop_stream()
+                self._stream.close()
+            self._stream = None
+
+    def _capture_loop(self) -> None:
+        """Непрерывно читает микрофон в кольцевой буфер."""
         try:
-            while True:
-                data = stream.read(self.config.chunk, exception_on_overflow=False)
-                rms = audioop.rms(data, 2)
-
-                if rms > self.config.silence_threshold:
-                    recording_started = True
-                    frames.append(data)
-                    silent_chunks = 0
-                elif recording_started:
-                    frames.append(data)
-                    silent_chunks += 1
-                    if silent_chunks >= max_silence_chunks:
-                        break
-
-                if time.time() - start_ts >= self.config.max_recording:
-                    break
+            while self._running.is_set():
+                data = self._stream.read(self.config.chunk, exception_on_overflow=False)
+                self._ring.write(np.frombuffer(data, dtype=np.int16))
         finally:
-            stream.stop_stream()
-            stream.close()
+            self._running.clear()
+
+    def _record_frames(
+        self,
+        on_partial: Callable[[np.ndarray], None] | None = None,
+        partial_interval: float = 1.0,
+    ) -> bytes | None:
+        """Выделяет фразу из непрерывного потока микрофона и возвращает PCM16 данные."""
+        self.start()
 
-        if not frames:
+        chunk = self.config.chunk
+        cursor = self._ring.total_written
+        if self._resume_from is not None:
+            # Фраза началась во время ответа ассистента: разбираем её из буфера с начала
+            cursor = max(self._resume_from, self._ring.oldest)
+            self._resume_from = None
+        tracker = PhraseTracker(self.config, self.vad, start=cursor)
+        partial_step = max(chunk, int(self.config.sample_rate * partial_interval))
+        next_partial: int | None = None
+
+        print("[Mic] Скажите команду (Ctrl+C — выход)...")
+        while True:
+            while not self._ring.wait_for(cursor + chunk, timeout=0.5):
+                if not self._running.is_set():
+                    raise RuntimeError("Поток захвата микрофона остановлен.")
+            # Если читатель отстал дальше вместимости буфера, перескакиваем вперёд
+            cursor = max(cursor, self._ring.oldest)
+            done = tracker.feed(cursor, self._ring.read(cursor, cursor + chunk))
+            cursor += chunk
+            if done:
+                break
+
+            if on_partial is not None and tracker.phrase_start is not None:
+                # В паузе — один вызов по всей речи до неё, дальше до новой речи ни одного:
+                # если пауза окажется концом фразы, этот проход заменит докодирование хвоста
+                pause = tracker.silent_chunks == 1
+                if next_partial is None and not pause:
+                    next_partial = cursor + partial_step
+                elif pause or (not tracker.silent_chunks and cursor >= next_partial):
+                    next_partial = cursor + partial_step
+                    partial = self._ring.read(tracker.phrase_start, cursor).tobytes()
+                    on_partial(pcm16_to_float32(partial, self.config.sample_rate))
+
+        self.trailing_silence = tracker.silent_chunks * chunk / self.config.sample_rate
+        if tracker.phrase_start is None:
             print("[Warn] Не удалось распознать речь — попробуйте ещё раз.")
             return None
 
+        start = max(tracker.phrase_start, self._ring.oldest)
+        return self._ring.read(start, cursor).tobytes()
+
+    def wait_for_speech(self, stop: threading.Event, min_speech_ms: float = 300.0) -> int | None:
+        """
+        Слушает микрофон (например, во время ответа ассистента) до начала речи.
+
+        Используется отдельная копия VAD с более длинным onset, чтобы короткие
+        щелчки и эхо динамиков реже принимались за перебивание.
+
+        Args:
+            stop: Событие, по которому ожидание прекращается
+            min_speech_ms: Сколько речь должна длиться, чтобы считаться перебиванием
+
+        Returns:
+            Примерная абсолютная позиция начала речи либо None, если ожидание прервано
+        """
+        self.start()
+        vad = copy.deepcopy(self.vad)
+        vad.onset_frames = max(vad.onset_frames, int(round(min_speech_ms / vad.frame_ms)))
+        vad.reset()
+
+        chunk = self.config.chunk
+        cursor = self._ring.total_written
+        onset = int(self.config.sample_rate * min_speech_ms / 1000.0)
+        while not stop.is_set():
+            if not self._ring.wait_for(cursor + chunk, timeout=0.1):
+                if not self._running.is_set():
+                    return None
+                continue
+            cursor = max(cursor, self._ring.oldest)
+            if vad.is_speech(self._ring.read(cursor, cursor + chunk)):
+                return max(cursor + chunk - onset, 0)
+            cursor += chunk
+        return None
+
+    def resume_from(self, position: int) -> None:
+        """
+        Начинает следующую фразу с указанной позиции буфера, а не с текущего момента.
+
+        Args:
+            position: Абсолютная позиция (например, результат wait_for_speech)
+        """
+        self._resume_from = position
+
+    def capture_audio(
+        self,
+        on_partial: Callable[[np.ndarray], None] | None = None,
+        partial_interval: float = 1.0,
+    ) -> np.ndarray | None:
+        """
+        Записывает фразу и возвращает её в памяти, без временного файла.
+
+        Args:
+            on_partial: Вызывается во время речи с незавершённой фразой
+                        (float32, 16 кГц, от начала фразы) — для потокового STT;
+                        в паузе — один раз, в её начале.
+                        Вызов не должен блокировать: иначе отстанет VAD
+            partial_interval: Как часто вызывать on_partial, секунд
+
+        Returns:
+            Моно-аудио float32 в диапазоне [-1, 1] с частотой 16 кГц
+            (формат, который Whisper принимает напрямую), либо None
+        """
+        pcm = self._record_frames(on_partial, partial_interval)
+        if pcm is None:
+            return None
+        return pcm16_to_float32(pcm, self.config.sample_rate)
+
+    def capture_phrase(self) -> Path | None:
+        """
+        Записывает фразу во временный WAV-файл (удобно для отладки).
+
+        Returns:
+            Путь к WAV-файлу, который удаляет вызывающая сторона, либо None
+        """
+        pcm = self._record_frames()
+        if pcm is None:
+            return None
+
         fd, tmp_path = tempfile.mkstemp(suffix=".wav")
         os.close(fd)
         with contextlib.closing(wave.open(tmp_path, "wb")) as wav_file:  # type: ignore[arg-type]
             wav_file.setnchannels(1)
             wav_file.setsampwidth(self._pa.get_sample_size(pyaudio.paInt16))
             wav_file.setframerate(self.config.sample_rate)
-            wav_file.writeframes(b"".join(frames))
+            wav_file.writeframes(pcm)
 
         return Path(tmp_path)
 
+
+def pcm16_to_float32(pcm: bytes, sample_rate: int) -> np.ndarray:
+    """
+    Преобразует PCM16 моно в float32 с частотой дискретизации Whisper.
+
+    Args:
+        pcm: Сырые 16-битные отсчёты (little-endian)
+        sample_rate: Исходная частота дискретизации
+
+    Returns:
+        Аудио float32 в диапазоне [-1, 1] с частотой 16 кГц
+    """
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    if sample_rate == WHISPER_SAMPLE_RATE or audio.size == 0:
+        return audio
+
+    # Линейная передискретизация: для речи перед Whisper этого достаточно
+    duration = audio.size / sample_rate
+    target_size = max(1, int(round(duration * WHISPER_SAMPLE_RATE)))
+    src_times = np.arange(audio.size, dtype=np.float64) / sample_rate
+    dst_times = np.arange(target_size, dtype=np.float64) / WHISPER_SAMPLE_RATE
+    return np.interp(dst_times, src_times, audio).astype(np.float32)
+
@@ -1,4 +1,5 @@
 """Главная точка входа для VoiceToNights - голосовой ассистент."""
+import argparse
 import sys
 from pathlib import Path
 
@@ -13,6 +14,16 @@ from src.server import StrongServer
 
 def main():
     """Запуск приложения."""
+    parser = argparse.ArgumentParser(description="VoiceToNights — голосовой ассистент")
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const="",
+        metavar="HOST:PORT",
+        help="Сетевой режим для нескольких клиентов вместо локального микрофона",
+    )
+    args = parser.parse_args()
+
     # Загружаем конфигурацию
     config_path = Path(__file__).parent / "config.json"
     config = AppConfig.from_file(config_path)
@@ -22,6 +33,16 @@ def main():
         default_config = AppConfig.default()
         config.system_prompt = default_config.system_prompt
 
+    if args.serve is not None:
+        from src.net_server import run_network_server
+
+        host, _, port = args.serve.rpartition(":")
+        if not host and not port.isdigit():
+            host, port = port, ""  # Указан только адрес
+        server = StrongServer(config=config, microphone=False)
+        run_network_server(server, host or None, int(port) if port else None)
+        return
+
     # Создаём и запускаем сервер
     server = StrongServer(config=config)
     server.run()
@@ -0,0 +1,222 @@
+"""Кэш ответов LLM на повторяющиеся вопросы."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .intents import normalize_command
+
+# Вопросы, ответ на которые меняется со временем: они всегда идут в LLM
+VOLATILE_PATTERNS = (
+    r"\b(сейчас|сегодня|завтра|вчера|теперь|сегодняшн\w*|текущ\w*|последн\w*)\b",
+    r"\b(погод\w*|курс\w*|новост\w*|котир\w*|пробк\w*|расписани\w*)\b",
+    r"\b(который час|сколько времени|какое число|какой день)\b",
+)
+# Слова, отсылающие к прошлым репликам: без истории диалога ответ был бы другим
+CONTEXT_WORDS = frozenset(
+    "он она оно они его ее их ему ей им это этот эта эти этого там тогда туда "
+    "еще дальше подробнее тоже также".split()
+)
+# Союзы в начале фразы продолжают прошлую реплику («а у слона сколько весит?»)
+CONTINUATION_WORDS = frozenset("а и но или".split())
+# Слишком короткие фразы почти всегда продолжают разговор («а зачем?»)
+MIN_WORDS = 3
+
+
+@dataclass
+class CachedAnswer:
+    """Запись кэша."""
+
+    question: str  # Нормализованный вопрос (для отладки и файла кэша)
+    answer: str
+    created: float  # time.time() сохранения
+    hits: int = 0
+
+
+@dataclass
+class AnswerCacheStats:
+    """Счётчики обращений к кэшу ответов."""
+
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0  # Вопросы, зависящие от времени или контекста
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class AnswerCache:
+    """
+    Кэш ответов LLM: LRU с ограничением числа записей, сроком жизни и
+    необязательным файлом на диске, переживающим перезапуск.
+
+    Ключ — хэш от нормализованного вопроса (как у локальных команд: регистр,
+    «ё», пунктуация и слова-паразиты не важны), модели и хэша системного
+    промпта, поэтому смена модели или промпта не отдаёт устаревших ответов.
+    Вопросы о текущем времени, погоде, курсах и т.п., а также реплики,
+    продолжающие прошлый ответ («а почему?», «а у слона?»), в кэш не попадают.
+
+    Файл на диске перезаписывается не при каждом put, а в flush: из цикла
+    событий его вызывают в отдельном потоке, и при завершении работы.
+
+    Аудио ответа хранится в кэше TTS (src.tts_cache) по тексту кусков:
+    ответ из кэша проходит ту же подготовку текста и звучит без синтеза.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 24 * 3600,
+        path: Path | str | None = None,
+        exclude: Iterable[str] = (),
+    ):
+        """
+        Args:
+            max_entries: Сколько ответов хранить (старые вытесняются)
+            ttl_seconds: Срок жизни ответа, секунд
+            path: JSON-файл для хранения между перезапусками (None — только память)
+            exclude: Дополнительные регулярные выражения вопросов, которые не кэшируются
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self.stats = AnswerCacheStats()
+        self._volatile = [re.compile(p) for p in (*VOLATILE_PATTERNS, *exclude)]
+        self._items: OrderedDict[str, CachedAnswer] = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Запись файла по одной, в порядке изменений
+        self._dirty = False
+        if self.path is not None:
+            self._load()
+
+    @staticmethod
+    def make_key(question: str, model: str, system_prompt: str | None) -> str:
+        """
+        Вычисляет ключ кэша.
+
+        Args:
+            question: Распознанный вопрос
+            model: Модель Ollama
+            system_prompt: Системный промпт
+
+        Returns:
+            Шестнадцатеричный SHA-256
+        """
+        prompt_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+        payload = "\x1f".join([normalize_command(question), model, prompt_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cacheable(self, question: str) -> bool:
+        """Можно ли отвечать на вопрос из кэша (не зависит от времени и контекста)."""
+        first = re.match(r"\W*(\w+)", question.lower())
+        if first is not None and first.group(1) in CONTINUATION_WORDS:
+            return False
+        normalized = normalize_command(question)
+        words = normalized.split()
+        if len(words) < MIN_WORDS or CONTEXT_WORDS.intersection(words):
+            return False
+        return not any(pattern.search(normalized) for pattern in self._volatile)
+
+    def get(self, question: str, model: str, system_prompt: str | None) -> str | None:
+        """
+        Ищет ответ на вопрос.
+
+        Returns:
+            Ответ или None (нет в кэше, устарел или вопрос не кэшируется)
+        """
+        if not self.cacheable(question):
+            with self._lock:
+                self.stats.skipped += 1
+            return None
+        key = self.make_key(question, model, system_prompt)
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and time.time() - entry.created > self.ttl_seconds:
+                del self._items[key]
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._items.move_to_end(key)
+            entry.hits += 1
+            self.stats.hits += 1
+            return entry.answer
+
+    def put(self, question: str, model: str, system_prompt: str | None, answer: str) -> None:
+        """
+        Сохраняет полный ответ модели в памяти (вопросы, которые не кэшируются,
+        пропускаются). На диск ответ попадает при следующем flush.
+        """
+        answer = answer.strip()
+        if not answer or not self.cacheable(question):
+            return
+        key = self.make_key(question, model, system_prompt)
+        with self._lock:
+            self._items[key] = CachedAnswer(normalize_command(question), answer, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Записывает изменения в файл кэша, если они есть (блокирующий вызов)."""
+        if self.path is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = [(key, asdict(entry)) for key, entry in self._items.items()]
+                self._dirty = False
+            self._save(snapshot)
+
+    def _load(self) -> None:
+        """Читает файл кэша, отбрасывая устаревшие записи."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, fields in data.get("entries", []):
+            try:
+                entry = CachedAnswer(**fields)
+            except TypeError:
+                continue
+            if now - entry.created <= self.ttl_seconds:
+                self._items[key] = entry
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def _save(self, entries: list) -> None:
+        """Атомарно перезаписывает файл кэша."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"entries": entries}, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def summary(self) -> str:
+        """Короткая строка со статистикой для логов."""
+        return (
+            f"попаданий {self.stats.hits}, промахов {self.stats.misses}, "
+            f"не кэшируются {self.stats.skipped}, hit rate {self.stats.hit_rate:.0%}, "
+            f"записей {len(self._items)}"
+        )
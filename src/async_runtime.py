@@ -0,0 +1,352 @@
+"""Асинхронная среда выполнения конвейера StrongServer на asyncio."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .text_prep import split_sentences
+from .tracing import LLM_FIRST_TOKEN, LLM_LAST_TOKEN, SPEECH_END, STT_DONE, TurnTrace
+from .tts import SentenceSplitter
+
+if TYPE_CHECKING:
+    from .answer_cache import AnswerCache
+    from .conversation import Conversation, LLMStats
+    from .intents import IntentRouter
+    from .llm import OllamaClient
+    from .server import StrongServer
+
+# Исполнители блокирующих вызовов: по одному потоку на ресурс, потому что
+# микрофон и модели не рассчитаны на параллельные вызовы из нескольких потоков
+_EXECUTORS = ("capture", "stt", "synth", "play", "barge-in")
+# Исполнители звука: их потоки получают ядра этапа "audio" бюджета потоков
+_AUDIO_EXECUTORS = ("capture", "play", "barge-in")
+
+
+async def sentences_from_tokens(
+    tokens: AsyncIterator[str], trace: TurnTrace | None = None
+) -> AsyncIterator[str]:
+    """
+    Нарезает асинхронный поток токенов LLM на предложения по мере генерации.
+
+    Поток токенов закрывается в любом случае, в том числе при отмене задачи
+    или aclose() — для Ollama это закрывает HTTP-поток и останавливает генерацию.
+
+    Args:
+        tokens: Поток фрагментов ответа (например, OllamaClient.ask_stream_async)
+        trace: Трасса, в которой отмечаются первый и последний токен
+    """
+    splitter = SentenceSplitter()
+    try:
+        async for token in tokens:
+            if trace is not None:
+                trace.mark(LLM_FIRST_TOKEN)
+            for sentence in splitter.feed(token):
+                yield sentence
+        if trace is not None:
+            trace.mark(LLM_LAST_TOKEN)
+    finally:
+        await tokens.aclose()
+    tail = splitter.flush()
+    if tail:
+        yield tail
+
+
+async def text_sentences(text: str) -> AsyncIterator[str]:
+    """Предложения готового текста (ответ команды или кэша) как асинхронный поток."""
+    for sentence in split_sentences(text):
+        yield sentence
+
+
+async def llm_sentences(
+    llm: OllamaClient,
+    user_text: str,
+    conversation: Conversation,
+    trace: TurnTrace,
+    streaming: bool = True,
+) -> AsyncIterator[str]:
+    """
+    Предложения ответа LLM по мере генерации.
+
+    При streaming=False ответ печатается по токенам и отдаётся предложениями
+    только после конца генерации (озвучка начинается позже, но целиком).
+    """
+    tokens = llm.ask_stream_async(user_text, conversation)
+    if streaming:
+        async for sentence in sentences_from_tokens(tokens, trace):
+            yield sentence
+        return
+
+    answer: list[str] = []
+    try:
+        async for token in tokens:
+            trace.mark(LLM_FIRST_TOKEN)
+            print(token, end="", flush=True)
+            answer.append(token)
+        trace.mark(LLM_LAST_TOKEN)
+    finally:
+        await tokens.aclose()
+    print()
+    for sentence in split_sentences("".join(answer)):
+        yield sentence
+
+
+async def answer_turn(
+    text: str,
+    trace: TurnTrace,
+    speak: Callable[[AsyncIterator[str]], Awaitable[str]],
+    llm: OllamaClient,
+    conversation: Conversation,
+    intents: IntentRouter | None = None,
+    answers: AnswerCache | None = None,
+    streaming: bool = True,
+) -> LLMStats | None:
+    """
+    Отвечает на реплику: локальная команда, затем кэш ответов, затем LLM.
+
+    Общий для локального (AsyncRuntime) и сетевого (src.net_server) режимов:
+    ответ из кэша добавляется в историю разговора, а полный ответ LLM
+    сохраняется в кэш.
+
+    Args:
+        text: Распознанная реплика
+        trace: Трасса реплики (источник ответа и метрики LLM попадают в attrs)
+        speak: Озвучивает поток предложений и возвращает произнесённый текст
+        llm: Клиент Ollama
+        conversation: Разговор, в котором задан вопрос
+        intents: Маршрутизатор локальных команд (None — все реплики идут в LLM)
+        answers: Кэш ответов LLM (None — без кэша)
+        streaming: Озвучивать ответ LLM по мере генерации
+
+    Returns:
+        Метрики Ollama, если ответ дала модель и генерация завершилась, иначе None
+    """
+    match = intents.match(text) if intents is not None else None
+    cached = None
+    if match is None and answers is not None:
+        cached = answers.get(text, llm.model, llm.system_prompt)
+    if match is not None:
+        trace.attrs["intent"] = match.intent
+        print(f"[Intent] {match.intent}: {match.reply}\n")
+        sentences = text_sentences(match.reply)
+    elif cached is not None:
+        trace.attrs["answer_cache"] = "hit"
+        print(f"[Cache] Ответ из кэша ({answers.summary()}): {cached}\n")
+        conversation.add(text, cached)
+        sentences = text_sentences(cached)
+    else:
+        sentences = llm_sentences(llm, text, conversation, trace, streaming)
+
+    answer = await speak(sentences)
+    stats = None
+    if match is None and cached is None and conversation.last_stats.done:
+        stats = conversation.last_stats
+        trace.attrs.update(stats.as_attrs())
+        if answers is not None:
+            answers.put(text, llm.model, llm.system_prompt, answer)
+            # Запись файла кэша не должна задерживать захват и воспроизведение
+            await asyncio.to_thread(answers.flush)
+    if intents is not None:
+        intents.remember(answer)
+    return stats
+
+
+class StopRequested(Exception):
+    """Пользователь произнёс команду остановки."""
+
+
+@dataclass
+class Utterance:
+    """Записанная фраза, ожидающая распознавания."""
+
+    audio: Path | np.ndarray
+    trace: TurnTrace
+
+
+@dataclass
+class UserTurn:
+    """Распознанная реплика, ожидающая ответа."""
+
+    text: str
+    trace: TurnTrace
+
+
+class AsyncRuntime:
+    """
+    Конвейер реплики как набор задач asyncio, связанных очередями.
+
+    Этапы: запись → распознавание → ответ (LLM → синтез → воспроизведение).
+    Блокирующие вызовы (микрофон, Whisper, Silero, звук) выполняются в
+    однопоточных исполнителях, поток токенов Ollama читается через
+    AsyncClient. Противодавление явное: у каждой очереди ограниченный размер,
+    и этап, которому некуда положить результат, ждёт на put. Очередь
+    синтезированного аудио ограничена tts_lookahead, поэтому синтез не
+    уходит дальше, чем на lookahead предложений вперёд воспроизведения.
+
+    Запись полудуплексная: новая фраза слушается после ответа, чтобы
+    микрофон не записывал голос ассистента. Во время ответа микрофон
+    слушает только детектор перебивания (barge_in): при начале речи задача
+    ответа отменяется, а следующая запись начинается с этой речи.
+    """
+
+    def __init__(self, server: StrongServer, queue_size: int = 1):
+        """
+        Args:
+            server: Сервер с загруженными моделями и конфигурацией
+            queue_size: Вместимость очередей между этапами
+        """
+        self.server = server
+        self.queue_size = queue_size
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._listening: asyncio.Event | None = None
+
+    async def _call(self, executor: str, func, *args):
+        """Выполняет блокирующий вызов в исполнителе этапа, не блокируя цикл событий."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executors[executor], functools.partial(func, *args)
+        )
+
+    async def run(self) -> None:
+        """Запускает этапы и работает до команды остановки или отмены."""
+        threads = self.server.threads
+        self._executors = {
+            name: ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"rt-{name}",
+                initializer=threads.bind if name in _AUDIO_EXECUTORS and threads else None,
+                initargs=("audio",),
+            )
+            for name in _EXECUTORS
+        }
+        self._listening = asyncio.Event()
+        self._listening.set()
+        utterances: asyncio.Queue[Utterance] = asyncio.Queue(maxsize=self.queue_size)
+        turns: asyncio.Queue[UserTurn] = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [
+            asyncio.create_task(self._capture_stage(utterances), name="capture"),
+            asyncio.create_task(self._stt_stage(utterances, turns), name="stt"),
+            asyncio.create_task(self._reply_stage(turns), name="reply"),
+        ]
+        try:
+            # Этапы бесконечны: завершение любого из них — это остановка или ошибка
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        except StopRequested:
+            print("[Info] Завершаю работу по команде пользователя.")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.server.llm.aclose()
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _capture_stage(self, utterances: asyncio.Queue[Utterance]) -> None:
+        """Записывает фразы и передаёт их на распознавание."""
+        while True:
+            await self._listening.wait()
+            audio = await self._call("capture", self.server._capture)
+            if audio is None:
+                continue
+            trace = TurnTrace()
+            trace.mark(SPEECH_END)
+            self._listening.clear()
+            await utterances.put(Utterance(audio, trace))
+
+    async def _stt_stage(
+        self, utterances: asyncio.Queue[Utterance], turns: asyncio.Queue[UserTurn]
+    ) -> None:
+        """Распознаёт фразы и передаёт реплики на ответ."""
+        while True:
+            utterance = await utterances.get()
+            # Проверка «речь или нет» в потоке STT: несколько миллисекунд вместо Whisper
+            if not await self._call("stt", self.server._passes_gate, utterance.audio):
+                self._listening.set()
+                continue
+            try:
+                text = await self._call("stt", self.server._transcribe, utterance.audio)
+            finally:
+                if isinstance(utterance.audio, Path):
+                    with contextlib.suppress(OSError):
+                        utterance.audio.unlink()
+            utterance.trace.mark(STT_DONE)
+
+            if not text:
+                print("[Warn] Whisper не распознал текст. Повторите команду.\n")
+                self._listening.set()
+                continue
+
+            print(f"[User] Вы сказали: {text}")
+            if self.server._should_stop(text):
+                raise StopRequested
+            await turns.put(UserTurn(text, utterance.trace))
+
+    async def _reply_stage(self, turns: asyncio.Queue[UserTurn]) -> None:
+        """Отвечает на реплики; при перебивании отменяет текущий ответ."""
+        while True:
+            turn = await turns.get()
+            reply = asyncio.create_task(self._reply(turn), name="reply-turn")
+            finished = threading.Event()
+            watcher = None
+            if self.server.config.barge_in:
+                watcher = asyncio.create_task(self._watch_barge_in(reply, finished))
+            try:
+                await asyncio.wait({reply})
+            finally:
+                finished.set()
+                if not reply.done():
+                    reply.cancel()
+                    await asyncio.wait({reply})
+                if watcher is not None:
+                    await watcher
+
+            if reply.cancelled():
+                turn.trace.attrs["barge_in"] = True
+                print("[Barge-in] Ответ прерван пользователем, слушаю.\n")
+            else:
+                reply.result()
+            self.server._finish_trace(turn.trace)
+            self._listening.set()
+
+    async def _watch_barge_in(self, reply: asyncio.Task, finished: threading.Event) -> None:
+        """Отменяет ответ, если пользователь заговорил во время него."""
+        recorder = self.server.recorder
+        min_speech_ms = self.server.config.barge_in_min_speech_ms or 300.0
+        position = await self._call("barge-in", recorder.wait_for_speech, finished, min_speech_ms)
+        if position is not None and not reply.done():
+            recorder.resume_from(position)
+            reply.cancel()
+
+    async def _reply(self, turn: UserTurn) -> None:
+        """Формирует ответ (локальная команда, кэш или LLM) и озвучивает его."""
+        server = self.server
+
+        def speak(sentences: AsyncIterator[str]) -> Awaitable[str]:
+            return server.tts.speak_async(
+                sentences, server._gap_seconds(), on_event=turn.trace.mark, run=self._call
+            )
+
+        stats = await answer_turn(
+            turn.text,
+            turn.trace,
+            speak,
+            server.llm,
+            server.llm.conversation,
+            intents=server.intents,
+            answers=server.answers,
+            streaming=server.config.tts_streaming is not False,
+        )
+        print()
+        if stats is not None:
+            print(f"[LLM] {stats.summary()}")
@@ -0,0 +1,282 @@
+"""Постоянный поток вывода звука: предложения воспроизводятся без переоткрытия устройства."""
+
+from __future__ import annotations
+
+import collections
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class AudioOutput(ABC):
+    """
+    Долгоживущий вывод звука, в который дописываются отсчёты.
+
+    Устройство (или процесс плеера) открывается один раз, а предложения и
+    паузы между ними становятся отсчётами в одной очереди: пауза — это
+    тишина нужной длины, а не sleep в вызывающем потоке. play() возвращает
+    управление за lead_seconds до конца предложения, чтобы следующее успело
+    встать в очередь до того, как она опустеет, — так предложения идут без
+    зазоров на открытие устройства и планирование потоков.
+    """
+
+    def __init__(self, sample_rate: int, lead_seconds: float = 0.1):
+        """
+        Args:
+            sample_rate: Частота дискретизации отсчётов
+            lead_seconds: За сколько секунд до конца предложения play() возвращает управление
+        """
+        self.sample_rate = sample_rate
+        self.lead_seconds = lead_seconds
+
+    def play(
+        self,
+        audio: np.ndarray,
+        cancel: threading.Event | None = None,
+        gap_seconds: float = 0.0,
+    ) -> bool:
+        """
+        Ставит аудио в очередь и ждёт, пока оно почти доиграет.
+
+        Args:
+            audio: Моно-аудио float32
+            cancel: Событие, при установке которого очередь сбрасывается
+            gap_seconds: Тишина перед аудио (пауза между предложениями)
+
+        Returns:
+            False, если воспроизведение прервано через cancel
+        """
+        cancel = cancel or threading.Event()
+        audio = np.asarray(audio, dtype=np.float32)
+        gap = int(self.sample_rate * max(0.0, gap_seconds))
+        if gap:
+            audio = np.concatenate([np.zeros(gap, dtype=np.float32), audio])
+        self._write(audio)
+        while self.pending_seconds() > self.lead_seconds:
+            if cancel.wait(0.01):
+                self.clear()
+                return False
+        return not cancel.is_set()
+
+    @abstractmethod
+    def _write(self, audio: np.ndarray) -> None:
+        """Дописывает отсчёты в очередь вывода, не дожидаясь воспроизведения."""
+
+    @abstractmethod
+    def pending_seconds(self) -> float:
+        """Сколько секунд записанного аудио ещё не воспроизведено."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Отбрасывает всё, что ещё не воспроизведено."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Освобождает устройство или процесс плеера."""
+
+
+class SoundDeviceOutput(AudioOutput):
+    """
+    Вывод через один sounddevice.OutputStream на всё время работы.
+
+    Обратный вызов потока забирает отсчёты из очереди блоками; если очередь
+    пуста, он выдаёт тишину, и поток остаётся открытым.
+    """
+
+    def __init__(self, sample_rate: int, lead_seconds: float = 0.1, blocksize: int = 1024):
+        """
+        Args:
+            sample_rate: Частота дискретизации отсчётов
+            lead_seconds: За сколько секунд до конца предложения play() возвращает управление
+            blocksize: Размер блока обратного вызова, отсчётов
+        """
+        import sounddevice as sd
+
+        super().__init__(sample_rate, lead_seconds)
+        self._chunks: collections.deque[np.ndarray] = collections.deque()
+        self._offset = 0  # Сколько отсчётов первого фрагмента уже выдано
+        self._lock = threading.Lock()
+        self._written = 0
+        self._played = 0
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="float32",
+            blocksize=blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        """Заполняет блок вывода из очереди, остаток — тишиной."""
+        filled = 0
+        with self._lock:
+            while filled < frames and self._chunks:
+                chunk = self._chunks[0]
+                take = min(frames - filled, chunk.size - self._offset)
+                outdata[filled : filled + take, 0] = chunk[self._offset : self._offset + take]
+                filled += take
+                self._offset += take
+                if self._offset >= chunk.size:
+                    self._chunks.popleft()
+                    self._offset = 0
+            self._played += filled
+        outdata[filled:] = 0
+
+    def _write(self, audio: np.ndarray) -> None:
+        with self._lock:
+            self._chunks.append(audio)
+            self._written += audio.size
+
+    def pending_seconds(self) -> float:
+        return (self._written - self._played) / self.sample_rate
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chunks.clear()
+            self._offset = 0
+            self._played = self._written
+
+    def close(self) -> None:
+        """Даёт доиграть записанное (не дольше его длительности плюс секунда) и закрывает поток."""
+        deadline = time.perf_counter() + self.pending_seconds() + 1.0
+        while self.pending_seconds() > 0 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        self.clear()
+        self._stream.stop()
+        self._stream.close()
+
+
+def player_command(sample_rate: int) -> list[str] | None:
+    """
+    Команда системного плеера, читающего PCM16 моно из stdin (None, если плеера нет).
+
+    Args:
+        sample_rate: Частота дискретизации потока
+    """
+    rate = str(sample_rate)
+    candidates = [
+        ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", rate],
+        # Демультиплексор s16le по умолчанию читает моно
+        ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+        + ["-f", "s16le", "-sample_rate", rate, "-i", "-"],
+        ["play", "-q", "-t", "raw", "-e", "signed", "-b", "16", "-c", "1", "-r", rate, "-"],
+    ]
+    if not sys.platform.startswith("linux"):
+        candidates = candidates[1:]  # aplay есть только в ALSA
+    for command in candidates:
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+class PipeOutput(AudioOutput):
+    """
+    Вывод через один процесс системного плеера, которому отсчёты пишутся в stdin.
+
+    Запись в канал идёт из отдельного потока, поэтому play() не блокируется на
+    заполненном буфере канала. Момент воспроизведения плеер не сообщает,
+    поэтому он оценивается по часам: аудио звучит в реальном времени с
+    момента записи. Сброс очереди завершает процесс плеера (звук в его буфере
+    иначе не остановить), а следующая запись запускает новый.
+    """
+
+    def __init__(self, sample_rate: int, command: list[str], lead_seconds: float = 0.1):
+        """
+        Args:
+            sample_rate: Частота дискретизации отсчётов
+            command: Команда плеера (см. player_command)
+            lead_seconds: За сколько секунд до конца предложения play() возвращает управление
+        """
+        super().__init__(sample_rate, lead_seconds)
+        self.command = command
+        self._process: subprocess.Popen | None = None
+        self._queue: queue.Queue[bytes | None] | None = None
+        self._end_time = 0.0
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        """Запускает процесс плеера и поток, пишущий в его stdin."""
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self._queue = queue.Queue()
+        threading.Thread(
+            target=self._feed, args=(self._process, self._queue), name="audio-pipe", daemon=True
+        ).start()
+
+    @staticmethod
+    def _feed(process: subprocess.Popen, chunks: queue.Queue[bytes | None]) -> None:
+        """Пишет фрагменты в stdin плеера до None или до завершения процесса."""
+        try:
+            while (chunk := chunks.get()) is not None:
+                process.stdin.write(chunk)
+                process.stdin.flush()
+            process.stdin.close()
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # Плеер завершён (сброс очереди или закрытие)
+
+    def _write(self, audio: np.ndarray) -> None:
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            now = time.perf_counter()
+            self._end_time = max(now, self._end_time) + audio.size / self.sample_rate
+            self._queue.put(pcm)
+
+    def pending_seconds(self) -> float:
+        return max(0.0, self._end_time - time.perf_counter())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stop_process(kill=True)
+            self._end_time = 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop_process(kill=False)
+
+    def _stop_process(self, kill: bool) -> None:
+        """Останавливает плеер: сразу (kill) или дав ему доиграть записанное."""
+        if self._process is None:
+            return
+        self._queue.put(None)
+        if kill:
+            self._process.kill()
+        try:
+            self._process.wait(timeout=max(1.0, self.pending_seconds() + 1.0))
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self._process = None
+        self._queue = None
+
+
+def create_output(sample_rate: int) -> AudioOutput | None:
+    """
+    Открывает постоянный вывод звука: sounddevice, иначе процесс системного плеера.
+
+    Args:
+        sample_rate: Частота дискретизации
+
+    Returns:
+        Вывод или None, если нет ни звукового устройства, ни плеера с чтением из stdin
+    """
+    try:
+        return SoundDeviceOutput(sample_rate)
+    except Exception as exc:
+        print(f"[Audio] sounddevice недоступен ({exc}), пробую системный плеер.")
+    command = player_command(sample_rate)
+    if command is None:
+        return None
+    print(f"[Audio] Вывод через {command[0]}.")
+    return PipeOutput(sample_rate, command)
@@ -12,18 +12,68 @@ from src.prompts import get_prompt
 @dataclass
 class AppConfig:
     ollama_model: str | None = None
+    ollama_keep_alive: str | int | None = None  # Сколько Ollama держит модель после запроса
+    ollama_host: str | None = None  # Адрес сервера Ollama (None — OLLAMA_HOST или локальный)
+    ollama_timeout: float | None = None  # Таймаут соединения и ожидания фрагмента, с
+    ollama_retries: int | None = None  # Повторы запроса при сбое до первого фрагмента
+    ollama_num_ctx: int | None = None  # Размер контекста модели, токенов
+    ollama_num_thread: int | None = None  # Потоков CPU у Ollama (None — решает Ollama)
+    ollama_num_predict: int | None = None  # Максимальная длина ответа, токенов
+    ollama_stop: list[str] | None = None  # Стоп-последовательности генерации
+    llm_history_tokens: int | None = None  # Бюджет истории диалога, токенов (0 — без памяти)
+    answer_cache_size: int | None = None  # Сколько ответов LLM кэшировать (0 — без кэша)
+    answer_cache_ttl_hours: float | None = None  # Срок жизни ответа в кэше, часов
+    answer_cache_path: str | None = None  # JSON-файл кэша ответов (None — только память)
+    answer_cache_exclude: list[str] | None = None  # Регулярные выражения вопросов без кэша
     whisper_model: str | None = None
+    stt_backend: str | None = None  # Движок STT: whisper или whisper-int8 (см. src/stt_backends.py)
+    stt_streaming: bool | None = None  # Распознавать фразу по частям, пока пользователь говорит
+    stt_stream_interval: float | None = None  # Период фоновых проходов Whisper, с
+    stt_idle_unload_seconds: float | None = None  # Выгружать Whisper после простоя, с
     tts_model: str | None = None
+    tts_batch_chars: int | None = None  # Бюджет символов пакетного синтеза (0 — по одному)
+    tts_idle_unload_seconds: float | None = None  # Выгружать Silero после простоя, с
     tts_speed: float | None = None
     tts_volume: float | None = None
     tts_sample_rate: int | None = None
     tts_gap_seconds: float | None = None
+    tts_streaming: bool | None = None  # Озвучивать ответ по мере генерации LLM
+    tts_lookahead: int | None = None  # Сколько предложений синтезировать наперёд
+    tts_max_chunk_chars: int | None = None  # Максимальная длина куска текста для синтеза
+    tts_cache_mb: float | None = None  # Бюджет памяти кэша аудио TTS, МБ (0 — отключить)
+    tts_cache_dir: str | None = None  # Каталог для кэша аудио TTS на диске
     system_prompt: str | None = None
+    barge_in: bool | None = None  # Прерывать ответ, когда пользователь начинает говорить
+    barge_in_min_speech_ms: float | None = None  # Длительность речи для перебивания, мс
+    local_intents: bool | None = None  # Отвечать на простые команды (время, дата, повтор) без LLM
+    startup_warmup: bool | None = None  # Прогревать модели пробным инференсом при запуске
+    snapshot_dir: str | None = None  # Каталог снимков моделей для быстрого запуска (None — выкл.)
+    cpu_stt_threads: int | None = None  # Потоков PyTorch для Whisper (см. src/threads.py)
+    cpu_tts_threads: int | None = None  # Потоков PyTorch для Silero
+    cpu_audio_cores: int | None = None  # Ядер, не отдаваемых моделям (запись и воспроизведение)
+    cpu_pin_stages: bool | None = None  # Закреплять этапы за своими ядрами (Linux)
+    trace_path: str | None = None  # JSONL-файл для трасс задержек по репликам
+    trace_max_mb: float | None = None  # Размер файла трасс до ротации, МБ
+    trace_backups: int | None = None  # Сколько ротированных файлов трасс хранить
+    net_host: str | None = None  # Адрес сетевого режима (python main.py --serve)
+    net_port: int | None = None  # Порт сетевого режима
+    net_stt_batch: int | None = None  # Максимальный размер батча Whisper в сетевом режиме
+    net_stt_batch_wait_ms: float | None = None  # Ожидание добора батча Whisper, мс
+    net_client_queue: int | None = None  # Необработанных реплик на клиента до ответа 429
+    net_session_idle_seconds: float | None = None  # Простой клиента до удаления сессии, с
     recorder_sample_rate: int | None = None
     recorder_chunk: int | None = None
     recorder_silence_threshold: int | None = None
     recorder_silence_duration: float | None = None
     recorder_max_recording: float | None = None
+    recorder_preroll_ms: float | None = None  # Аудио до начала речи, добавляемое к фразе
+    recorder_vad: str | None = None  # Реализация VAD: 'adaptive' или 'energy'
+    recorder_vad_onset_ms: float | None = None
+    recorder_vad_hangover_ms: float | None = None
+    recorder_vad_snr_db: float | None = None
+    speech_gate: bool | None = None  # Отсеивать фразы без речи до вызова Whisper
+    speech_gate_min_speech_ms: float | None = None  # Минимальная длительность звука фразы, мс
+    recorder_use_wav_file: bool | None = None  # Передавать фразу в STT через WAV (отладка)
 
     @classmethod
     def from_file(cls, config_path: Path | str) -> AppConfig:
@@ -37,18 +87,68 @@ class AppConfig:
 
         return cls(
             ollama_model=data.get("ollama_model"),
+            ollama_keep_alive=data.get("ollama_keep_alive"),
+            ollama_host=data.get("ollama_host"),
+            ollama_timeout=data.get("ollama_timeout"),
+            ollama_retries=data.get("ollama_retries"),
+            ollama_num_ctx=data.get("ollama_num_ctx"),
+            ollama_num_thread=data.get("ollama_num_thread"),
+            ollama_num_predict=data.get("ollama_num_predict"),
+            ollama_stop=data.get("ollama_stop"),
+            llm_history_tokens=data.get("llm_history_tokens"),
+            answer_cache_size=data.get("answer_cache_size"),
+            answer_cache_ttl_hours=data.get("answer_cache_ttl_hours"),
+            answer_cache_path=data.get("answer_cache_path"),
+            answer_cache_exclude=data.get("answer_cache_exclude"),
             whisper_model=data.get("whisper_model"),
+            stt_backend=data.get("stt_backend"),
+            stt_streaming=data.get("stt_streaming"),
+            stt_stream_interval=data.get("stt_stream_interval"),
+            stt_idle_unload_seconds=data.get("stt_idle_unload_seconds"),
             tts_model=data.get("tts_model"),
+            tts_batch_chars=data.get("tts_batch_chars"),
+            tts_idle_unload_seconds=data.get("tts_idle_unload_seconds"),
             tts_speed=data.get("tts_speed"),
             tts_volume=data.get("tts_volume"),
             tts_sample_rate=data.get("tts_sample_rate"),
             tts_gap_seconds=data.get("tts_gap_seconds"),
+            tts_streaming=data.get("tts_streaming"),
+            tts_lookahead=data.get("tts_lookahead"),
+            tts_max_chunk_chars=data.get("tts_max_chunk_chars"),
+            tts_cache_mb=data.get("tts_cache_mb"),
+            tts_cache_dir=data.get("tts_cache_dir"),
             system_prompt=data.get("system_prompt"),
+            barge_in=data.get("barge_in"),
+            barge_in_min_speech_ms=data.get("barge_in_min_speech_ms"),
+            local_intents=data.get("local_intents"),
+            startup_warmup=data.get("startup_warmup"),
+            snapshot_dir=data.get("snapshot_dir"),
+            cpu_stt_threads=data.get("cpu_stt_threads"),
+            cpu_tts_threads=data.get("cpu_tts_threads"),
+            cpu_audio_cores=data.get("cpu_audio_cores"),
+            cpu_pin_stages=data.get("cpu_pin_stages"),
+            trace_path=data.get("trace_path"),
+            trace_max_mb=data.get("trace_max_mb"),
+            trace_backups=data.get("trace_backups"),
+            net_host=data.get("net_host"),
+            net_port=data.get("net_port"),
+            net_stt_batch=data.get("net_stt_batch"),
+            net_stt_batch_wait_ms=data.get("net_stt_batch_wait_ms"),
+            net_client_queue=data.get("net_client_queue"),
+            net_session_idle_seconds=data.get("net_session_idle_seconds"),
             recorder_sample_rate=data.get("recorder_sample_rate"),
             recorder_chunk=data.get("recorder_chunk"),
             recorder_silence_threshold=data.get("recorder_silence_threshold"),
             recorder_silence_duration=data.get("recorder_silence_duration"),
             recorder_max_recording=data.get("recorder_max_recording"),
+            recorder_preroll_ms=data.get("recorder_preroll_ms"),
+            recorder_vad=data.get("recorder_vad"),
+            recorder_vad_onset_ms=data.get("recorder_vad_onset_ms"),
+            recorder_vad_hangover_ms=data.get("recorder_vad_hangover_ms"),
+            recorder_vad_snr_db=data.get("recorder_vad_snr_db"),
+            speech_gate=data.get("speech_gate"),
+            speech_gate_min_speech_ms=data.get("speech_gate_min_speech_ms"),
+            recorder_use_wav_file=data.get("recorder_use_wav_file"),
         )
 
     @classmethod
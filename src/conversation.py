@@ -0,0 +1,169 @@
+"""История диалога с LLM в пределах бюджета токенов и стабильным префиксом промпта."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Грубая оценка для русского текста в токенизаторах Llama/Qwen: ~3 символа на токен
+CHARS_PER_TOKEN = 3.0
+# При переполнении история сокращается до этой доли бюджета, а не на одну реплику
+EVICT_TO = 0.5
+# Сколько символов вопроса пользователя попадает в краткое содержание
+NOTE_CHARS = 80
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценка числа токенов текста без токенизатора модели."""
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+@dataclass
+class LLMStats:
+    """Метаданные ответа Ollama за одну реплику (длительности в мс)."""
+
+    done: bool = False  # Ответ пришёл целиком (иначе метаданных нет)
+    prompt_eval_tokens: int = 0  # Токены промпта, которые Ollama вычислила заново
+    prompt_eval_ms: float = 0.0
+    eval_tokens: int = 0  # Сгенерированные токены
+    eval_ms: float = 0.0
+    load_ms: float = 0.0  # Загрузка модели в память (0, если она уже загружена)
+    prompt_tokens_est: int = 0  # Оценка размера всего промпта, токенов
+    history_turns: int = 0  # Сколько прошлых реплик было в промпте
+
+    @classmethod
+    def from_response(cls, chunk, prompt_tokens_est: int, history_turns: int) -> LLMStats:
+        """
+        Собирает метрики из последнего фрагмента ответа Ollama (done=True).
+
+        Args:
+            chunk: Ответ или последний фрагмент потока ollama.chat
+            prompt_tokens_est: Оценка размера промпта
+            history_turns: Число прошлых реплик в промпте
+        """
+        return cls(
+            done=True,
+            prompt_eval_tokens=chunk.get("prompt_eval_count") or 0,
+            prompt_eval_ms=(chunk.get("prompt_eval_duration") or 0) / 1e6,
+            eval_tokens=chunk.get("eval_count") or 0,
+            eval_ms=(chunk.get("eval_duration") or 0) / 1e6,
+            load_ms=(chunk.get("load_duration") or 0) / 1e6,
+            prompt_tokens_est=prompt_tokens_est,
+            history_turns=history_turns,
+        )
+
+    @property
+    def reused_ratio(self) -> float:
+        """Оценка доли промпта, взятой из кэша Ollama (не вычисленной заново)."""
+        if self.prompt_tokens_est <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.prompt_eval_tokens / self.prompt_tokens_est)
+
+    def summary(self) -> str:
+        """Однострочная сводка для консоли."""
+        return (
+            f"промпт {self.prompt_eval_tokens} ток. за {self.prompt_eval_ms:.0f} мс "
+            f"(из ~{self.prompt_tokens_est}, история {self.history_turns} реплик), "
+            f"ответ {self.eval_tokens} ток. за {self.eval_ms:.0f} мс"
+        )
+
+    def as_attrs(self) -> dict[str, float | int]:
+        """Поля для TurnTrace.attrs (попадают в JSONL трасс)."""
+        return {
+            "llm_prompt_eval_tokens": self.prompt_eval_tokens,
+            "llm_prompt_eval_ms": round(self.prompt_eval_ms, 2),
+            "llm_prompt_tokens_est": self.prompt_tokens_est,
+            "llm_history_turns": self.history_turns,
+            "llm_eval_tokens": self.eval_tokens,
+        }
+
+
+class Conversation:
+    """
+    История диалога одного пользователя для /api/chat.
+
+    Промпт собирается так, чтобы его начало менялось как можно реже: системный
+    промпт, затем прошлые реплики в исходном порядке и только в конце новый
+    вопрос. Тогда Ollama находит в своём кэше общий префикс с прошлым запросом
+    и вычисляет заново лишь последний ответ и новый вопрос.
+
+    История ограничена бюджетом токенов. При переполнении старые реплики
+    вытесняются не по одной (это сдвигало бы префикс каждую реплику), а сразу
+    до EVICT_TO бюджета; следующие реплики снова дописываются к стабильному
+    префиксу. Вытесненные вопросы пользователя остаются в кратком содержании
+    в конце системного промпта.
+    """
+
+    def __init__(self, system_prompt: str | None = None, max_tokens: int = 2048):
+        """
+        Args:
+            system_prompt: Системный промпт
+            max_tokens: Бюджет истории в токенах (0 — без истории, каждый вопрос отдельно)
+        """
+        self.system_prompt = system_prompt
+        self.max_tokens = max(0, max_tokens)
+        self.turns: list[tuple[str, str]] = []
+        self.notes: list[str] = []  # Краткое содержание вытесненных реплик
+        self.last_stats = LLMStats()
+
+    def _system_content(self) -> str | None:
+        if not self.notes:
+            return self.system_prompt
+        summary = "Ранее в разговоре пользователь спрашивал: " + "; ".join(self.notes) + "."
+        return f"{self.system_prompt}\n\n{summary}" if self.system_prompt else summary
+
+    def messages(self, user_text: str) -> list[dict[str, str]]:
+        """
+        Сообщения для запроса: системный промпт, история и новый вопрос.
+
+        Args:
+            user_text: Текст пользователя
+        """
+        messages = []
+        system = self._system_content()
+        if system:
+            messages.append({"role": "system", "content": system})
+        for question, answer in self.turns:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        messages.append({"role": "user", "content": user_text})
+        return messages
+
+    def prompt_tokens(self, user_text: str = "") -> int:
+        """Оценка размера промпта в токенах."""
+        return sum(estimate_tokens(m["content"]) for m in self.messages(user_text))
+
+    def add(self, user_text: str, answer: str) -> None:
+        """
+        Запоминает завершённую (или прерванную) реплику.
+
+        Args:
+            user_text: Вопрос пользователя
+            answer: Ответ модели — ровно тот текст, что она сгенерировала
+        """
+        answer = answer.strip()
+        if self.max_tokens <= 0 or not answer:
+            return
+        self.turns.append((user_text, answer))
+        if self.prompt_tokens() > self.max_tokens:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Вытесняет старые реплики до EVICT_TO бюджета, сохраняя их краткое содержание."""
+        target = self.max_tokens * EVICT_TO
+        while self.turns and self.prompt_tokens() > target:
+            question, _ = self.turns.pop(0)
+            note = " ".join(question.split())
+            if len(note) > NOTE_CHARS:
+                note = note[:NOTE_CHARS].rstrip() + "…"
+            self.notes.append(note)
+            # Краткое содержание тоже ограничено: не больше четверти бюджета
+            while len(self.notes) > 1 and (
+                estimate_tokens("; ".join(self.notes)) > self.max_tokens // 4
+            ):
+                self.notes.pop(0)
+        print(f"[LLM] История сокращена до {len(self.turns)} реплик (~{self.prompt_tokens()} ток.)")
+
+    def clear(self) -> None:
+        """Начинает разговор заново."""
+        self.turns.clear()
+        self.notes.clear()
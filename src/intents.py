@@ -0,0 +1,212 @@
+"""Локальные команды, на которые ассистент отвечает без обращения к LLM."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Слова-паразиты и вежливые обращения, которые не меняют смысл команды
+_FILLER_WORDS = {"а", "ну", "слушай", "скажи", "подскажи", "пожалуйста", "мне"}
+
+_HOUR_FORMS = ("час", "часа", "часов")
+_MINUTE_FORMS = ("минута", "минуты", "минут")
+_UNITS = (
+    "ноль", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять",
+    "десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать", "пятнадцать",
+    "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать",
+)
+_TENS = ("", "", "двадцать", "тридцать", "сорок", "пятьдесят")
+_ORDINALS = (
+    "", "первое", "второе", "третье", "четвёртое", "пятое", "шестое", "седьмое", "восьмое",
+    "девятое", "десятое", "одиннадцатое", "двенадцатое", "тринадцатое", "четырнадцатое",
+    "пятнадцатое", "шестнадцатое", "семнадцатое", "восемнадцатое", "девятнадцатое", "двадцатое",
+)
+_WEEKDAYS = ("понедельник", "вторник", "среда", "четверг", "пятница", "суббота", "воскресенье")
+_MONTHS = (
+    "января", "февраля", "марта", "апреля", "мая", "июня",
+    "июля", "августа", "сентября", "октября", "ноября", "декабря",
+)
+
+
+def normalize_command(text: str) -> str:
+    """
+    Приводит распознанную фразу к виду для сопоставления с шаблонами.
+
+    Нижний регистр, «ё» → «е», без знаков препинания и слов-паразитов.
+
+    Args:
+        text: Текст от Whisper
+
+    Returns:
+        Нормализованная строка из слов через один пробел
+    """
+    text = text.lower().replace("ё", "е")
+    words = re.findall(r"[a-zа-я0-9]+", text)
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def _plural(number: int, forms: tuple[str, str, str]) -> str:
+    """Форма слова для числа: 1 час, 2 часа, 5 часов."""
+    if number % 10 == 1 and number % 100 != 11:
+        return forms[0]
+    if 2 <= number % 10 <= 4 and not 12 <= number % 100 <= 14:
+        return forms[1]
+    return forms[2]
+
+
+def number_to_words(number: int, feminine: bool = False) -> str:
+    """Число от 0 до 59 прописью (feminine — «одна», «две» для женского рода)."""
+    if number < 20:
+        word = _UNITS[number]
+    else:
+        tens, units = divmod(number, 10)
+        word = _TENS[tens] + (f" {_UNITS[units]}" if units else "")
+    if feminine:
+        word = re.sub(r"\bодин$", "одна", word)
+        word = re.sub(r"\bдва$", "две", word)
+    return word
+
+
+def say_time(now: datetime) -> str:
+    """Текущее время прописью, чтобы TTS не читал цифры."""
+    hours = f"{number_to_words(now.hour)} {_plural(now.hour, _HOUR_FORMS)}"
+    if now.minute == 0:
+        return f"Сейчас ровно {hours}."
+    minute_words = number_to_words(now.minute, feminine=True)
+    minutes = f"{minute_words} {_plural(now.minute, _MINUTE_FORMS)}"
+    return f"Сейчас {hours} {minutes}."
+
+
+def say_date(now: datetime) -> str:
+    """Сегодняшняя дата прописью: день недели, число и месяц."""
+    day = now.day
+    if day <= 20:
+        ordinal = _ORDINALS[day]
+    elif day % 10 == 0:
+        ordinal = "тридцатое"
+    else:
+        ordinal = f"{_TENS[day // 10]} {_ORDINALS[day % 10]}"
+    return f"Сегодня {_WEEKDAYS[now.weekday()]}, {ordinal} {_MONTHS[now.month - 1]}."
+
+
+@dataclass
+class Intent:
+    """Локальная команда: шаблоны фраз и ответ."""
+
+    name: str
+    patterns: list[re.Pattern]
+    reply: str | None = None  # Неизменный ответ (его аудио можно синтезировать заранее)
+    handler: Callable[[IntentRouter], str] | None = None  # Ответ, вычисляемый при вызове
+
+    def respond(self, router: IntentRouter) -> str:
+        """Возвращает текст ответа."""
+        if self.handler is not None:
+            return self.handler(router)
+        return self.reply or ""
+
+
+@dataclass
+class IntentMatch:
+    """Результат сопоставления фразы с локальной командой."""
+
+    intent: str
+    reply: str
+
+
+@dataclass
+class IntentRouter:
+    """
+    Реестр локальных команд.
+
+    Фраза сопоставляется с шаблонами целиком после normalize_command, поэтому
+    «который час» обрабатывается локально, а «который час в Токио» уходит в LLM.
+    """
+
+    clock: Callable[[], datetime] = datetime.now
+    intents: list[Intent] = field(default_factory=list)
+    last_answer: str = ""  # Последний озвученный ответ (для команды «повтори»)
+
+    def register(
+        self,
+        name: str,
+        patterns: list[str],
+        reply: str | None = None,
+        handler: Callable[[IntentRouter], str] | None = None,
+    ) -> None:
+        """
+        Регистрирует команду.
+
+        Args:
+            name: Имя команды (попадает в логи и трассы)
+            patterns: Регулярные выражения по нормализованному тексту (совпадение целиком)
+            reply: Неизменный ответ
+            handler: Функция, вычисляющая ответ; имеет приоритет над reply
+        """
+        if reply is None and handler is None:
+            raise ValueError(f"Команде '{name}' нужен reply или handler.")
+        compiled = [re.compile(pattern) for pattern in patterns]
+        self.intents.append(Intent(name, compiled, reply=reply, handler=handler))
+
+    def match(self, text: str) -> IntentMatch | None:
+        """
+        Ищет команду для распознанной фразы.
+
+        Args:
+            text: Текст от Whisper
+
+        Returns:
+            Команда и ответ либо None, если фразу нужно отправить в LLM
+        """
+        normalized = normalize_command(text)
+        if not normalized:
+            return None
+        for intent in self.intents:
+            if any(pattern.fullmatch(normalized) for pattern in intent.patterns):
+                return IntentMatch(intent.name, intent.respond(self))
+        return None
+
+    def remember(self, answer: str) -> None:
+        """Запоминает озвученный ответ, чтобы его можно было повторить."""
+        if answer.strip():
+            self.last_answer = answer.strip()
+
+    def canned_replies(self) -> list[str]:
+        """Неизменные ответы — их аудио стоит синтезировать при запуске."""
+        return [intent.reply for intent in self.intents if intent.reply and not intent.handler]
+
+
+def _repeat(router: IntentRouter) -> str:
+    return router.last_answer or "Мне пока нечего повторить."
+
+
+def create_default_router(clock: Callable[[], datetime] = datetime.now) -> IntentRouter:
+    """Создаёт маршрутизатор со встроенными командами: время, дата, повтор, приветствие."""
+    router = IntentRouter(clock=clock)
+    router.register(
+        "time",
+        [r"(который|сколько) (сейчас )?(час|времени)", r"сколько время"],
+        handler=lambda r: say_time(r.clock()),
+    )
+    router.register(
+        "date",
+        [
+            r"какое (сегодня |сейчас )?число( сегодня)?",
+            r"какой (сегодня )?день( недели)?( сегодня)?",
+            r"какая (сегодня )?дата( сегодня)?",
+        ],
+        handler=lambda r: say_date(r.clock()),
+    )
+    router.register(
+        "repeat",
+        [r"повтори( еще раз)?", r"что ты сказала?", r"еще раз"],
+        handler=_repeat,
+    )
+    router.register(
+        "greeting",
+        [r"привет", r"здравствуй(те)?", r"добрый (день|вечер)", r"доброе утро"],
+        reply="Привет! Чем могу помочь?",
+    )
+    router.register("thanks", [r"спасибо( большое)?", r"благодарю"], reply="Пожалуйста!")
+    return router
@@ -2,17 +2,54 @@
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
 import ollama
 
+from .conversation import Conversation, LLMStats
+
+# Параметры генерации по умолчанию; options из config.json их перекрывают
+DEFAULT_OPTIONS = {
+    "temperature": 0.7,
+    # Ограничение длины ответа: без него модель может «разговориться», а TTS зачитает всё
+    "num_predict": 512,
+}
+
+
+def _retryable(exc: BaseException) -> bool:
+    """Сбой, после которого запрос имеет смысл повторить (сеть, таймаут, перегрузка)."""
+    if isinstance(exc, ollama.ResponseError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return isinstance(exc, (ConnectionError, httpx.TransportError))
+
 
 class OllamaClient:
-    """Лёгкая обёртка над python-API Ollama."""
+    """
+    Клиент Ollama на собственных ollama.Client/AsyncClient.
+
+    Клиенты живут столько же, сколько OllamaClient, поэтому HTTP-соединение
+    с сервером Ollama переиспользуется между репликами, а не открывается
+    заново. Запрос повторяется при сетевой ошибке, таймауте или ответе 5xx,
+    но только пока не пришёл первый фрагмент ответа: повтор после начала
+    озвучки продублировал бы уже сказанное.
+    """
 
     def __init__(
         self,
         model: str,
         system_prompt: str | None = None,
-        keep_alive: str = "2m",
+        keep_alive: str | int = "2m",
+        history_tokens: int = 2048,
+        host: str | None = None,
+        timeout: float | None = 120.0,
+        options: dict | None = None,
+        retries: int = 2,
+        retry_delay: float = 0.5,
     ):
         """
         Инициализирует клиент Ollama.
@@ -22,10 +59,221 @@ class OllamaClient:
             system_prompt: Системный промпт для модели
             keep_alive: Время хранения модели в памяти после последнего использования
                         (например, "5m", "10m", "30m"). Ускоряет последующие запросы.
+            history_tokens: Бюджет истории диалога в токенах (0 — без памяти о прошлых
+                            репликах)
+            host: Адрес сервера Ollama (None — OLLAMA_HOST или http://127.0.0.1:11434)
+            timeout: Таймаут соединения и ожидания очередного фрагмента, с (None — без него)
+            options: Параметры генерации Ollama поверх DEFAULT_OPTIONS
+                     (num_ctx, num_thread, num_predict, stop, temperature...)
+            retries: Сколько раз повторять запрос после сбоя до первого фрагмента
+            retry_delay: Пауза перед первым повтором, с (дальше удваивается)
         """
         self.model = model
         self.system_prompt = system_prompt
         self.keep_alive = keep_alive
+        self.history_tokens = history_tokens
+        self.host = host
+        self.timeout = timeout
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        # Разговор по умолчанию (локальный режим); сетевой режим ведёт свой на клиента
+        self.conversation = self.new_conversation()
+        # Метрики Ollama последнего ответа (prompt eval, генерация)
+        self.last_stats = LLMStats()
+        self._client = ollama.Client(host=host, timeout=timeout)
+        self._async_client: ollama.AsyncClient | None = None
+
+    def new_conversation(self) -> Conversation:
+        """Новый разговор с системным промптом и бюджетом истории этого клиента."""
+        return Conversation(self.system_prompt, self.history_tokens)
+
+    def warmup(self) -> bool:
+        """
+        Загружает модель в память Ollama и прогоняет системный промпт.
+
+        Без этого модель загружается только при первом вопросе пользователя.
+        Генерируется один токен, так что системный промпт заодно попадает
+        в кэш промптов Ollama.
+
+        Returns:
+            True, если сервер Ollama ответил
+        """
+        try:
+            self._client.chat(
+                model=self.model,
+                messages=self.conversation.messages("."),
+                keep_alive=self.keep_alive,
+                # Те же num_ctx и num_thread, что у реплик: иначе Ollama перезагрузит модель
+                options={**self.options, "num_predict": 1},
+            )
+        except Exception as exc:  # noqa: BLE001 - недоступность Ollama не должна мешать запуску
+            print(f"[LLM] Не удалось прогреть модель Ollama: {exc}")
+            return False
+        return True
+
+    def _request(self, user_text: str, stream: bool, conversation: Conversation) -> dict:
+        """Параметры запроса /api/chat (общие для синхронного и асинхронного клиента)."""
+        return {
+            "model": self.model,
+            "messages": conversation.messages(user_text),
+            "stream": stream,
+            "keep_alive": self.keep_alive,  # Держит модель в памяти для ускорения
+            "options": self.options,
+        }
+
+    def _retry_pause(self, attempt: int, exc: BaseException) -> float | None:
+        """Пауза перед повтором после сбоя (None — повторять нельзя, исключение пробрасывается)."""
+        if attempt >= self.retries or not _retryable(exc):
+            return None
+        delay = self.retry_delay * 2**attempt
+        print(
+            f"[LLM] Ollama не ответила ({exc}), повтор {attempt + 1}/{self.retries} "
+            f"через {delay:.1f} с"
+        )
+        return delay
+
+    def _chat(self, user_text: str, conversation: Conversation):
+        """Запрос без потока с повторами; возвращает ответ Ollama целиком."""
+        print("[LLM] Ollama думает...")
+        request = self._request(user_text, False, conversation)
+        for attempt in itertools.count():
+            try:
+                return self._client.chat(**request)
+            except Exception as exc:
+                delay = self._retry_pause(attempt, exc)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def _open_stream(self, user_text: str, conversation: Conversation) -> Iterator:
+        """Открывает поток ответа; до первого фрагмента сбой приводит к повтору запроса."""
+        print("[LLM] Ollama думает...")
+        request = self._request(user_text, True, conversation)
+        for attempt in itertools.count():
+            # Генератор ollama отправляет запрос при первом next()
+            stream = self._client.chat(**request)
+            try:
+                first = next(stream, None)
+            except Exception as exc:
+                stream.close()
+                delay = self._retry_pause(attempt, exc)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
+                return _Stream(first, stream)
+
+    async def _open_stream_async(self, user_text: str, conversation: Conversation):
+        """Асинхронный вариант _open_stream."""
+        if self._async_client is None:
+            # Клиент создаётся лениво: его соединения привязаны к циклу событий
+            self._async_client = ollama.AsyncClient(host=self.host, timeout=self.timeout)
+        print("[LLM] Ollama думает...")
+        request = self._request(user_text, True, conversation)
+        for attempt in itertools.count():
+            stream = await self._async_client.chat(**request)
+            try:
+                first = await anext(stream, None)
+            except Exception as exc:
+                await stream.aclose()
+                delay = self._retry_pause(attempt, exc)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                return first, stream
+
+    def _begin(self, user_text: str, conversation: Conversation) -> tuple[int, int]:
+        """Сбрасывает метрики перед запросом; возвращает оценку промпта и длину истории."""
+        conversation.last_stats = self.last_stats = LLMStats()
+        return conversation.prompt_tokens(user_text), len(conversation.turns)
+
+    def _finish(self, chunk, conversation: Conversation, prompt: tuple[int, int]) -> None:
+        """Записывает метрики Ollama из последнего фрагмента ответа."""
+        stats = LLMStats.from_response(chunk, *prompt)
+        conversation.last_stats = self.last_stats = stats
+
+    def ask_stream(
+        self,
+        user_text: str,
+        echo: bool = True,
+        cancel: threading.Event | None = None,
+        conversation: Conversation | None = None,
+    ) -> Iterator[str]:
+        """
+        Отправляет запрос в модель и отдаёт ответ по мере генерации.
+
+        Реплика (в том числе прерванная) записывается в историю разговора.
+
+        Args:
+            user_text: Текст пользователя
+            echo: Печатать токены в консоль по мере поступления
+            cancel: Событие отмены: при его установке HTTP-поток закрывается,
+                    и Ollama прекращает генерацию
+            conversation: Разговор (по умолчанию — self.conversation)
+
+        Yields:
+            Очередные фрагменты (дельты) ответа модели
+        """
+        conversation = conversation or self.conversation
+        prompt = self._begin(user_text, conversation)
+        stream = self._open_stream(user_text, conversation)
+        answer: list[str] = []
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    print("[LLM] Генерация прервана.")
+                    break
+                delta = chunk["message"]["content"]
+                if echo:
+                    print(delta, end="", flush=True)
+                if chunk.get("done"):
+                    self._finish(chunk, conversation, prompt)
+                if delta:
+                    answer.append(delta)
+                    yield delta
+        finally:
+            # Закрытие генератора ollama закрывает HTTP-ответ (в т.ч. при close() снаружи)
+            stream.close()
+            conversation.add(user_text, "".join(answer))
+        if echo:
+            print()
+            if self.last_stats.done:
+                print(f"[LLM] {self.last_stats.summary()}")
+
+    async def ask_stream_async(
+        self, user_text: str, conversation: Conversation | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Асинхронный вариант ask_stream на ollama.AsyncClient (для src.async_runtime).
+
+        Отмена задачи или aclose() генератора закрывает HTTP-поток, и Ollama
+        прекращает генерацию.
+
+        Args:
+            user_text: Текст пользователя
+            conversation: Разговор (по умолчанию — self.conversation)
+
+        Yields:
+            Очередные фрагменты (дельты) ответа модели
+        """
+        conversation = conversation or self.conversation
+        prompt = self._begin(user_text, conversation)
+        chunk, stream = await self._open_stream_async(user_text, conversation)
+        answer: list[str] = []
+        try:
+            while chunk is not None:
+                if chunk.get("done"):
+                    self._finish(chunk, conversation, prompt)
+                delta = chunk["message"]["content"]
+                if delta:
+                    answer.append(delta)
+                    yield delta
+                chunk = await anext(stream, None)
+        finally:
+            await stream.aclose()
+            conversation.add(user_text, "".join(answer))
 
     def ask(self, user_text: str, stream: bool = True) -> str:
         """
@@ -38,34 +286,38 @@ class OllamaClient:
         Returns:
             Ответ модели
         """
-        messages = []
-        if self.system_prompt:
-            messages.append({"role": "system", "content": self.system_prompt})
-        messages.append({"role": "user", "content": user_text})
+        if stream:
+            return "".join(self.ask_stream(user_text)).strip()
 
-        print("[LLM] Ollama думает...")
-        stream_response = ollama.chat(
-            model=self.model,
-            messages=messages,
-            stream=stream,
-            keep_alive=self.keep_alive,  # Держит модель в памяти для ускорения
-            options={
-                # Оптимизации для ускорения генерации
-                "num_predict": -1,  # Без ограничения длины (как в CLI)
-                "temperature": 0.7,  # Стандартное значение
-            },
-        )
+        prompt = self._begin(user_text, self.conversation)
+        result = self._chat(user_text, self.conversation)
+        response = result["message"]["content"]
+        print(response)
+        self._finish(result, self.conversation, prompt)
+        print(f"[LLM] {self.last_stats.summary()}")
+        self.conversation.add(user_text, response)
+        return response.strip()
 
-        if stream:
-            chunks: list[str] = []
-            for chunk in stream_response:
-                delta = chunk["message"]["content"]
-                print(delta, end="", flush=True)
-                chunks.append(delta)
-            print()
-            return "".join(chunks).strip()
-        else:
-            response = stream_response["message"]["content"]
-            print(response)
-            return response.strip()
+    def close(self) -> None:
+        """Закрывает HTTP-соединение синхронного клиента (асинхронный закрывает aclose)."""
+        self._client.close()
+
+    async def aclose(self) -> None:
+        """Закрывает пул соединений асинхронного клиента в цикле событий, который им владеет."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+
+class _Stream:
+    """Поток фрагментов ollama, первый из которых уже прочитан (при проверке соединения)."""
+
+    def __init__(self, first, rest: Iterator):
+        self._chunks = itertools.chain([] if first is None else [first], rest)
+        self._rest = rest
+
+    def __iter__(self):
+        return self._chunks
 
+    def close(self) -> None:
+        self._rest.close()
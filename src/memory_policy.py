@@ -0,0 +1,182 @@
+"""Выгрузка простаивающих моделей из памяти и ленивая загрузка при следующей реплике."""
+
+from __future__ import annotations
+
+import contextlib
+import gc
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Protocol
+
+
+def rss_mb() -> float | None:
+    """Текущий объём резидентной памяти процесса, МБ (None, если платформа не сообщает)."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):  # не Linux
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _release_memory() -> None:
+    """Возвращает освобождённую память: сборка мусора и кэш CUDA, если он есть."""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class Unloadable(Protocol):
+    """Модель, которую можно выгрузить и загрузить заново (SpeechToText, SileroTTS)."""
+
+    @property
+    def loaded(self) -> bool: ...
+
+    def load(self) -> None: ...
+
+    def unload(self) -> None: ...
+
+
+@dataclass
+class MemoryEvent:
+    """Выгрузка или повторная загрузка модели."""
+
+    model: str
+    action: str  # "unload" или "reload"
+    seconds: float
+    rss_before_mb: float | None
+    rss_after_mb: float | None
+
+    def summary(self) -> str:
+        """Однострочная сводка для консоли."""
+        verb = "выгружена" if self.action == "unload" else "загружена заново"
+        line = f"{self.model} {verb} за {self.seconds:.2f} с"
+        if self.rss_before_mb is not None and self.rss_after_mb is not None:
+            line += f", RSS {self.rss_before_mb:.0f} → {self.rss_after_mb:.0f} МБ"
+        return line
+
+
+@dataclass
+class _Slot:
+    model: Unloadable
+    idle_seconds: float
+    last_used: float
+    busy: int = 0  # Сколько вызовов сейчас работают с моделью
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class MemoryPolicy:
+    """
+    Держит в памяти только те модели, которые недавно работали.
+
+    Модель регистрируется со своим временем простоя. Фоновый поток раз в
+    check_interval секунд выгружает модели, к которым не обращались дольше
+    этого времени, а при следующем обращении (use) модель загружается
+    заново — это стоит времени реплики, поэтому каждая выгрузка и загрузка
+    печатается с RSS процесса до и после и длительностью. По этим цифрам
+    видно, сколько памяти освобождает простой и сколько стоит первая
+    реплика после него, и можно подобрать время простоя под устройство.
+
+    Модель, которая сейчас распознаёт или синтезирует, не выгружается.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        """
+        Args:
+            check_interval: Как часто проверять простой моделей, секунд
+        """
+        self.check_interval = check_interval
+        self.events: list[MemoryEvent] = []
+        self._slots: dict[str, _Slot] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, name: str, model: Unloadable, idle_seconds: float | None) -> None:
+        """
+        Отдаёт модель под управление политики.
+
+        Args:
+            name: Имя модели в логах ("stt", "tts")
+            model: Модель с load/unload/loaded
+            idle_seconds: Через сколько секунд простоя выгружать (None или 0 — не выгружать)
+        """
+        if not idle_seconds or idle_seconds <= 0:
+            return
+        self._slots[name] = _Slot(model, idle_seconds, time.monotonic())
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="memory-policy", daemon=True
+            )
+            self._thread.start()
+
+    @contextlib.contextmanager
+    def use(self, name: str) -> Iterator[None]:
+        """Загружает модель, если она выгружена, и не даёт выгрузить её до выхода из блока."""
+        slot = self._slots.get(name)
+        if slot is None:
+            yield
+            return
+        with slot.lock:
+            if not slot.model.loaded:
+                self._record(name, "reload", slot.model.load)
+            slot.busy += 1
+        try:
+            yield
+        finally:
+            with slot.lock:
+                slot.busy -= 1
+                slot.last_used = time.monotonic()
+
+    def unload_idle(self, now: float | None = None) -> list[str]:
+        """
+        Выгружает модели, простаивающие дольше своего времени.
+
+        Returns:
+            Имена выгруженных моделей
+        """
+        now = time.monotonic() if now is None else now
+        unloaded = []
+        for name, slot in self._slots.items():
+            with slot.lock:
+                idle = now - slot.last_used
+                if slot.busy or not slot.model.loaded or idle < slot.idle_seconds:
+                    continue
+                self._record(name, "unload", slot.model.unload)
+            unloaded.append(name)
+        return unloaded
+
+    def _record(self, name: str, action: str, func) -> None:
+        """Выполняет загрузку или выгрузку и печатает RSS до и после."""
+        before = rss_mb()
+        started = time.perf_counter()
+        func()
+        if action == "unload":
+            _release_memory()
+        event = MemoryEvent(name, action, time.perf_counter() - started, before, rss_mb())
+        self.events.append(event)
+        print(f"[Memory] {event.summary()}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.unload_idle()
+            except Exception as exc:  # noqa: BLE001 - фоновый поток не должен падать
+                print(f"[Memory] Ошибка выгрузки: {exc}")
+
+    def close(self) -> None:
+        """Останавливает фоновую проверку (модели остаются как есть)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.check_interval + 1)
+            self._thread = None
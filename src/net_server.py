@@ -0,0 +1,575 @@
+"""
+Сетевой режим: несколько клиентов (комнат) на общих моделях.
+
+Клиент отправляет фразу WAV-файлом, сервер отвечает потоком NDJSON-событий:
+
+    POST /v1/turn?client=<id>      тело — WAV (PCM16, моно или стерео, любая частота)
+
+    {"event": "transcript", "text": "..."}
+    {"event": "audio", "index": 1, "text": "...", "sample_rate": 48000, "pcm16": "<base64>"}
+    {"event": "done", "timings": {...}}
+    {"event": "error", "message": "..."}
+
+    GET /health                    состояние сервера и число клиентов
+
+Все клиенты разделяют один SpeechToText, один OllamaClient и один SileroTTS.
+Одновременные фразы распознаются микро-батчами (BatchedTranscriber), а у
+каждого клиента своя очередь реплик, своя история диалога с LLM и ограниченная
+очередь событий, поэтому медленный клиент тормозит только себя. Кэш ответов
+LLM общий: вопрос, уже заданный любым клиентом, отвечается без запроса к модели.
+Сессия клиента, не присылавшего реплик дольше net_session_idle_seconds,
+удаляется вместе с историей диалога.
+
+Запуск: python main.py --serve 0.0.0.0:8765
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import functools
+import io
+import json
+import time
+import urllib.parse
+import wave
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core.speech_gate import SpeechGate
+from core.voice_recorder import pcm16_to_float32
+
+from .async_runtime import answer_turn
+from .config import AppConfig
+from .answer_cache import AnswerCache
+from .conversation import Conversation
+from .intents import IntentRouter, create_default_router
+from .llm import OllamaClient
+from .stt import SpeechToText
+from .tracing import SPEECH_END, STT_DONE, TTS_FIRST_AUDIO, TraceWriter, TurnTrace
+from .tts import SileroTTS
+
+# Максимальный размер тела запроса: ~60 секунд PCM16 48 кГц стерео
+MAX_BODY_BYTES = 12 * 1024 * 1024
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+}
+
+
+class BatchedTranscriber:
+    """
+    Собирает одновременные запросы на распознавание в батчи.
+
+    Первый запрос ждёт не дольше max_wait_ms, пока подтянутся другие; батч
+    уходит в Whisper одним вызовом SpeechToText.transcribe_batch в отдельном
+    потоке, так что модель никогда не вызывается из двух потоков сразу.
+    """
+
+    def __init__(
+        self,
+        stt: SpeechToText,
+        language: str = "ru",
+        max_batch: int = 8,
+        max_wait_ms: float = 30.0,
+    ):
+        """
+        Args:
+            stt: Общий распознаватель
+            language: Язык распознавания
+            max_batch: Максимальный размер батча
+            max_wait_ms: Сколько ждать добора батча после первого запроса, мс
+        """
+        self.stt = stt
+        self.language = language
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_sizes: list[int] = []  # История размеров батчей (для метрик и тестов)
+        self._queue: asyncio.Queue[tuple[np.ndarray, asyncio.Future]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-batch")
+
+    def start(self) -> None:
+        """Запускает сборщик батчей в текущем цикле событий."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="stt-batch")
+
+    async def stop(self) -> None:
+        """Останавливает сборщик батчей."""
+        if self._worker is not None:
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def transcribe(self, audio: np.ndarray) -> str:
+        """Распознаёт фразу (float32, 16 кГц) в составе ближайшего батча."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Запросы отменённых клиентов в батч не берём
+            batch = [(audio, future) for audio, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batch_sizes.append(len(batch))
+            call = functools.partial(
+                self.stt.transcribe_batch, [audio for audio, _ in batch], self.language
+            )
+            try:
+                texts = await loop.run_in_executor(self._executor, call)
+            except Exception as exc:  # noqa: BLE001 - ошибка относится ко всем запросам батча
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+
+
+@dataclass
+class TurnJob:
+    """Одна реплика клиента: входное аудио и очередь событий ответа."""
+
+    audio: np.ndarray
+    events: asyncio.Queue
+    abandoned: bool = False  # Клиент отключился, не дождавшись ответа
+    task: asyncio.Task | None = None
+
+
+@dataclass
+class ClientSession:
+    """Состояние клиента: своя очередь реплик, маршрутизатор команд и история диалога."""
+
+    client_id: str
+    jobs: asyncio.Queue
+    intents: IntentRouter | None
+    conversation: Conversation
+    worker: asyncio.Task | None = None
+    turns: int = 0
+    busy: bool = False  # Реплика клиента сейчас обрабатывается
+    last_seen: float = field(default_factory=time.monotonic)  # Последняя реплика или ответ
+
+
+def decode_wav(data: bytes) -> np.ndarray:
+    """
+    Декодирует WAV из тела запроса в моно float32 16 кГц.
+
+    Raises:
+        ValueError: Если это не 16-битный PCM WAV
+    """
+    try:
+        with contextlib.closing(wave.open(io.BytesIO(data), "rb")) as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError("Поддерживается только 16-битный PCM WAV.")
+            channels = wav_file.getnchannels()
+            sample_rate = wav_file.getframerate()
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    except (wave.Error, EOFError) as exc:
+        raise ValueError(f"Некорректный WAV: {exc}") from None
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return pcm16_to_float32(samples.tobytes(), sample_rate)
+
+
+def encode_pcm16(audio: np.ndarray) -> str:
+    """Кодирует аудио float32 в base64 строки PCM16 little-endian."""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    return base64.b64encode(pcm.tobytes()).decode("ascii")
+
+
+class NetworkServer:
+    """HTTP-сервер реплик для нескольких клиентов на общих моделях."""
+
+    def __init__(
+        self,
+        config: AppConfig,
+        stt: SpeechToText,
+        llm: OllamaClient,
+        tts: SileroTTS,
+        tracer: TraceWriter | None = None,
+        intents_factory: Callable[[], IntentRouter] | None = create_default_router,
+        gate: SpeechGate | None = None,
+        answers: AnswerCache | None = None,
+    ):
+        """
+        Args:
+            config: Конфигурация (net_*, tts_lookahead, tts_gap_seconds и т.д.)
+            stt: Общий распознаватель
+            llm: Общий клиент Ollama
+            tts: Общий синтезатор
+            tracer: Запись трасс реплик (необязательно)
+            intents_factory: Создаёт маршрутизатор локальных команд для нового клиента;
+                             None — все реплики идут в LLM
+            gate: Проверка «речь или нет» перед Whisper (None — распознавать всё)
+            answers: Кэш ответов LLM, общий для всех клиентов (None — без кэша)
+        """
+        self.config = config
+        self.gate = gate
+        self.answers = answers
+        self.llm = llm
+        self.tts = tts
+        self.tracer = tracer
+        self.intents_factory = intents_factory
+        batch_wait_ms = config.net_stt_batch_wait_ms
+        self.transcriber = BatchedTranscriber(
+            stt,
+            max_batch=config.net_stt_batch or 8,
+            max_wait_ms=batch_wait_ms if batch_wait_ms is not None else 30.0,
+        )
+        self.client_queue = max(1, config.net_client_queue or 2)
+        lookahead = config.tts_lookahead if config.tts_lookahead is not None else 2
+        self.lookahead = max(1, lookahead)
+        self.sessions: dict[str, ClientSession] = {}
+        idle = config.net_session_idle_seconds
+        self.session_idle_seconds = idle if idle is not None else 600.0
+        self._evictor: asyncio.Task | None = None
+        # Silero не рассчитан на вызовы из нескольких потоков: синтез всех клиентов
+        # идёт через один поток по предложениям, поэтому клиенты чередуются
+        self._tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-shared")
+        self._server: asyncio.AbstractServer | None = None
+
+    @classmethod
+    def from_server(cls, server) -> NetworkServer:
+        """Создаёт сетевой сервер на моделях StrongServer (созданного с microphone=False)."""
+        factory = create_default_router if server.intents is not None else None
+        return cls(
+            server.config,
+            server.stt,
+            server.llm,
+            server.tts,
+            server.tracer,
+            factory,
+            server.gate,
+            server.answers,
+        )
+
+    @property
+    def port(self) -> int:
+        """Фактический порт (полезно при port=0)."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str | None = None, port: int | None = None) -> None:
+        """Начинает принимать соединения."""
+        host = host or self.config.net_host or "127.0.0.1"
+        port = port if port is not None else (self.config.net_port or 8765)
+        self.transcriber.start()
+        if self.session_idle_seconds > 0:
+            self._evictor = asyncio.create_task(self._evict_idle_loop(), name="net-evict")
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"[Net] Сервер реплик слушает http://{host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Закрывает сокет, задачи клиентов и исполнители."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._evictor is not None:
+            self._evictor.cancel()
+        for session in self.sessions.values():
+            if session.worker is not None:
+                session.worker.cancel()
+        workers = [s.worker for s in self.sessions.values() if s.worker is not None]
+        await asyncio.gather(*workers, return_exceptions=True)
+        await self.transcriber.stop()
+        await self.llm.aclose()
+        self._tts_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def serve_forever(self, host: str | None = None, port: int | None = None) -> None:
+        """Запускает сервер и работает до отмены."""
+        await self.start(host, port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    # --- HTTP ---
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Один запрос на соединение (Connection: close)."""
+        try:
+            method, path, params, body = await self._read_request(reader)
+            if path == "/health":
+                await self._send_json(writer, 200, self._health())
+            elif path == "/v1/turn":
+                if method != "POST":
+                    await self._send_json(writer, 405, {"error": "ожидается POST"})
+                else:
+                    client_id = params.get("client", ["default"])[0]
+                    await self._handle_turn(writer, client_id, body)
+            else:
+                await self._send_json(writer, 404, {"error": "not found"})
+        except _HTTPError as exc:
+            with contextlib.suppress(ConnectionError):
+                await self._send_json(writer, exc.status, {"error": exc.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise _HTTPError(400, "некорректная строка запроса")
+        method, target, _ = parts
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise _HTTPError(413, "слишком длинная фраза")
+        body = await reader.readexactly(length) if length else b""
+        path, _, query = target.partition("?")
+        return method, path, urllib.parse.parse_qs(query), body
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def _health(self) -> dict:
+        return {
+            "status": "ok",
+            "clients": len(self.sessions),
+            "turns": sum(s.turns for s in self.sessions.values()),
+            "stt_batches": len(self.transcriber.batch_sizes),
+            "stt_batched_requests": sum(self.transcriber.batch_sizes),
+        }
+
+    async def _handle_turn(self, writer: asyncio.StreamWriter, client_id: str, body: bytes) -> None:
+        """Ставит реплику в очередь клиента и передаёт события ответа по мере готовности."""
+        try:
+            audio = decode_wav(body)
+        except ValueError as exc:
+            raise _HTTPError(400, str(exc)) from None
+
+        session = self._session(client_id)
+        # Очередь событий ограничена: медленное чтение клиента притормаживает только его синтез
+        job = TurnJob(audio=audio, events=asyncio.Queue(maxsize=self.lookahead + 2))
+        try:
+            session.jobs.put_nowait(job)
+        except asyncio.QueueFull:
+            raise _HTTPError(429, "у клиента слишком много необработанных реплик") from None
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/x-ndjson\r\n"
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        try:
+            while (event := await job.events.get()) is not None:
+                line = json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n"
+                writer.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            # Если клиент отключился, ответ больше никому не нужен: отменяем его
+            # и освобождаем очередь, чтобы обработчик клиента не ждал на put
+            job.abandoned = True
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+            while not job.events.empty():
+                job.events.get_nowait()
+
+    # --- Клиенты и реплики ---
+
+    def _session(self, client_id: str) -> ClientSession:
+        session = self.sessions.get(client_id)
+        if session is None:
+            intents = self.intents_factory() if self.intents_factory is not None else None
+            session = ClientSession(
+                client_id,
+                asyncio.Queue(maxsize=self.client_queue),
+                intents,
+                self.llm.new_conversation(),
+            )
+            session.worker = asyncio.create_task(
+                self._client_worker(session), name=f"client-{client_id}"
+            )
+            self.sessions[client_id] = session
+            print(f"[Net] Новый клиент: {client_id}")
+        session.last_seen = time.monotonic()
+        return session
+
+    def evict_idle(self, now: float | None = None) -> list[str]:
+        """
+        Удаляет сессии клиентов, простаивающих дольше session_idle_seconds.
+
+        Обработчик реплик клиента отменяется, а история диалога и маршрутизатор
+        команд освобождаются вместе с сессией. Клиент с репликой в очереди или
+        в обработке не удаляется.
+
+        Returns:
+            Идентификаторы удалённых клиентов
+        """
+        now = time.monotonic() if now is None else now
+        evicted = []
+        for client_id, session in list(self.sessions.items()):
+            if session.busy or not session.jobs.empty():
+                continue
+            if now - session.last_seen < self.session_idle_seconds:
+                continue
+            if session.worker is not None:
+                session.worker.cancel()
+            del self.sessions[client_id]
+            evicted.append(client_id)
+        if evicted:
+            print(f"[Net] Удалены сессии простаивающих клиентов: {', '.join(evicted)}")
+        return evicted
+
+    async def _evict_idle_loop(self) -> None:
+        interval = min(self.session_idle_seconds / 2, 30.0)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def _client_worker(self, session: ClientSession) -> None:
+        """Обрабатывает реплики клиента по очереди, независимо от других клиентов."""
+        while True:
+            job: TurnJob = await session.jobs.get()
+            if job.abandoned:
+                continue
+            session.busy = True
+            job.task = asyncio.create_task(self._process_turn(session, job))
+            try:
+                await asyncio.wait({job.task})
+            finally:
+                session.busy = False
+                session.last_seen = time.monotonic()
+            session.turns += 1
+            if job.task.cancelled() or job.abandoned:
+                continue
+            error = job.task.exception()
+            if error is not None:
+                print(f"[Net] {session.client_id}: ошибка реплики: {error}")
+                await job.events.put({"event": "error", "message": str(error)})
+            await job.events.put(None)
+
+    async def _process_turn(self, session: ClientSession, job: TurnJob) -> None:
+        """STT (в составе батча) → локальная команда или LLM → синтез по предложениям."""
+        trace = TurnTrace()
+        trace.attrs["client"] = session.client_id
+        trace.mark(SPEECH_END)
+        decision = None
+        if self.gate is not None:
+            decision = await asyncio.to_thread(self.gate.check, job.audio)
+        if decision is None or decision.passed:
+            text = await self.transcriber.transcribe(job.audio)
+        else:
+            # Фраза без речи не занимает место в батче Whisper
+            trace.attrs["gate"] = decision.reason
+            text = ""
+        trace.mark(STT_DONE)
+        await job.events.put({"event": "transcript", "text": text})
+        if text:
+            await answer_turn(
+                text,
+                trace,
+                lambda sentences: self._synthesize(sentences, job, trace),
+                self.llm,
+                session.conversation,
+                intents=session.intents,
+                answers=self.answers,
+            )
+
+        await job.events.put({"event": "done", "timings": trace.spans()})
+        if self.tracer is not None:
+            self.tracer.write(trace)
+
+    async def _synthesize(
+        self, sentences: AsyncIterator[str], job: TurnJob, trace: TurnTrace
+    ) -> str:
+        """Синтезирует предложения пакетами в общем потоке TTS и отправляет куски клиенту."""
+        loop = asyncio.get_running_loop()
+        spoken: list[str] = []
+
+        async def run_synth(kind: str, func, *args):
+            return await loop.run_in_executor(self._tts_executor, func, *args)
+
+        stream = self.tts.synthesize_stream(sentences, run_synth, spoken)
+        try:
+            index = 0
+            async for _, chunk, audio in stream:
+                trace.mark(TTS_FIRST_AUDIO)
+                index += 1
+                await job.events.put(
+                    {
+                        "event": "audio",
+                        "index": index,
+                        "text": chunk,
+                        "sample_rate": self.tts.sample_rate,
+                        "pcm16": encode_pcm16(audio),
+                    }
+                )
+        finally:
+            await stream.aclose()
+        return " ".join(spoken)
+
+
+class _HTTPError(Exception):
+    """Ошибка запроса с HTTP-статусом."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def run_network_server(server, host: str | None = None, port: int | None = None) -> None:
+    """
+    Блокирующий запуск сетевого режима на моделях StrongServer.
+
+    Args:
+        server: StrongServer, созданный с microphone=False
+        host: Адрес (по умолчанию net_host из конфигурации)
+        port: Порт (по умолчанию net_port из конфигурации)
+    """
+    net = NetworkServer.from_server(server)
+    try:
+        asyncio.run(net.serve_forever(host, port))
+    except KeyboardInterrupt:
+        print("\n[Info] Прервано пользователем.")
+    finally:
+        server.close()
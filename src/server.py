@@ -2,26 +2,48 @@
 
 from __future__ import annotations
 
-import contextlib
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from core.voice_recorder import RecorderConfig, VoiceRecorder
+import numpy as np
 
+from core.speech_gate import REASONS, SpeechGate
+from core.voice_recorder import WHISPER_SAMPLE_RATE, RecorderConfig, VoiceRecorder
+
+from .answer_cache import AnswerCache
+from .async_runtime import AsyncRuntime
 from .config import AppConfig
+from .intents import IntentRouter, create_default_router
 from .llm import OllamaClient
+from .memory_policy import MemoryPolicy
+from .snapshots import SnapshotStore
 from .stt import SpeechToText
+from .stt_stream import StreamingTranscriber
+from .threads import ThreadBudget
+from .tracing import TraceWriter, TurnTrace
 from .tts import SileroTTS
+from .tts_cache import TTSCache
 
 
 class StrongServer:
     """Комбинирует распознавание речи, LLM и TTS в единый сервер."""
 
-    def __init__(self, config: AppConfig, recorder_config: RecorderConfig | None = None):
+    def __init__(
+        self,
+        config: AppConfig,
+        recorder_config: RecorderConfig | None = None,
+        microphone: bool = True,
+    ):
         """
         Инициализирует сервер со всеми компонентами.
 
         Args:
             config: Конфигурация приложения
             recorder_config: Конфигурация записи голоса
+            microphone: Открывать локальный микрофон; False — только модели
+                        (сетевой режим, см. src.net_server)
         """
         self.config = config
         if recorder_config is None:
@@ -32,52 +54,280 @@ class StrongServer:
                 silence_duration=config.recorder_silence_duration,
                 max_recording=config.recorder_max_recording,
             )
-        self.recorder = VoiceRecorder(recorder_config)
-        self.stt = SpeechToText(config.whisper_model)
+            # Необязательные параметры: если не заданы, остаются значения по умолчанию
+            optional = {
+                "preroll_ms": config.recorder_preroll_ms,
+                "vad": config.recorder_vad,
+                "vad_onset_ms": config.recorder_vad_onset_ms,
+                "vad_hangover_ms": config.recorder_vad_hangover_ms,
+                "vad_snr_db": config.recorder_vad_snr_db,
+            }
+            for name, value in optional.items():
+                if value is not None:
+                    setattr(recorder_config, name, value)
+        self.tracer = self._create_tracer()
+        self.threads = ThreadBudget.from_config(config)
+        self.snapshots = SnapshotStore(config.snapshot_dir) if config.snapshot_dir else None
+        self.memory = MemoryPolicy()
+        print(f"[Threads] {self.threads.describe()}")
+        self.startup_timings: dict[str, float] = {}
+        started = time.perf_counter()
+        self.recorder: VoiceRecorder | None = None
+        if microphone:
+            # Поток захвата PortAudio наследует привязку к ядрам создавшего его потока
+            with self.threads.stage("audio"):
+                self.recorder = self._timed("recorder", lambda: VoiceRecorder(recorder_config))
         self.llm = OllamaClient(
-            model=config.ollama_model, system_prompt=config.system_prompt
+            model=config.ollama_model,
+            system_prompt=config.system_prompt,
+            keep_alive=config.ollama_keep_alive if config.ollama_keep_alive is not None else "2m",
+            history_tokens=(
+                config.llm_history_tokens if config.llm_history_tokens is not None else 2048
+            ),
+            host=config.ollama_host,
+            timeout=config.ollama_timeout if config.ollama_timeout is not None else 120.0,
+            options=self._ollama_options(),
+            retries=config.ollama_retries if config.ollama_retries is not None else 2,
         )
-        self.tts = SileroTTS(speaker=config.tts_model)
+        self._load_models(warmup=config.startup_warmup is not False)
+        self.stt_stream = None
+        if microphone and config.stt_streaming:
+            self.stt_stream = StreamingTranscriber(self.stt)
+        self.gate = self._create_speech_gate()
+        self.answers = self._create_answer_cache()
+        self.intents: IntentRouter | None = None
+        if config.local_intents is not False:
+            self.intents = create_default_router()
+            # Неизменные ответы команд звучат из кэша, без синтеза во время реплики
+            replies = self.intents.canned_replies()
+            self._timed("intents.prefetch", lambda: self.tts.prefetch(replies))
+        # Выгрузка при простое — после прогрева и заполнения кэша ответов команд
+        self.memory.register("stt", self.stt, config.stt_idle_unload_seconds)
+        self.memory.register("tts", self.tts, config.tts_idle_unload_seconds)
+        self.startup_timings["total"] = time.perf_counter() - started
+        self._print_startup_timings()
+
+    def _timed(self, name: str, func):
+        """Выполняет func и записывает время выполнения в startup_timings[name]."""
+        started = time.perf_counter()
+        result = func()
+        self.startup_timings[name] = time.perf_counter() - started
+        return result
+
+    def _load_models(self, warmup: bool) -> None:
+        """
+        Загружает STT и TTS параллельно и одновременно прогревает модель Ollama.
+
+        Загрузка весов и инференс PyTorch в основном отпускают GIL, поэтому
+        потоков достаточно, чтобы время запуска определялось самым медленным
+        компонентом, а не суммой.
+        """
+
+        def load_stt() -> SpeechToText:
+            backend = self.config.stt_backend or "whisper"
+            stt = self._timed(
+                "stt.load",
+                lambda: SpeechToText(
+                    self.config.whisper_model,
+                    backend=backend,
+                    threads=self.threads,
+                    snapshots=self.snapshots,
+                    memory=self.memory,
+                ),
+            )
+            if warmup:
+                self._timed("stt.warmup", stt.warmup)
+            return stt
+
+        def load_tts() -> SileroTTS:
+            tts = self._timed(
+                "tts.load",
+                lambda: SileroTTS(
+                    speaker=self.config.tts_model,
+                    lookahead=(
+                        self.config.tts_lookahead if self.config.tts_lookahead is not None else 2
+                    ),
+                    cache=self._create_tts_cache(),
+                    threads=self.threads,
+                    snapshots=self.snapshots,
+                    max_chunk_chars=(
+                        self.config.tts_max_chunk_chars
+                        if self.config.tts_max_chunk_chars is not None
+                        else 150
+                    ),
+                    batch_chars=(
+                        self.config.tts_batch_chars
+                        if self.config.tts_batch_chars is not None
+                        else 600
+                    ),
+                    memory=self.memory,
+                ),
+            )
+            if warmup:
+                self._timed("tts.warmup", tts.warmup)
+            return tts
+
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup") as pool:
+            stt_future = pool.submit(load_stt)
+            tts_future = pool.submit(load_tts)
+            llm_future = pool.submit(self._timed, "llm.warmup", self.llm.warmup) if warmup else None
+            self.stt = stt_future.result()
+            self.tts = tts_future.result()
+            if llm_future is not None:
+                llm_future.result()
+
+    def _print_startup_timings(self) -> None:
+        """Печатает время запуска по компонентам."""
+        print("[Startup] Время запуска по компонентам:")
+        for name, seconds in self.startup_timings.items():
+            print(f"  {name:<12} {seconds:6.2f} с")
+        if self.snapshots is not None:
+            for line in self.snapshots.summary_lines():
+                print(f"[Snapshot] {line}")
 
     def run(self):
-        """Основной цикл работы приложения."""
+        """Основной цикл работы приложения (блокирующая обёртка над run_async)."""
+        if self.recorder is None:
+            raise RuntimeError("Сервер создан без микрофона (сетевой режим: src.net_server).")
         print("[Starting] VoiceToNights сервисы запущены")
         print("[Info] Скажите 'стоп', 'выход' или 'заверши' для завершения работы\n")
 
         try:
-            while True:
-                # Записываем голосовую команду
-                audio_path = self.recorder.capture_phrase()
-                if not audio_path:
-                    continue
-
-                # Распознаём речь
-                try:
-                    user_text = self.stt.transcribe(audio_path)
-                finally:
-                    with contextlib.suppress(OSError):
-                        audio_path.unlink()
-
-                if not user_text:
-                    print("[Warn] Whisper не распознал текст. Повторите команду.\n")
-                    continue
-
-                print(f"[User] Вы сказали: {user_text}")
-
-                # Проверяем команду остановки
-                if self._should_stop(user_text):
-                    print("[Info] Завершаю работу по команде пользователя.")
-                    break
-
-                # Получаем ответ от LLM
-                answer = self.llm.ask(user_text)
-                if answer:
-                    print()
-                    self.tts.speak(answer)
-                    print()
-
+            asyncio.run(self.run_async())
         except KeyboardInterrupt:
             print("\n[Info] Прервано пользователем.")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Закрывает микрофон, вывод звука и файл трасс; сохраняет кэш ответов."""
+        self.memory.close()
+        if self.answers is not None:
+            self.answers.flush()
+        self.llm.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.tts.close()
+        if self.tracer is not None:
+            self.tracer.close()
+
+    async def run_async(self) -> None:
+        """Запускает конвейер в текущем цикле событий (см. src.async_runtime)."""
+        await AsyncRuntime(self).run()
+
+    def _finish_trace(self, trace: TurnTrace) -> None:
+        """Печатает сводку задержек реплики и сохраняет трассу."""
+        line = trace.summary_line()
+        if line:
+            print(f"[Trace] {line}\n")
+        if self.tracer is not None:
+            self.tracer.write(trace)
+
+    def _ollama_options(self) -> dict:
+        """Параметры генерации Ollama из конфигурации (незаданные — по умолчанию src.llm)."""
+        options = {
+            "num_ctx": self.config.ollama_num_ctx,
+            "num_thread": self.config.ollama_num_thread,
+            "num_predict": self.config.ollama_num_predict,
+            "stop": self.config.ollama_stop or None,
+        }
+        return {name: value for name, value in options.items() if value is not None}
+
+    def _create_tracer(self) -> TraceWriter | None:
+        """Создаёт запись трасс в JSONL, если задан trace_path."""
+        if not self.config.trace_path:
+            return None
+        max_mb = self.config.trace_max_mb if self.config.trace_max_mb is not None else 5
+        backups = self.config.trace_backups if self.config.trace_backups is not None else 3
+        return TraceWriter(
+            self.config.trace_path, max_bytes=int(max_mb * 1024 * 1024), backups=backups
+        )
+
+    def _create_tts_cache(self) -> TTSCache | None:
+        """Создаёт кэш аудио TTS по конфигурации (tts_cache_mb=0 отключает кэш)."""
+        cache_mb = self.config.tts_cache_mb if self.config.tts_cache_mb is not None else 64
+        if cache_mb <= 0 and not self.config.tts_cache_dir:
+            return None
+        return TTSCache(
+            max_bytes=int(cache_mb * 1024 * 1024), disk_dir=self.config.tts_cache_dir
+        )
+
+    def _create_speech_gate(self) -> SpeechGate | None:
+        """Создаёт проверку «речь или нет» перед Whisper (speech_gate=false её отключает)."""
+        if self.config.speech_gate is False:
+            return None
+        min_speech_ms = self.config.speech_gate_min_speech_ms
+        return SpeechGate(min_speech_ms=min_speech_ms if min_speech_ms is not None else 250.0)
+
+    def _create_answer_cache(self) -> AnswerCache | None:
+        """Создаёт кэш ответов LLM по конфигурации (answer_cache_size=0 отключает кэш)."""
+        size = self.config.answer_cache_size if self.config.answer_cache_size is not None else 256
+        if size <= 0:
+            return None
+        ttl_hours = self.config.answer_cache_ttl_hours
+        return AnswerCache(
+            max_entries=size,
+            ttl_seconds=(ttl_hours if ttl_hours is not None else 24) * 3600,
+            path=self.config.answer_cache_path,
+            exclude=self.config.answer_cache_exclude or (),
+        )
+
+    def _capture(self) -> Path | np.ndarray | None:
+        """Записывает фразу в память или, для отладки, во временный WAV-файл."""
+        if self.config.recorder_use_wav_file:
+            return self.recorder.capture_phrase()
+        if self.stt_stream is None:
+            return self.recorder.capture_audio()
+
+        # Потоковый STT: распознаём фразу по частям, пока пользователь говорит
+        interval = self.config.stt_stream_interval or 1.0
+        self.stt_stream.begin()
+        audio = self.recorder.capture_audio(
+            on_partial=self.stt_stream.update, partial_interval=interval
+        )
+        if audio is None:
+            self.stt_stream.end()
+        return audio
+
+    def _passes_gate(self, audio: Path | np.ndarray) -> bool:
+        """Проверяет фразу перед Whisper (core.speech_gate); отклонённая не распознаётся."""
+        if self.gate is None or not isinstance(audio, np.ndarray):
+            return True
+        decision = self.gate.check(audio)
+        if decision.passed:
+            return True
+        if self.stt_stream is not None:
+            self.stt_stream.end()
+        print(
+            f"[Gate] Фраза {decision.duration:.1f} с пропущена: {REASONS[decision.reason]} "
+            f"(проверка {decision.elapsed_ms:.1f} мс); {self.gate.summary()}"
+        )
+        return False
+
+    def _transcribe(self, audio: Path | np.ndarray) -> str:
+        """Распознаёт фразу; в потоковом режиме докодирует только нераспознанный хвост."""
+        if self.stt_stream is None or not isinstance(audio, np.ndarray):
+            started = time.perf_counter()
+            text = self.stt.transcribe(audio)
+            if self.gate is not None and isinstance(audio, np.ndarray):
+                seconds = audio.size / WHISPER_SAMPLE_RATE
+                self.gate.record_stt(seconds, time.perf_counter() - started)
+            return text
+
+        speech = audio.size / WHISPER_SAMPLE_RATE - self.recorder.trailing_silence
+        text = self.stt_stream.finish(audio, speech_seconds=speech)
+        stats = self.stt_stream.last_stats
+        print(
+            f"[STT] Распознано во время речи {stats.committed_seconds:.1f} с, "
+            f"после неё — {stats.tail_seconds:.1f} с за {stats.final_seconds:.2f} с"
+        )
+        return text
+
+    def _gap_seconds(self) -> float:
+        """Пауза между предложениями из конфигурации."""
+        if self.config.tts_gap_seconds is None:
+            return 0.25
+        return self.config.tts_gap_seconds
 
     @staticmethod
     def _should_stop(text: str) -> bool:
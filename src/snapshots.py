@@ -0,0 +1,270 @@
+"""Снимки готовых к работе моделей на диске для быстрого повторного запуска."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from importlib import metadata
+from pathlib import Path
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Версия формата снимков: при её смене все старые снимки считаются устаревшими
+SNAPSHOT_FORMAT = 1
+
+
+def _package_version(name: str) -> str:
+    """Версия установленного пакета (входит в ключ снимка)."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def file_sha256(path: Path) -> str:
+    """Контрольная сумма файла, читаемого блоками (без загрузки целиком в память)."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    """
+    Каталог снимков моделей: файл данных и JSON с метаданными на каждую модель.
+
+    Метаданные содержат ключ (модель, версии библиотек, формат), SHA-256 и
+    размер файла, а также время холодной загрузки, при которой снимок был
+    создан. Снимок используется, только если ключ совпадает, иначе он
+    устаревший и модель загружается обычным путём, после чего снимок
+    пересоздаётся. Контрольная сумма проверяется при записи и каждый раз,
+    когда размер или время изменения файла отличаются от записанных; если
+    файл не трогали с момента проверки, повторное чтение всего файла ради
+    хеша не нужно. Запись атомарная: сначала во временный файл, затем rename.
+    """
+
+    def __init__(self, root: Path | str):
+        """
+        Args:
+            root: Каталог снимков (создаётся при необходимости)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Как загружена каждая модель: "warm" (из снимка) или "cold" (обычным путём)
+        self.report: dict[str, dict] = {}
+
+    def _paths(self, name: str) -> tuple[Path, Path]:
+        return self.root / f"{name}.bin", self.root / f"{name}.json"
+
+    def load(self, name: str, key: dict, loader: Callable[[Path], T]) -> T | None:
+        """
+        Загружает модель из снимка.
+
+        Args:
+            name: Имя снимка (например, "whisper-base")
+            key: Всё, от чего зависит содержимое снимка
+            loader: Функция, восстанавливающая модель из файла снимка
+
+        Returns:
+            Модель или None, если снимка нет, он устарел, повреждён или не загрузился
+        """
+        data_path, meta_path = self._paths(name)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("key") != {**key, "format": SNAPSHOT_FORMAT}:
+            print(f"[Snapshot] Снимок {name} устарел, загружаю модель обычным путём.")
+            return None
+        if not self._verify(data_path, meta_path, meta):
+            print(f"[Snapshot] Контрольная сумма снимка {name} не совпала, пересоздаю.")
+            return None
+
+        started = time.perf_counter()
+        try:
+            model = loader(data_path)
+        except Exception as exc:  # noqa: BLE001 - любой сбой снимка означает холодный путь
+            print(f"[Snapshot] Не удалось загрузить снимок {name} ({exc}), пересоздаю.")
+            return None
+        self.report[name] = {
+            "mode": "warm",
+            "seconds": time.perf_counter() - started,
+            "cold_seconds": meta.get("cold_seconds"),
+        }
+        return model
+
+    def save(
+        self, name: str, key: dict, write: Callable[[Path], None], cold_seconds: float
+    ) -> None:
+        """
+        Сохраняет снимок модели, загруженной обычным путём.
+
+        Args:
+            name: Имя снимка
+            key: Всё, от чего зависит содержимое снимка
+            write: Функция, записывающая модель в указанный файл
+            cold_seconds: Сколько заняла холодная загрузка (для сравнения с тёплой)
+        """
+        self.report[name] = {"mode": "cold", "seconds": cold_seconds, "saved": False}
+        data_path, meta_path = self._paths(name)
+        tmp_path = data_path.with_suffix(".tmp")
+        try:
+            write(tmp_path)
+            stat = tmp_path.stat()
+            meta = {
+                "key": {**key, "format": SNAPSHOT_FORMAT},
+                "sha256": file_sha256(tmp_path),
+                "size": stat.st_size,
+                "cold_seconds": cold_seconds,
+                "created": time.time(),
+            }
+            os.replace(tmp_path, data_path)
+            meta["mtime_ns"] = data_path.stat().st_mtime_ns
+            meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        except Exception as exc:  # noqa: BLE001 - снимок необязателен, запуск продолжается
+            print(f"[Snapshot] Не удалось сохранить снимок {name}: {exc}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.report[name]["saved"] = True
+        print(f"[Snapshot] Снимок {name} сохранён ({meta['size'] / 1024 / 1024:.0f} МБ).")
+
+    @staticmethod
+    def _verify(data_path: Path, meta_path: Path, meta: dict) -> bool:
+        """Проверяет файл снимка; полный хеш — только если файл менялся после проверки."""
+        try:
+            stat = data_path.stat()
+        except OSError:
+            return False
+        if stat.st_size != meta.get("size"):
+            return False
+        if stat.st_mtime_ns == meta.get("mtime_ns"):
+            return True
+        if file_sha256(data_path) != meta.get("sha256"):
+            return False
+        meta["mtime_ns"] = stat.st_mtime_ns
+        meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        return True
+
+    def summary_lines(self) -> list[str]:
+        """Строки отчёта «холодный/тёплый старт» по моделям."""
+        lines = []
+        for name, row in self.report.items():
+            if row["mode"] == "warm":
+                cold = row.get("cold_seconds")
+                was = f" (холодный был {cold:.2f} с)" if cold is not None else ""
+                lines.append(f"{name}: тёплый старт {row['seconds']:.2f} с{was}")
+            else:
+                saved = ", снимок создан" if row["saved"] else ""
+                lines.append(f"{name}: холодный старт {row['seconds']:.2f} с{saved}")
+        return lines
+
+
+def load_whisper_model(model_name: str, device: str | None, store: SnapshotStore | None):
+    """
+    Загружает модель Whisper из снимка или через whisper.load_model.
+
+    whisper.load_model при каждом запуске читает чекпойнт целиком в память,
+    чтобы проверить его SHA-256, и копирует fp16-веса в параметры fp32.
+    Снимок хранит уже готовый state_dict fp32 и загружается через
+    torch.load(mmap=True) с load_state_dict(assign=True): веса отображаются
+    из файла, а не копируются.
+
+    Args:
+        model_name: Название модели Whisper (tiny, base, ...) или путь к чекпойнту
+        device: Устройство; None — как в whisper.load_model
+        store: Каталог снимков; None — всегда обычная загрузка
+    """
+    import torch
+    import whisper
+
+    # Путь к собственному чекпойнту загружается как есть: снимок ничего не ускорит
+    if store is None or model_name not in whisper._MODELS:
+        return whisper.load_model(model_name, device=device)
+
+    device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+    name = f"whisper-{model_name}"
+    key = {
+        # URL содержит хеш чекпойнта, поэтому обновлённая модель даёт новый ключ
+        "source": whisper._MODELS[model_name],
+        "whisper": _package_version("openai-whisper"),
+        "torch": torch.__version__,
+    }
+
+    def restore(path: Path):
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+        return model.to(device)
+
+    model = store.load(name, key, restore)
+    if model is not None:
+        return model
+
+    started = time.perf_counter()
+    model = whisper.load_model(model_name, device=device)
+    cold_seconds = time.perf_counter() - started
+    checkpoint = {"dims": asdict(model.dims), "model_state_dict": model.state_dict()}
+    store.save(name, key, lambda path: torch.save(checkpoint, path), cold_seconds)
+    return model
+
+
+def silero_package_path(model_id: str) -> Path | None:
+    """Файл torch.package модели Silero, скачанный пакетом silero (None, если его нет)."""
+    import silero
+
+    model_dir = Path(silero.__file__).resolve().parent / "model"
+    exact = model_dir / f"{model_id}.pt"
+    if exact.is_file():
+        return exact
+    candidates = sorted(model_dir.glob(f"*{model_id}*.pt"), key=lambda p: p.stat().st_mtime)
+    return candidates[-1] if candidates else None
+
+
+def load_silero_model(model_id: str, load_cold: Callable[[], T], store: SnapshotStore | None) -> T:
+    """
+    Загружает модель Silero из снимка или через load_cold (silero_tts).
+
+    silero_tts при каждом запуске импортирует omegaconf, разбирает список
+    моделей latest_silero_models.yml (или скачивает его) и только потом
+    открывает пакет модели. Снимок — копия этого torch.package, которая
+    открывается напрямую через PackageImporter. Отобразить его в память нельзя:
+    модель восстанавливается распаковкой пакета.
+
+    Args:
+        model_id: Пакет модели (например, "v5_ru")
+        load_cold: Обычная загрузка модели
+        store: Каталог снимков; None — всегда обычная загрузка
+    """
+    if store is None:
+        return load_cold()
+
+    import torch
+    from torch import package
+
+    name = f"silero-{model_id}"
+    key = {"silero": _package_version("silero"), "torch": torch.__version__}
+
+    def restore(path: Path):
+        return package.PackageImporter(str(path)).load_pickle("tts_models", "model")
+
+    model = store.load(name, key, restore)
+    if model is not None:
+        return model
+
+    started = time.perf_counter()
+    model = load_cold()
+    cold_seconds = time.perf_counter() - started
+    source = silero_package_path(model_id)
+    if source is None:
+        print(f"[Snapshot] Не найден пакет {model_id} для снимка, пропускаю.")
+    else:
+        store.save(name, key, lambda path: shutil.copyfile(source, path), cold_seconds)
+    return model
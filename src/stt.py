@@ -2,36 +2,156 @@
 
 from __future__ import annotations
 
+import contextlib
 from pathlib import Path
 
-import whisper
+import numpy as np
+
+from .memory_policy import MemoryPolicy
+from .snapshots import SnapshotStore
+from .stt_backends import STTBackend, create_backend
+from .threads import ThreadBudget
 
 
 class SpeechToText:
-    """Обёртка над Whisper для локального распознавания речи."""
+    """Обёртка над движком STT (по умолчанию Whisper) для локального распознавания речи."""
 
-    def __init__(self, model_name: str = "base"):
+    def __init__(
+        self,
+        model_name: str = "base",
+        backend: str = "whisper",
+        threads: ThreadBudget | None = None,
+        snapshots: SnapshotStore | None = None,
+        memory: MemoryPolicy | None = None,
+    ):
         """
-        Инициализирует модель Whisper.
+        Инициализирует модель распознавания.
 
         Args:
             model_name: Название модели Whisper (tiny, base, small, medium, large)
+            backend: Движок из src.stt_backends ('whisper' или 'whisper-int8')
+            threads: Бюджет потоков CPU; распознавание идёт с потоками этапа "stt"
+            snapshots: Каталог снимков моделей для быстрого повторного запуска
+            memory: Политика памяти, которая может выгружать модель при простое
         """
-        print(f"[STT] Загружаем модель Whisper ({model_name})...")
-        self.model = whisper.load_model(model_name)
+        self.model_name = model_name
+        self.backend_name = backend
+        self.threads = threads
+        self.snapshots = snapshots
+        self.memory = memory
+        self.backend: STTBackend | None = None
+        self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self.backend is not None
+
+    def load(self) -> None:
+        """Загружает модель (после unload — заново, из снимка, если он есть)."""
+        print(f"[STT] Загружаем модель Whisper ({self.model_name}, движок {self.backend_name})...")
+        self.backend = create_backend(self.backend_name, self.model_name, snapshots=self.snapshots)
         print("[STT] Модель загружена.")
 
-    def transcribe(self, audio_path: Path, language: str = "ru") -> str:
+    def unload(self) -> None:
+        """Освобождает модель; следующее распознавание загрузит её заново через memory."""
+        self.backend = None
+
+    @property
+    def model(self):
+        """Модель движка (для whisper-движков — whisper.model.Whisper)."""
+        return getattr(self.backend, "model", None)
+
+    @contextlib.contextmanager
+    def _stage(self):
+        """Загруженная модель и бюджет потоков на время инференса."""
+        with contextlib.ExitStack() as stack:
+            if self.memory is not None:
+                stack.enter_context(self.memory.use("stt"))
+            if self.threads is not None:
+                stack.enter_context(self.threads.stage("stt"))
+            yield
+
+    def warmup(self, language: str = "ru") -> None:
+        """
+        Прогоняет короткое декодирование тишины, чтобы первая реальная фраза
+        не платила за ленивую инициализацию (выделение памяти, JIT-ядра, токенизатор).
+
+        Args:
+            language: Язык распознавания
+        """
+        with self._stage():
+            self.backend.warmup(language)
+
+    def transcribe_segments(
+        self,
+        audio: np.ndarray,
+        language: str = "ru",
+        initial_prompt: str | None = None,
+        word_timestamps: bool = False,
+    ) -> list[dict]:
+        """
+        Распознаёт аудио и возвращает сегменты с временными метками.
+
+        Args:
+            audio: Моно-аудио float32 с частотой 16 кГц
+            language: Язык распознавания
+            initial_prompt: Уже распознанный текст, который служит контекстом
+            word_timestamps: Добавить в сегменты слова с временными метками
+
+        Returns:
+            Список сегментов: {"text", "start", "end"} (время в секундах), с
+            word_timestamps — ещё "words": список {"text", "start", "end"}
+        """
+        with self._stage():
+            result = self.backend.transcribe(
+                audio.astype(np.float32, copy=False),
+                language=language,
+                initial_prompt=initial_prompt,
+                condition_on_previous_text=False,
+                word_timestamps=word_timestamps,
+            )
+        segments = []
+        for seg in result.get("segments", []):
+            segment = {"text": seg["text"].strip(), "start": seg["start"], "end": seg["end"]}
+            if word_timestamps:
+                segment["words"] = [
+                    {"text": word["word"].strip(), "start": word["start"], "end": word["end"]}
+                    for word in seg.get("words", [])
+                ]
+            segments.append(segment)
+        return segments
+
+    def transcribe(self, audio: Path | np.ndarray, language: str = "ru") -> str:
         """
-        Преобразует аудиофайл в текст.
+        Преобразует аудио в текст.
 
         Args:
-            audio_path: Путь к аудиофайлу
+            audio: Путь к аудиофайлу либо моно-аудио float32 с частотой 16 кГц.
+                   Массив передаётся в Whisper напрямую, без ffmpeg и диска.
             language: Язык распознавания (по умолчанию русский)
 
         Returns:
             Распознанный текст
         """
-        result = self.model.transcribe(str(audio_path), language=language)
+        if isinstance(audio, np.ndarray):
+            source = audio.astype(np.float32, copy=False)
+        else:
+            source = str(audio)
+        with self._stage():
+            result = self.backend.transcribe(source, language=language)
         return result.get("text", "").strip()
 
+    def transcribe_batch(self, audios: list[np.ndarray], language: str = "ru") -> list[str]:
+        """
+        Распознаёт несколько фраз одним батчем (для сетевого режима с несколькими клиентами).
+
+        Args:
+            audios: Моно-аудио float32 с частотой 16 кГц
+            language: Язык распознавания
+
+        Returns:
+            Тексты в том же порядке
+        """
+        audios = [audio.astype(np.float32, copy=False) for audio in audios]
+        with self._stage():
+            return self.backend.transcribe_batch(audios, language=language)
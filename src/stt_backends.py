@@ -0,0 +1,182 @@
+"""Сменные движки распознавания речи для SpeechToText."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import torch
+import whisper
+
+from .snapshots import SnapshotStore, load_whisper_model
+
+
+class STTBackend(ABC):
+    """
+    Интерфейс движка STT.
+
+    Все движки принимают путь к файлу или моно-аудио float32 16 кГц и
+    возвращают результат в формате whisper: {"text": ..., "segments": [...]},
+    где каждый сегмент содержит "text", "start" и "end" в секундах.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(
+        self, audio: str | np.ndarray, language: str = "ru", **options
+    ) -> dict:
+        """Распознаёт аудио; options передаются движку (initial_prompt и т.п.)."""
+
+    def warmup(self, language: str = "ru") -> None:
+        """Прогревает движок коротким прогоном (по умолчанию — распознаванием тишины)."""
+        self.transcribe(np.zeros(16000, dtype=np.float32), language=language)
+
+    def transcribe_batch(self, audios: list[np.ndarray], language: str = "ru") -> list[str]:
+        """
+        Распознаёт несколько фраз за один вызов (по умолчанию — по очереди).
+
+        Args:
+            audios: Моно-аудио float32 16 кГц
+            language: Язык распознавания
+
+        Returns:
+            Тексты в том же порядке
+        """
+        return [self.transcribe(audio, language=language)["text"].strip() for audio in audios]
+
+
+class WhisperBackend(STTBackend):
+    """openai-whisper в PyTorch (fp32 на CPU, fp16 на GPU)."""
+
+    name = "whisper"
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: str | None = None,
+        snapshots: SnapshotStore | None = None,
+    ):
+        """
+        Args:
+            model_name: Название модели Whisper (tiny, base, small, medium, large)
+            device: Устройство ('cuda' или 'cpu'); None — выбрать автоматически
+            snapshots: Каталог снимков для быстрой повторной загрузки
+        """
+        self.model = load_whisper_model(model_name, device, snapshots)
+
+    @property
+    def fp16(self) -> bool:
+        return self.model.device.type == "cuda"
+
+    def transcribe(self, audio: str | np.ndarray, language: str = "ru", **options) -> dict:
+        return self.model.transcribe(audio, language=language, fp16=self.fp16, **options)
+
+    def transcribe_batch(self, audios: list[np.ndarray], language: str = "ru") -> list[str]:
+        """
+        Декодирует фразы до 30 секунд одним батчем whisper.decode.
+
+        Энкодер и декодер обрабатывают батч за один проход, поэтому несколько
+        одновременных фраз обходятся почти как одна. Длинные фразы
+        распознаются по отдельности через transcribe.
+        """
+        texts = [""] * len(audios)
+        short = [i for i, audio in enumerate(audios) if audio.size <= whisper.audio.N_SAMPLES]
+        if short:
+            mels = torch.stack(
+                [
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(audios[i]), n_mels=self.model.dims.n_mels
+                    )
+                    for i in short
+                ]
+            ).to(self.model.device)
+            options = whisper.DecodingOptions(
+                language=language, without_timestamps=True, fp16=self.fp16
+            )
+            for i, result in zip(short, whisper.decode(self.model, mels, options)):
+                # Тот же критерий тишины, что и в whisper.transcribe
+                if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                    continue
+                texts[i] = result.text.strip()
+        for i, audio in enumerate(audios):
+            if audio.size > whisper.audio.N_SAMPLES:
+                texts[i] = self.transcribe(audio, language=language)["text"].strip()
+        return texts
+
+    def warmup(self, language: str = "ru") -> None:
+        """Одно короткое декодирование: инициализирует ядра и токенизатор без полного прохода."""
+        silence = whisper.pad_or_trim(np.zeros(16000, dtype=np.float32))
+        mel = whisper.log_mel_spectrogram(silence, n_mels=self.model.dims.n_mels)
+        options = whisper.DecodingOptions(
+            language=language, without_timestamps=True, sample_len=1, fp16=self.fp16
+        )
+        whisper.decode(self.model, mel.to(self.model.device), options)
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """
+    openai-whisper с динамической int8-квантизацией линейных слоёв на CPU.
+
+    Веса линейных слоёв (основная часть вычислений энкодера и декодера)
+    хранятся в int8 и умножаются через оптимизированные ядра fbgemm/qnnpack,
+    что уменьшает память модели и ускоряет инференс на CPU без GPU.
+    """
+
+    name = "whisper-int8"
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: str | None = None,
+        snapshots: SnapshotStore | None = None,
+    ):
+        if device not in (None, "cpu"):
+            raise ValueError("Квантизованный Whisper работает только на CPU.")
+        # В снимке хранятся веса fp32: квантизация быстрее, чем загрузка чекпойнта
+        self.model = load_whisper_model(model_name, "cpu", snapshots)
+        # whisper.model.Linear лишь приводит dtype весов к входу; для fp32 на CPU
+        # он эквивалентен nn.Linear, а quantize_dynamic распознаёт только его
+        for module in self.model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = torch.nn.Linear
+        torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+    @property
+    def fp16(self) -> bool:
+        return False
+
+
+STT_BACKENDS: dict[str, type[STTBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    QuantizedWhisperBackend.name: QuantizedWhisperBackend,
+}
+
+
+def create_backend(
+    name: str,
+    model_name: str,
+    device: str | None = None,
+    snapshots: SnapshotStore | None = None,
+) -> STTBackend:
+    """
+    Создаёт движок STT по имени.
+
+    Args:
+        name: Имя движка ('whisper' или 'whisper-int8')
+        model_name: Название модели
+        device: Устройство для вычислений
+        snapshots: Каталог снимков моделей (None — загружать обычным путём)
+
+    Returns:
+        Экземпляр движка
+    """
+    try:
+        backend_cls = STT_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный движок STT '{name}'. Доступные: {', '.join(sorted(STT_BACKENDS))}"
+        ) from None
+    return backend_cls(model_name, device=device, snapshots=snapshots)
@@ -0,0 +1,227 @@
+"""Потоковое распознавание: Whisper работает, пока пользователь ещё говорит."""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .stt import SpeechToText
+
+# Частота дискретизации аудио, которое принимает Whisper
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class StreamingStats:
+    """Метрики одной фразы потокового распознавания."""
+
+    passes: int = 0  # Сколько фоновых проходов Whisper выполнено
+    committed_seconds: float = 0.0  # Аудио, распознанное до конца речи
+    tail_seconds: float = 0.0  # Аудио, оставшееся на распознавание после конца речи
+    final_seconds: float = 0.0  # Время от конца речи до текста, с ожиданием идущего прохода
+
+
+class StreamingTranscriber:
+    """
+    Инкрементальное распознавание растущей фразы.
+
+    Пока пользователь говорит, фоновый поток распознаёт нераспознанный хвост
+    фразы и фиксирует «устойчивый префикс»: сегменты, которые совпали в двух
+    подряд гипотезах и закончились не ближе guard_seconds к краю окна
+    (принцип local agreement). Если не совпал ни один сегмент (короткую фразу
+    Whisper обычно отдаёт одним растущим сегментом), префикс ищется по словам
+    с их временными метками. Зафиксированный текст больше не пересчитывается,
+    поэтому после конца речи декодируется только короткий хвост, а если
+    последний проход уже видел всю речь — не декодируется ничего.
+    """
+
+    def __init__(
+        self,
+        stt: SpeechToText,
+        language: str = "ru",
+        min_window: float = 1.0,
+        guard_seconds: float = 1.0,
+    ):
+        """
+        Args:
+            stt: Распознаватель, модель которого используется для проходов
+            language: Язык распознавания
+            min_window: Минимальная длина нераспознанного аудио для фонового прохода, с
+            guard_seconds: Сегменты, кончающиеся ближе этого к краю окна, не фиксируются
+        """
+        self.stt = stt
+        self.language = language
+        self.min_window = min_window
+        self.guard_seconds = guard_seconds
+        self.last_stats = StreamingStats()
+        self._model_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._latest: np.ndarray | None = None
+        self._committed_text: list[str] = []
+        self._committed_samples = 0
+        self._previous: list[dict] = []
+        self._window_end = 0  # Конец окна последнего прохода, отсчётов от начала фразы
+        self._active = False
+        self._stats = StreamingStats()
+
+    def begin(self) -> None:
+        """Начинает новую фразу и запускает фоновый поток."""
+        self.end()
+        with self._cond:
+            self._reset()
+            self._active = True
+        self._worker = threading.Thread(target=self._run, name="stt-stream", daemon=True)
+        self._worker.start()
+
+    def update(self, audio: np.ndarray) -> None:
+        """
+        Передаёт текущее состояние фразы (от её начала). Не блокирует:
+        если предыдущий проход ещё идёт, будет обработано только самое свежее аудио.
+        """
+        with self._cond:
+            self._latest = audio
+            self._cond.notify()
+
+    def end(self) -> None:
+        """Останавливает фоновый поток, дождавшись текущего прохода."""
+        with self._cond:
+            self._active = False
+            self._cond.notify()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def finish(self, audio: np.ndarray, speech_seconds: float | None = None) -> str:
+        """
+        Завершает фразу: докодирует нераспознанный хвост и возвращает полный текст.
+
+        Идущий фоновый проход дожидается: если его окно покрывает всю речь,
+        его гипотеза и есть хвост, и повторного декодирования нет.
+
+        Args:
+            audio: Вся фраза (float32, 16 кГц) с того же начала, что и в update
+            speech_seconds: Сколько секунд от начала фразы занимает речь (дальше —
+                            тишина, по которой VAD завершил фразу); None — вся фраза
+        """
+        started = time.perf_counter()
+        self.end()
+        speech_end = audio.size if speech_seconds is None else int(speech_seconds * SAMPLE_RATE)
+        tail = audio[self._committed_samples :]
+        if self._stats.passes and self._window_end >= speech_end:
+            segments, tail = self._previous, tail[:0]
+        elif tail.size:
+            segments = self._transcribe(tail)
+        else:
+            segments = []
+        tail_text = " ".join(seg["text"] for seg in segments if seg["text"])
+
+        stats = self._stats
+        stats.committed_seconds = self._committed_samples / SAMPLE_RATE
+        stats.tail_seconds = tail.size / SAMPLE_RATE
+        stats.final_seconds = time.perf_counter() - started
+        self.last_stats = stats
+        return " ".join(part for part in (*self._committed_text, tail_text) if part).strip()
+
+    def _transcribe(self, audio: np.ndarray, words: bool = False) -> list[dict]:
+        prompt = " ".join(self._committed_text) or None
+        with self._model_lock:
+            return self.stt.transcribe_segments(
+                audio, self.language, initial_prompt=prompt, word_timestamps=words
+            )
+
+    def _run(self) -> None:
+        """Фоновые проходы по мере поступления аудио."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._active or self._latest is not None)
+                if not self._active:
+                    return
+                audio, self._latest = self._latest, None
+
+            window = audio[self._committed_samples :]
+            if window.size < self.min_window * SAMPLE_RATE:
+                continue
+            segments = self._transcribe(window, words=True)
+            self._stats.passes += 1
+            window_end = self._committed_samples + window.size
+            self._commit_stable(segments, window.size / SAMPLE_RATE)
+            self._window_end = window_end
+
+    def _commit_stable(self, segments: list[dict], window_seconds: float) -> None:
+        """Фиксирует совпавший с прошлой гипотезой префикс сегментов, иначе — слов."""
+        limit = window_seconds - self.guard_seconds
+        stable = 0
+        for current, previous in zip(segments, self._previous):
+            if current["text"] != previous["text"] or current["end"] > limit:
+                break
+            stable += 1
+
+        if stable:
+            committed = [seg["text"] for seg in segments[:stable] if seg["text"]]
+            shift = segments[stable - 1]["end"]
+            rest = segments[stable:]
+        else:
+            words = [word for seg in segments for word in seg.get("words", [])]
+            previous_words = [word for seg in self._previous for word in seg.get("words", [])]
+            for current, previous in zip(words, previous_words):
+                if _word_key(current) != _word_key(previous) or current["end"] > limit:
+                    break
+                stable += 1
+            if stable == 0:
+                self._previous = segments
+                return
+            committed = [" ".join(word["text"] for word in words[:stable])]
+            shift = words[stable - 1]["end"]
+            rest = _drop_words(segments, stable)
+
+        self._committed_text.extend(committed)
+        self._committed_samples += int(shift * SAMPLE_RATE)
+        # Оставшиеся сегменты отсчитываются от нового начала окна
+        self._previous = [_shift(seg, shift) for seg in rest]
+
+
+def _word_key(word: dict) -> str:
+    """Слово для сравнения гипотез: без регистра и пунктуации."""
+    return re.sub(r"\W+", "", word["text"].lower())
+
+
+def _drop_words(segments: list[dict], count: int) -> list[dict]:
+    """Сегменты без первых count слов (сегмент, разрезанный словом, укорачивается)."""
+    rest = []
+    for seg in segments:
+        words = seg.get("words", [])
+        if count and count >= len(words):
+            count -= len(words)
+            continue
+        if count:
+            words = words[count:]
+            seg = {
+                "text": " ".join(word["text"] for word in words),
+                "start": words[0]["start"],
+                "end": seg["end"],
+                "words": words,
+            }
+            count = 0
+        rest.append(seg)
+    return rest
+
+
+def _shift(segment: dict, seconds: float) -> dict:
+    """Сдвигает метки сегмента и его слов на seconds назад."""
+    shifted = {**segment, "start": segment["start"] - seconds, "end": segment["end"] - seconds}
+    if "words" in segment:
+        shifted["words"] = [
+            {**word, "start": word["start"] - seconds, "end": word["end"] - seconds}
+            for word in segment["words"]
+        ]
+    return shifted
@@ -0,0 +1,346 @@
+"""Подготовка текста к синтезу: нормализация вывода LLM и нарезка на куски ограниченной длины."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+try:
+    from razdel import sentenize
+except ImportError:  # razdel необязателен: без него предложения режутся регулярным выражением
+    sentenize = None
+
+_UNITS = (
+    "ноль", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять",
+    "десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать", "пятнадцать",
+    "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать",
+)
+_TENS = (
+    "", "", "двадцать", "тридцать", "сорок", "пятьдесят",
+    "шестьдесят", "семьдесят", "восемьдесят", "девяносто",
+)
+_HUNDREDS = (
+    "", "сто", "двести", "триста", "четыреста", "пятьсот",
+    "шестьсот", "семьсот", "восемьсот", "девятьсот",
+)
+# Разряды: формы для 1, 2–4, 5+ и род (тысяча — женского рода)
+_SCALES = (
+    (("тысяча", "тысячи", "тысяч"), True),
+    (("миллион", "миллиона", "миллионов"), False),
+    (("миллиард", "миллиарда", "миллиардов"), False),
+)
+
+# Единицы после числа: «5 км» → «пять километров»
+_UNIT_FORMS = {
+    "%": ("процент", "процента", "процентов"),
+    "км": ("километр", "километра", "километров"),
+    "м": ("метр", "метра", "метров"),
+    "мл": ("миллилитр", "миллилитра", "миллилитров"),
+    "мин": ("минута", "минуты", "минут"),
+    "кг": ("килограмм", "килограмма", "килограммов"),
+    "руб": ("рубль", "рубля", "рублей"),
+    "₽": ("рубль", "рубля", "рублей"),
+    "$": ("доллар", "доллара", "долларов"),
+    "€": ("евро", "евро", "евро"),
+    "°C": ("градус", "градуса", "градусов"),
+    "°": ("градус", "градуса", "градусов"),
+    "тыс": ("тысяча", "тысячи", "тысяч"),
+    "млн": ("миллион", "миллиона", "миллионов"),
+    "млрд": ("миллиард", "миллиарда", "миллиардов"),
+}
+_UNIT_RE = re.compile(
+    r"(?<![\w.,])(-?\d+)(?:[.,](\d{1,2}))?\s?"
+    r"(%|км|м|мл|мин\.?|кг|руб\.?|₽|\$|€|°C|°|тыс\.?|млн\.?|млрд\.?)(?!\w)"
+)
+_CURRENCY_PREFIX_RE = re.compile(r"([$€])\s?(\d+)(?![.,]?\d)")
+# Разделитель разрядов: «1 500» → «1500»
+_THOUSANDS_RE = re.compile(r"(?<![\d.,])(\d{1,3})((?:[ \u00a0\u202f]\d{3})+)(?![\d.,]?\d)")
+# «5 тыс. руб.» после раскрытия разряда: валюта в родительном падеже
+_SCALE_CURRENCY_RE = re.compile(r"\b(тысяч[аи]?|миллион\w*|миллиард\w*)\s(?:руб\.?|₽)(?!\w)")
+_PLUS_RE = re.compile(r"(?<![\w)])\+(?=\d)")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+(?=[.,!?;:…])")
+
+# Сокращения, которые Silero читает по буквам или обрывает на точке
+_ABBREVIATIONS = (
+    (re.compile(r"\bт\.\s?е\.", re.IGNORECASE), "то есть"),
+    (re.compile(r"\bт\.\s?д\.", re.IGNORECASE), "так далее"),
+    (re.compile(r"\bт\.\s?п\.", re.IGNORECASE), "тому подобное"),
+    (re.compile(r"\bт\.\s?к\.", re.IGNORECASE), "так как"),
+    (re.compile(r"\bи\s?др\.", re.IGNORECASE), "и другие"),
+    (re.compile(r"\bнапр\.", re.IGNORECASE), "например"),
+    (re.compile(r"\bприм\.", re.IGNORECASE), "примечание"),
+    (re.compile(r"№\s?"), "номер "),
+    (re.compile(r"\s&\s"), " и "),
+    (re.compile(r"\s\+\s"), " плюс "),
+    (re.compile(r"\s=\s"), " равно "),
+)
+
+_CODE_BLOCK_RE = re.compile(r"```.*?(```|$)", re.DOTALL)
+_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_LIST_MARK_RE = re.compile(r"^\s*(?:[-*+•]|\d{1,2}[.)])\s+", re.MULTILINE)
+_HEADER_RE = re.compile(r"^\s*#{1,6}\s*", re.MULTILINE)
+_EMPHASIS_RE = re.compile(r"(\*{1,3}|_{2,3}|~~|`)")
+_TIME_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+_DECIMAL_RE = re.compile(r"(?<![\d.,])(-?\d+)[.,](\d{1,2})(?![\d.,]?\d)")
+_NUMBER_RE = re.compile(r"(?<![\w.,])(-?)(\d+)(?!\w)")
+
+# Границы частей предложения в порядке предпочтения при нарезке
+_CLAUSE_BREAKS = (
+    re.compile(r"(?<=[;:])\s+"),
+    re.compile(r"(?<=,)\s+|\s+(?=[—–]\s)"),
+    re.compile(r"\s+(?=(?:и|а|но|или|что|чтобы|потому|если|когда|который|которая)\s)"),
+    re.compile(r"\s+"),
+)
+_SENTENCE_RE = re.compile(r"(?<=[\.\!\?…])\s+")
+
+
+def _plural(number: int, forms: tuple[str, str, str]) -> str:
+    """Форма слова для числа: 1 километр, 2 километра, 5 километров."""
+    number = abs(number)
+    if number % 10 == 1 and number % 100 != 11:
+        return forms[0]
+    if 2 <= number % 10 <= 4 and not 12 <= number % 100 <= 14:
+        return forms[1]
+    return forms[2]
+
+
+def _triplet(number: int, feminine: bool) -> list[str]:
+    """Число от 1 до 999 прописью."""
+    words = []
+    hundreds, rest = divmod(number, 100)
+    if hundreds:
+        words.append(_HUNDREDS[hundreds])
+    if rest >= 20:
+        tens, rest = divmod(rest, 10)
+        words.append(_TENS[tens])
+    if rest:
+        word = _UNITS[rest]
+        if feminine and rest in (1, 2):
+            word = "одна" if rest == 1 else "две"
+        words.append(word)
+    return words
+
+
+def spell_number(number: int, feminine: bool = False) -> str:
+    """
+    Целое число прописью в именительном падеже.
+
+    Args:
+        number: Число (до миллиардов; длиннее — по цифрам)
+        feminine: Женский род для последнего разряда («одна», «две»)
+
+    Returns:
+        Число словами, например «две тысячи двадцать пять»
+    """
+    if number < 0:
+        return "минус " + spell_number(-number, feminine)
+    if number == 0:
+        return _UNITS[0]
+    if number >= 1000 ** (len(_SCALES) + 1):
+        return " ".join(_UNITS[int(digit)] for digit in str(number))
+
+    words = []
+    for power in range(len(_SCALES), 0, -1):
+        chunk = number // 1000**power % 1000
+        if chunk:
+            forms, scale_feminine = _SCALES[power - 1]
+            words.extend(_triplet(chunk, scale_feminine))
+            words.append(_plural(chunk, forms))
+    words.extend(_triplet(number % 1000, feminine))
+    return " ".join(words)
+
+
+def _with_period(match: re.Match, words: str) -> str:
+    """Сохраняет точку сокращения, если она же заканчивает предложение."""
+    rest = match.string[match.end() :].lstrip()
+    if match.group(0).endswith(".") and (not rest or rest[0].isupper()):
+        return words + "."
+    return words
+
+
+def _spell_decimal(match: re.Match) -> str:
+    """«3,5» → «три целых пять десятых»."""
+    return _decimal_words(int(match.group(1)), match.group(2))
+
+
+def _decimal_words(whole: int, fraction: str) -> str:
+    denominators = {
+        1: ("десятая", "десятых", "десятых"),
+        2: ("сотая", "сотых", "сотых"),
+    }[len(fraction)]
+    return (
+        f"{spell_number(whole, feminine=True)} {_plural(whole, ('целая', 'целых', 'целых'))} "
+        f"{spell_number(int(fraction), feminine=True)} {_plural(int(fraction), denominators)}"
+    )
+
+
+def _spell_unit(match: re.Match) -> str:
+    """«5 км» → «пять километров», «2,5 кг» → «две целых пять десятых килограмма»."""
+    number, fraction = int(match.group(1)), match.group(2)
+    unit = match.group(3).rstrip(".")
+    forms = _UNIT_FORMS[unit]
+    if fraction is not None:
+        words = f"{_decimal_words(number, fraction)} {forms[1]}"
+    else:
+        feminine = unit in ("тыс", "мин")
+        words = f"{spell_number(number, feminine)} {_plural(number, forms)}"
+    return _with_period(match, words)
+
+
+def strip_markdown(text: str) -> str:
+    """
+    Убирает разметку Markdown, которую LLM вставляет в ответы.
+
+    Блоки кода выбрасываются, ссылки заменяются их текстом, у строк списков
+    и заголовков убираются маркеры, а строка без знака конца предложения
+    получает точку, чтобы пункты списка не слились в одно длинное предложение.
+    """
+    text = _CODE_BLOCK_RE.sub(" ", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _URL_RE.sub("ссылка", text)
+    text = _HEADER_RE.sub("", text)
+    text = _LIST_MARK_RE.sub("", text)
+    text = _EMPHASIS_RE.sub("", text)
+    text = text.replace("|", ", ")
+    lines = []
+    for line in text.splitlines():
+        line = line.strip(" ,")
+        if not line:
+            continue
+        if line[-1] not in ".!?…:;,":
+            line += "."
+        lines.append(line)
+    return " ".join(lines)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Приводит ответ LLM к тексту, который Silero читает без ошибок.
+
+    Markdown убирается, сокращения раскрываются, числа (в том числе с
+    единицами, дробные и время) записываются словами, эмодзи и прочие
+    символы вне речи удаляются.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        Нормализованный текст в одну строку
+    """
+    text = strip_markdown(text)
+    for pattern, replacement in _ABBREVIATIONS:
+        text = pattern.sub(lambda m, words=replacement: _with_period(m, words), text)
+    text = _PLUS_RE.sub("плюс ", text)
+    text = _THOUSANDS_RE.sub(lambda m: m.group(1) + re.sub(r"\D", "", m.group(2)), text)
+    text = _CURRENCY_PREFIX_RE.sub(lambda m: f"{m.group(2)} {m.group(1)}", text)
+    text = _UNIT_RE.sub(_spell_unit, text)
+    text = _SCALE_CURRENCY_RE.sub(r"\1 рублей", text)
+    text = _TIME_RE.sub(
+        lambda m: f"{spell_number(int(m.group(1)))} "
+        + ("ноль ноль" if m.group(2) == "00" else spell_number(int(m.group(2)), feminine=True)),
+        text,
+    )
+    text = _DECIMAL_RE.sub(_spell_decimal, text)
+    text = _NUMBER_RE.sub(
+        lambda m: ("минус " if m.group(1) else "") + spell_number(int(m.group(2))), text
+    )
+    # Эмодзи, стрелки и прочие символы Silero не произносит, а иногда на них падает
+    text = "".join(ch for ch in text if unicodedata.category(ch) not in ("So", "Sk", "Co", "Cs"))
+    return _SPACE_BEFORE_PUNCT_RE.sub("", " ".join(text.split()))
+
+
+def split_sentences(text: str) -> list[str]:
+    """
+    Разбивает текст на предложения (razdel, без него — по знакам конца предложения).
+
+    Перевод строки тоже считается границей: строки списков и заголовки в
+    ответах LLM часто не заканчиваются точкой.
+    """
+    sentences = []
+    for line in text.splitlines():
+        if sentenize is not None:
+            parts = (s.text for s in sentenize(line))
+        else:
+            parts = _SENTENCE_RE.split(" ".join(line.split()))
+        sentences.extend(part.strip() for part in parts if part.strip())
+    return sentences
+
+
+def chunk_sentence(sentence: str, max_chars: int) -> list[str]:
+    """
+    Режет предложение на куски не длиннее max_chars по границам его частей.
+
+    Сначала пробуются «;» и «:», затем запятые и тире, затем союзы и только
+    потом пробелы между словами. Соседние части склеиваются, пока кусок
+    помещается в бюджет, поэтому коротких обрывков не получается. Слово
+    длиннее бюджета остаётся целым.
+
+    Args:
+        sentence: Предложение
+        max_chars: Бюджет длины куска в символах
+
+    Returns:
+        Куски в исходном порядке
+    """
+    if len(sentence) <= max_chars:
+        return [sentence]
+    for pattern in _CLAUSE_BREAKS:
+        parts = [part for part in pattern.split(sentence) if part]
+        if len(parts) > 1:
+            break
+    else:
+        return [sentence]
+
+    chunks: list[str] = []
+    current = ""
+    for part in parts:
+        candidate = f"{current} {part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        current = part
+    chunks.append(current)
+    # Часть, которая сама не влезла в бюджет, режется по следующему уровню границ
+    result: list[str] = []
+    for chunk in chunks:
+        result.extend(chunk_sentence(chunk, max_chars) if len(chunk) > max_chars else [chunk])
+    return result
+
+
+class TextPreparer:
+    """
+    Этап подготовки текста к синтезу: нормализация и куски ограниченной длины.
+
+    Длина куска ограничена в символах уже нормализованного текста, где числа
+    и сокращения записаны словами, поэтому бюджет примерно пропорционален
+    числу фонем и времени синтеза. Короткие куски дают раннее первое аудио и
+    ограничивают пиковую память Silero на длинных предложениях LLM.
+    """
+
+    def __init__(self, max_chars: int = 150):
+        """
+        Args:
+            max_chars: Максимальная длина куска для одного вызова синтеза
+        """
+        self.max_chars = max(20, max_chars)
+
+    def prepare(self, text: str) -> list[str]:
+        """
+        Нормализует предложение (или целый ответ LLM) и режет его на куски.
+
+        Args:
+            text: Предложение, фрагмент потока LLM или несколько предложений
+
+        Returns:
+            Куски для синтеза (пустой список, если произносить нечего)
+        """
+        text = normalize_text(text)
+        if not any(ch.isalnum() for ch in text):
+            return []
+        chunks = []
+        for sentence in split_sentences(text):
+            chunks.extend(chunk_sentence(sentence, self.max_chars))
+        return chunks
@@ -0,0 +1,186 @@
+"""Бюджет потоков CPU для этапов конвейера: Whisper, Silero и ввод-вывод звука."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
+
+from .config import AppConfig
+
+# Этапы с бюджетом: модели PyTorch и потоки записи/воспроизведения звука
+STAGES = ("stt", "tts", "audio")
+
+
+@dataclass(frozen=True)
+class StagePlan:
+    """Ресурсы этапа."""
+
+    threads: int | None  # Потоков intra-op PyTorch (None — этап без инференса)
+    cores: frozenset[int] | None = None  # Ядра для закрепления (None — не закреплять)
+
+
+def available_cores() -> list[int]:
+    """Ядра, доступные процессу (с учётом taskset/cgroup, где это поддерживается)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _torch():
+    """Модуль torch, если он установлен (этап audio обходится без него)."""
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch
+
+
+class ThreadBudget:
+    """
+    Распределяет ядра CPU между этапами, чтобы Whisper и Silero не конкурировали за них.
+
+    Если каждая модель выставляет себе все ядра, то при одновременном
+    инференсе Whisper и Silero потоков оказывается вдвое больше, чем ядер,
+    и поток звука вытесняется вместе с ними. Бюджет делит ядра заранее:
+    audio_cores ядер остаются звуку, остальные делятся между STT и TTS так,
+    чтобы одновременный инференс не переподписывал CPU.
+
+    Инференс оборачивается в stage(name): на время вызова в текущем потоке
+    выставляется число потоков этапа (и, при pin=True, привязка к его ядрам),
+    после вызова возвращаются прежние значения. В сборках PyTorch с OpenMP
+    (Linux, Windows) число потоков действует на вызывающий поток, поэтому
+    этапы в разных исполнителях получают каждый свой бюджет. Привязка к
+    ядрам работает там, где есть os.sched_setaffinity (Linux); на других
+    платформах она пропускается.
+    """
+
+    def __init__(
+        self,
+        stt_threads: int | None = None,
+        tts_threads: int | None = None,
+        audio_cores: int = 1,
+        pin: bool = False,
+        cores: list[int] | None = None,
+    ):
+        """
+        Args:
+            stt_threads: Потоков для Whisper (None — примерно 60% свободных ядер)
+            tts_threads: Потоков для Silero (None — оставшиеся ядра)
+            audio_cores: Ядер, не отдаваемых моделям (запись и воспроизведение звука)
+            pin: Закреплять этапы за непересекающимися наборами ядер
+            cores: Доступные ядра (по умолчанию — ядра процесса)
+        """
+        self.cores = list(cores) if cores is not None else available_cores()
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+        if pin and not self.pin:
+            print("[Threads] Привязка к ядрам не поддерживается на этой платформе, пропускаю.")
+        self.plan = self._make_plan(stt_threads, tts_threads, audio_cores)
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> ThreadBudget:
+        """Создаёт бюджет по параметрам cpu_* конфигурации."""
+        audio_cores = config.cpu_audio_cores
+        return cls(
+            stt_threads=config.cpu_stt_threads,
+            tts_threads=config.cpu_tts_threads,
+            audio_cores=audio_cores if audio_cores is not None else 1,
+            pin=bool(config.cpu_pin_stages),
+        )
+
+    def _make_plan(
+        self, stt_threads: int | None, tts_threads: int | None, audio_cores: int
+    ) -> dict[str, StagePlan]:
+        """Раскладывает ядра по этапам: сначала звук, затем STT, затем TTS."""
+        total = len(self.cores)
+        audio = min(max(0, audio_cores), total - 1)
+        self.audio_cores = audio
+        free = total - audio
+        if stt_threads is None and tts_threads is None:
+            stt_threads = max(1, round(free * 0.6))
+            tts_threads = max(1, free - stt_threads)
+        elif stt_threads is None:
+            stt_threads = max(1, free - tts_threads)
+        elif tts_threads is None:
+            tts_threads = max(1, free - stt_threads)
+        stt_threads = max(1, stt_threads)
+        tts_threads = max(1, tts_threads)
+
+        plan = {
+            "stt": StagePlan(stt_threads),
+            "tts": StagePlan(tts_threads),
+            "audio": StagePlan(None),
+        }
+        if not self.pin:
+            return plan
+
+        # Ядра звука берутся с конца списка: нулевое ядро обычно нагружено системой.
+        # Если потоков задано больше, чем ядер, наборы STT и TTS пересекаются по кругу.
+        audio_set = self.cores[total - audio:] if audio else self.cores
+        model_cores = self.cores[: total - audio] or self.cores
+
+        def take(start: int, count: int) -> frozenset[int]:
+            return frozenset(model_cores[(start + i) % len(model_cores)] for i in range(count))
+
+        return {
+            "stt": StagePlan(stt_threads, take(0, stt_threads)),
+            "tts": StagePlan(tts_threads, take(stt_threads, tts_threads)),
+            "audio": StagePlan(None, frozenset(audio_set)),
+        }
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[StagePlan]:
+        """
+        Выполняет блок с бюджетом этапа в текущем потоке.
+
+        Args:
+            name: Этап из STAGES
+
+        Yields:
+            Ресурсы этапа
+        """
+        plan = self.plan[name]
+        previous = self._apply(plan)
+        try:
+            yield plan
+        finally:
+            self._apply(previous)
+
+    def bind(self, name: str) -> None:
+        """Закрепляет бюджет этапа за текущим потоком (инициализатор исполнителя)."""
+        self._apply(self.plan[name])
+
+    def _apply(self, plan: StagePlan) -> StagePlan:
+        """Выставляет ресурсы потоку; возвращает прежние, чтобы их можно было вернуть."""
+        current: StagePlan = getattr(self._local, "plan", None) or StagePlan(None)
+        if plan.threads is not None and plan.threads != current.threads:
+            torch = _torch()
+            if torch is not None:
+                if current.threads is None:
+                    current = replace(current, threads=torch.get_num_threads())
+                torch.set_num_threads(plan.threads)
+        if self.pin and plan.cores is not None and plan.cores != current.cores:
+            if current.cores is None:
+                current = replace(current, cores=frozenset(os.sched_getaffinity(0)))
+            # pid 0 в Linux — вызывающий поток, а не весь процесс
+            os.sched_setaffinity(0, plan.cores)
+        self._local.plan = StagePlan(
+            plan.threads if plan.threads is not None else current.threads,
+            plan.cores if plan.cores is not None else current.cores,
+        )
+        return current
+
+    def describe(self) -> str:
+        """Краткое описание плана для лога запуска."""
+        parts = []
+        for name in STAGES:
+            plan = self.plan[name]
+            cores = f" (ядра {','.join(map(str, sorted(plan.cores)))})" if plan.cores else ""
+            if name == "audio":
+                parts.append(f"звук — {self.audio_cores} в резерве{cores}")
+            else:
+                parts.append(f"{name} — {plan.threads} потоков{cores}")
+        return f"{len(self.cores)} ядер: " + ", ".join(parts)
@@ -0,0 +1,201 @@
+"""
+Трассировка задержек по этапам обработки одной реплики.
+
+Каждая реплика (turn) собирает отметки времени ключевых событий, из
+которых строятся интервалы-этапы. Трассы пишутся построчно в JSONL с
+ротацией файлов; сводку p50/p95/p99 по этапам печатает команда:
+
+    python -m src.tracing summary logs/turns.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import logging.handlers
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+# Ключевые события реплики в порядке их наступления
+SPEECH_END = "speech_end"
+STT_DONE = "stt_done"
+LLM_FIRST_TOKEN = "llm_first_token"
+LLM_LAST_TOKEN = "llm_last_token"
+TTS_FIRST_AUDIO = "tts_first_audio"
+FIRST_PLAY = "first_play"
+
+# Этапы: имя -> (событие начала, событие конца)
+STAGES: dict[str, tuple[str, str]] = {
+    "stt": (SPEECH_END, STT_DONE),
+    "llm_ttft": (STT_DONE, LLM_FIRST_TOKEN),
+    "llm_generation": (LLM_FIRST_TOKEN, LLM_LAST_TOKEN),
+    "tts_first_audio": (LLM_FIRST_TOKEN, TTS_FIRST_AUDIO),
+    "playback_start": (TTS_FIRST_AUDIO, FIRST_PLAY),
+    "speech_to_first_play": (SPEECH_END, FIRST_PLAY),
+}
+
+
+class TurnTrace:
+    """Отметки времени событий одной реплики."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.turn_id = next(self._ids)
+        self.wall_time = time.time()
+        self.marks: dict[str, float] = {}
+        self.attrs: dict[str, object] = {}
+
+    def mark(self, event: str, overwrite: bool = False) -> None:
+        """
+        Отмечает наступление события.
+
+        Args:
+            event: Имя события
+            overwrite: Перезаписать отметку (по умолчанию сохраняется первая)
+        """
+        if overwrite or event not in self.marks:
+            self.marks[event] = time.perf_counter()
+
+    def track_tokens(self, tokens: Iterable[str]) -> Iterator[str]:
+        """Пропускает поток токенов LLM, отмечая первый и последний токен."""
+        for token in tokens:
+            self.mark(LLM_FIRST_TOKEN)
+            yield token
+        self.mark(LLM_LAST_TOKEN)
+
+    def spans(self) -> dict[str, float]:
+        """Длительности этапов в секундах (только для этапов с обеими отметками)."""
+        result = {}
+        for stage, (start, end) in STAGES.items():
+            if start in self.marks and end in self.marks:
+                result[stage] = self.marks[end] - self.marks[start]
+        return result
+
+    def to_record(self) -> dict:
+        """Структурированная запись трассы для JSONL."""
+        origin = min(self.marks.values(), default=0.0)
+        return {
+            "turn": self.turn_id,
+            "ts": self.wall_time,
+            "events": {name: round((t - origin) * 1000, 2) for name, t in self.marks.items()},
+            "spans": [
+                {
+                    "stage": stage,
+                    "start_ms": round((self.marks[STAGES[stage][0]] - origin) * 1000, 2),
+                    "duration_ms": round(seconds * 1000, 2),
+                }
+                for stage, seconds in self.spans().items()
+            ],
+            **({"attrs": self.attrs} if self.attrs else {}),
+        }
+
+    def summary_line(self) -> str:
+        """Однострочная сводка для консоли."""
+        parts = [f"{stage} {seconds:.2f} с" for stage, seconds in self.spans().items()]
+        return " | ".join(parts)
+
+
+class TraceWriter:
+    """Записывает трассы реплик в JSONL-файл с ротацией по размеру."""
+
+    def __init__(self, path: Path | str, max_bytes: int = 5 * 1024 * 1024, backups: int = 3):
+        """
+        Args:
+            path: Путь к JSONL-файлу
+            max_bytes: Размер файла, после которого он ротируется
+            backups: Сколько старых файлов хранить (path.1, path.2, ...)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.getLogger(f"{__name__}.{self.path}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+
+    def write(self, trace: TurnTrace) -> None:
+        """Дописывает трассу в файл."""
+        self._logger.info(json.dumps(trace.to_record(), ensure_ascii=False))
+
+    def close(self) -> None:
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией (q от 0 до 100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    pos = (len(ordered) - 1) * q / 100.0
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def load_records(path: Path | str) -> list[dict]:
+    """Читает трассы из файла и его ротированных копий (от старых к новым)."""
+    path = Path(path)
+    rotated = [p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()]
+    files = sorted(rotated, key=lambda p: int(p.suffix[1:]), reverse=True) + [path]
+    records = []
+    for file in files:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def summarize(records: list[dict]) -> dict[str, dict[str, float]]:
+    """Считает p50/p95/p99 и число замеров по каждому этапу, в миллисекундах."""
+    by_stage: dict[str, list[float]] = {}
+    for record in records:
+        for span in record.get("spans", []):
+            by_stage.setdefault(span["stage"], []).append(span["duration_ms"])
+    order = [s for s in STAGES if s in by_stage] + sorted(set(by_stage) - set(STAGES))
+    return {
+        stage: {
+            "count": len(by_stage[stage]),
+            "p50": percentile(by_stage[stage], 50),
+            "p95": percentile(by_stage[stage], 95),
+            "p99": percentile(by_stage[stage], 99),
+        }
+        for stage in order
+    }
+
+
+def print_summary(stats: dict[str, dict[str, float]]) -> None:
+    """Печатает таблицу перцентилей по этапам."""
+    print(f"{'этап':<22} {'n':>5} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9}")
+    for stage, row in stats.items():
+        print(
+            f"{stage:<22} {row['count']:>5} {row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сводка трасс задержек VoiceToNights")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="p50/p95/p99 по этапам")
+    summary.add_argument("path", nargs="?", default="logs/turns.jsonl")
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        records = load_records(args.path)
+        if not records:
+            print(f"[Trace] Нет трасс в {args.path}")
+            return
+        print(f"[Trace] Реплик: {len(records)}")
+        print_summary(summarize(records))
+
+
+if __name__ == "__main__":
+    main()
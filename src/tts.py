@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
 import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional
 
@@ -18,12 +23,113 @@ import torch
 import silero as silero_pkg
 from silero import silero_tts
 
+from .audio_out import AudioOutput, create_output
+from .memory_policy import MemoryPolicy
+from .snapshots import SnapshotStore, load_silero_model
+from .text_prep import TextPreparer, split_sentences
+from .threads import ThreadBudget
+from .tts_batch import build_ssml, group_chunks, split_on_breaks
+from .tts_cache import TTSCache
+
+# Пакет модели Silero; входит в ключ кэша аудио
+MODEL_ID = "v5_ru"
+
+# Граница предложения в потоке токенов: знак конца предложения (с закрывающими
+# кавычками/скобками) и пробел после него, либо перевод строки.
+_SENTENCE_END_RE = re.compile(r"[\.\!\?…]+[\"»)\]]*\s+|\n+")
+
+
+def _overlap_seconds(
+    first: list[tuple[float, float]], second: list[tuple[float, float]]
+) -> float:
+    """Суммарная длительность пересечения двух наборов непересекающихся интервалов."""
+    total = 0.0
+    i = j = 0
+    while i < len(first) and j < len(second):
+        start = max(first[i][0], second[j][0])
+        end = min(first[i][1], second[j][1])
+        if end > start:
+            total += end - start
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+
+class SentenceSplitter:
+    """
+    Инкрементально нарезает поток токенов LLM на законченные предложения.
+
+    Предложение отдаётся, как только в потоке появилась его граница, не дожидаясь
+    конца генерации. Слишком короткие фрагменты (например, "1." из нумерованного
+    списка) склеиваются со следующим предложением. Не зависит от того, синхронный
+    поток токенов или асинхронный.
+    """
+
+    def __init__(self, min_chars: int = 12):
+        """
+        Args:
+            min_chars: Минимальная длина предложения для отправки в синтез
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, token: str) -> list[str]:
+        """Добавляет фрагмент текста и возвращает предложения, которые в нём завершились."""
+        self._buffer += token
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            candidate = self._buffer[start : match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(" ".join(candidate.split()))
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str | None:
+        """Возвращает незавершённый остаток в конце потока (или None)."""
+        tail = " ".join(self._buffer.split())
+        self._buffer = ""
+        return tail or None
+
+
+@dataclass
+class SpeakStats:
+    """Метрики конвейера синтез/воспроизведение за один вызов speak_async."""
+
+    sentences: int = 0
+    synth_seconds: float = 0.0  # Суммарное время синтеза
+    play_seconds: float = 0.0  # Суммарное время воспроизведения
+    wait_seconds: float = 0.0  # Сколько воспроизведение простаивало в ожидании синтеза
+    hidden_seconds: float = 0.0  # Время синтеза, пришедшееся на воспроизведение
+
+    @property
+    def hidden_ratio(self) -> float:
+        """Доля времени синтеза, скрытая за воспроизведением."""
+        if self.synth_seconds <= 0:
+            return 0.0
+        return self.hidden_seconds / self.synth_seconds
+
 
 class SileroTTS:
     """Обёртка над Silero TTS для озвучивания текста."""
 
     def __init__(
-        self, speaker: str = "kseniya", sample_rate: int = 48000, device: str | None = None
+        self,
+        speaker: str = "kseniya",
+        sample_rate: int = 48000,
+        device: str | None = None,
+        lookahead: int = 2,
+        cache: TTSCache | None = None,
+        threads: ThreadBudget | None = None,
+        snapshots: SnapshotStore | None = None,
+        max_chunk_chars: int = 150,
+        memory: MemoryPolicy | None = None,
+        batch_chars: int = 600,
+        model=None,
     ):
         """
         Инициализирует Silero TTS модель.
@@ -32,24 +138,58 @@ class SileroTTS:
             speaker: Голосовой профиль ('xenia', 'aidar', 'baya', 'kseniya', 'eugene')
             sample_rate: Частота дискретизации аудио
             device: Устройство для вычислений ('cuda' или 'cpu'), если None - определит автоматически
+            lookahead: Сколько предложений может быть синтезировано заранее,
+                       пока играет текущее
+            cache: Кэш синтезированного аудио (None — синтезировать всегда)
+            threads: Бюджет потоков CPU; синтез идёт с потоками этапа "tts"
+            snapshots: Каталог снимков моделей для быстрого повторного запуска
+            max_chunk_chars: Максимальная длина куска текста для одного вызова синтеза
+            memory: Политика памяти, которая может выгружать модель при простое
+            batch_chars: Бюджет символов на один пакетный вызов модели (0 — по одному куску)
+            model: Готовая модель с apply_tts (например, заглушка в тестах);
+                   None — загрузить пакет Silero MODEL_ID
         """
         self.speaker = speaker
         self.sample_rate = sample_rate
+        self.lookahead = max(1, lookahead)
+        self.last_stats = SpeakStats()
+        self.cache = cache
+        self.threads = threads
+        self.text_prep = TextPreparer(max_chunk_chars)
+        self.batch_chars = batch_chars
+        # Вывод звука открывается при первом воспроизведении (сетевому режиму он не нужен)
+        self._output: AudioOutput | None = None
+        self._output_opened = False
         self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
-        torch.set_num_threads(os.cpu_count() or 4)
+        self.snapshots = snapshots
+        self.memory = memory
+        self.model = model
+        if model is None:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
 
-        print(f"[TTS] Загружаем модель Silero TTS (speaker={speaker})...")
-        self.model = self._load_model_with_retry()
-        self.model.to(self.device)
+    def load(self) -> None:
+        """Загружает модель (после unload — заново, из снимка, если он есть)."""
+        print(f"[TTS] Загружаем модель Silero TTS (speaker={self.speaker})...")
+        model = load_silero_model(MODEL_ID, self._load_model_with_retry, self.snapshots)
+        model.to(self.device)
+        self.model = model
         print("[TTS] Модель загружена.")
 
+    def unload(self) -> None:
+        """Освобождает модель; следующий синтез загрузит её заново через memory."""
+        self.model = None
+
     def _load_model_with_retry(self):
         """Загружает модель Silero, очищая кеш если он повреждён."""
         cache_dir = Path.home() / ".cache" / "torch" / "silero_models"
         model_dir = Path(silero_pkg.__file__).resolve().parent / "model"
 
         try:
-            mdl, _ = silero_tts(language="ru", speaker="v5_ru")
+            mdl, _ = silero_tts(language="ru", speaker=MODEL_ID)
             return mdl
         except RuntimeError as exc:
             if "PytorchStreamReader" not in str(exc):
@@ -57,19 +197,58 @@ class SileroTTS:
             print("[TTS] Обнаружен повреждённый кеш, очищаем...")
             shutil.rmtree(cache_dir, ignore_errors=True)
             shutil.rmtree(model_dir, ignore_errors=True)
-            mdl, _ = silero_tts(language="ru", speaker="v5_ru")
+            mdl, _ = silero_tts(language="ru", speaker=MODEL_ID)
             return mdl
 
+    @contextlib.contextmanager
+    def _stage(self):
+        """Загруженная модель и бюджет потоков на время синтеза."""
+        with contextlib.ExitStack() as stack:
+            if self.memory is not None:
+                stack.enter_context(self.memory.use("tts"))
+            if self.threads is not None:
+                stack.enter_context(self.threads.stage("tts"))
+            yield
+
+    def warmup(self) -> None:
+        """Синтезирует короткую фразу мимо кэша, чтобы прогреть модель."""
+        with self._stage():
+            self.model.apply_tts(text="Привет.", speaker=self.speaker, sample_rate=self.sample_rate)
+
+    def prefetch(self, texts: Iterable[str]) -> int:
+        """
+        Заранее синтезирует фразы в кэш аудио, чтобы они звучали без задержки синтеза.
+
+        Args:
+            texts: Фразы (например, неизменные ответы локальных команд)
+
+        Returns:
+            Сколько предложений находится в кэше; 0, если кэш отключён
+        """
+        if self.cache is None:
+            return 0
+        chunks = [chunk for text in texts for chunk in self.prepare(text)]
+        self.synthesize_many(chunks)
+        return len(chunks)
+
     def _split_sentences(self, text: str) -> list[str]:
         """Разбивает текст на предложения."""
-        try:
-            from razdel import sentenize
+        return split_sentences(text)
+
+    def prepare(self, sentence: str) -> list[str]:
+        """
+        Нормализует предложение и режет его на куски для синтеза (см. src.text_prep).
 
-            return [s.text.strip() for s in sentenize(text)]
-        except Exception:
-            text = re.sub(r"\s+", " ", text).strip()
-            parts = re.split(r"(?<=[\.\!\?…])\s+", text)
-            return [p.strip() for p in parts if p.strip()]
+        Ключ кэша аудио строится по куску, поэтому все пути озвучки
+        синтезируют уже подготовленный текст.
+
+        Args:
+            sentence: Предложение или фрагмент ответа LLM
+
+        Returns:
+            Куски для _synthesize (пустой список, если произносить нечего)
+        """
+        return self.text_prep.prepare(sentence)
 
     def _fade_edges(self, x: np.ndarray, ms: float = 5.0) -> np.ndarray:
         """Применяет плавное затухание к краям аудио."""
@@ -86,56 +265,373 @@ class SileroTTS:
         m = float(np.max(np.abs(x))) or 1.0
         return (x / m) * peak
 
-    def _synthesize(self, sentence: str) -> np.ndarray:
-        """Синтезирует аудио для одного предложения."""
-        audio = self.model.apply_tts(text=sentence, speaker=self.speaker, sample_rate=self.sample_rate)
+    def _cache_key(self, sentence: str) -> str | None:
+        if self.cache is None:
+            return None
+        return TTSCache.make_key(sentence, self.speaker, self.sample_rate, MODEL_ID)
+
+    def _finish_audio(self, audio, key: str | None) -> np.ndarray:
+        """Затухание краёв, нормализация и запись в кэш."""
         audio = np.asarray(audio, dtype=np.float32)
         audio = self._normalize_peak(self._fade_edges(audio))
+        if key is not None:
+            self.cache.put(key, audio)
         return audio
 
-    def _play_audio(self, audio: np.ndarray) -> None:
-        """Воспроизводит аудио через sounddevice или системный плеер."""
+    def _synthesize(self, sentence: str) -> np.ndarray:
+        """Синтезирует аудио для одного предложения (или берёт его из кэша)."""
+        key = self._cache_key(sentence)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        return self._synthesize_uncached(sentence, key)
+
+    def _synthesize_uncached(self, sentence: str, key: str | None) -> np.ndarray:
+        """Синтезирует предложение без поиска в кэше и сохраняет аудио под ключом key."""
+        with self._stage():
+            audio = self.model.apply_tts(
+                text=sentence, speaker=self.speaker, sample_rate=self.sample_rate
+            )
+        return self._finish_audio(audio, key)
+
+    def _synthesize_batch(self, chunks: list[str]) -> list[np.ndarray] | None:
+        """
+        Синтезирует несколько кусков одним вызовом модели (см. src.tts_batch).
+
+        Returns:
+            Сырое аудио кусков или None, если разделить результат не удалось
+        """
+        with self._stage():
+            audio = self.model.apply_tts(
+                ssml_text=build_ssml(chunks), speaker=self.speaker, sample_rate=self.sample_rate
+            )
+        pieces = split_on_breaks(np.asarray(audio, dtype=np.float32), len(chunks), self.sample_rate)
+        if pieces is None:
+            print(f"[TTS] Пакет из {len(chunks)} кусков не разделился, синтезирую по одному.")
+        return pieces
+
+    def synthesize_many(self, chunks: list[str]) -> list[np.ndarray]:
+        """
+        Синтезирует куски, объединяя отсутствующие в кэше в пакеты по batch_chars.
+
+        Silero не принимает список текстов, поэтому пакет — это один вызов
+        apply_tts с SSML, где куски разделены длинной паузой; по ней аудио
+        режется обратно и каждый кусок проходит ту же обработку, что и в
+        _synthesize. Если разделить не удалось, куски пакета синтезируются
+        по одному.
+
+        Args:
+            chunks: Подготовленные куски (результат prepare)
+
+        Returns:
+            Аудио кусков в том же порядке
+        """
+        if self.batch_chars <= 0 or len(chunks) < 2:
+            return [self._synthesize(chunk) for chunk in chunks]
+
+        # Кэш проверяется один раз на кусок: повторный поиск при синтезе по одному
+        # посчитал бы тот же промах дважды
+        keys = [self._cache_key(chunk) for chunk in chunks]
+        results = [self.cache.get(key) if key is not None else None for key in keys]
+        missing = [idx for idx, audio in enumerate(results) if audio is None]
+        for group in group_chunks([chunks[idx] for idx in missing], self.batch_chars):
+            indices = [missing[pos] for pos in group]
+            if len(indices) < 2:
+                continue
+            pieces = self._synthesize_batch([chunks[idx] for idx in indices])
+            for idx, piece in zip(indices, pieces or []):
+                results[idx] = self._finish_audio(piece, keys[idx])
+        return [
+            audio if audio is not None else self._synthesize_uncached(chunk, key)
+            for chunk, key, audio in zip(chunks, keys, results)
+        ]
+
+    async def synthesize_stream(
+        self,
+        sentences: AsyncIterator[str],
+        run: Callable[..., Awaitable],
+        spoken: list[str] | None = None,
+    ) -> AsyncIterator[tuple[int, str, np.ndarray]]:
+        """
+        Синтезирует поток предложений, объединяя куски соседних предложений в пакеты.
+
+        Первый кусок ответа синтезируется отдельно, чтобы он зазвучал раньше.
+        Дальше все уже готовые предложения (текст команды или кэша, ответ LLM
+        без потоковой озвучки, предложения, пришедшие за время синтеза)
+        готовятся сразу, и их куски идут в synthesize_many пакетами до
+        batch_chars независимо от границ предложений. Следующее предложение
+        ждётся, только если синтезировать нечего.
+
+        Args:
+            sentences: Поток предложений; закрывается по завершении
+            run: Выполняет блокирующий вызов: await run("synth", func, *args)
+            spoken: Список, в который добавляются предложения, синтезированные целиком
+
+        Yields:
+            (номер предложения, кусок, аудио) в порядке текста
+        """
+        pending: list[tuple[int, str]] = []  # (номер предложения, кусок)
+        remaining: dict[int, list] = {}  # номер → [предложение, несинтезированных кусков]
+        number = 0
+        started = False
+        exhausted = False
+        fetch: asyncio.Future | None = None
         try:
-            import sounddevice as sd
-
-            sd.play(audio, self.sample_rate)
-            sd.wait()
-        except Exception:
-            # Fallback на системный плеер
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                path = tmp.name
-            sf.write(path, audio, self.sample_rate)
-            try:
-                if sys.platform == "darwin":
-                    subprocess.run(["afplay", path], check=False)
-                elif sys.platform.startswith("win"):
-                    import winsound
+            while True:
+                while not exhausted:
+                    if fetch is None:
+                        fetch = asyncio.ensure_future(anext(sentences, None))
+                        await asyncio.sleep(0)  # Готовое предложение забирается сразу
+                    enough = not started or sum(len(c) for _, c in pending) >= self.batch_chars
+                    if pending and (enough or not fetch.done()):
+                        break
+                    sentence = await fetch
+                    fetch = None
+                    if sentence is None:
+                        exhausted = True
+                        break
+                    number += 1
+                    chunks = await run("synth", self.prepare, sentence)
+                    if not chunks and spoken is not None:
+                        spoken.append(sentence)
+                    remaining[number] = [sentence, len(chunks)]
+                    pending.extend((number, chunk) for chunk in chunks)
+                if not pending:
+                    return
+
+                texts = [chunk for _, chunk in pending]
+                size = len(group_chunks(texts, self.batch_chars)[0]) if started else 1
+                batch, pending = pending[:size], pending[size:]
+                audios = await run("synth", self.synthesize_many, texts[:size])
+                started = True
+                for (num, chunk), audio in zip(batch, audios):
+                    yield num, chunk, audio
+                    remaining[num][1] -= 1
+                    if remaining[num][1] == 0:
+                        sentence, _ = remaining.pop(num)
+                        if spoken is not None:
+                            spoken.append(sentence)
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+                with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await fetch
+            await sentences.aclose()
+
+    def _audio_output(self) -> AudioOutput | None:
+        """Постоянный вывод звука (открывается один раз; None — только разовый плеер)."""
+        if not self._output_opened:
+            self._output_opened = True
+            self._output = create_output(self.sample_rate)
+        return self._output
+
+    def close(self) -> None:
+        """Закрывает вывод звука, дав доиграть записанное."""
+        if self._output is not None:
+            self._output.close()
+            self._output = None
+        self._output_opened = False
+
+    def play_audio(
+        self,
+        audio: np.ndarray,
+        cancel: threading.Event | None = None,
+        gap_seconds: float = 0.0,
+    ) -> None:
+        """
+        Воспроизводит аудио через постоянный вывод звука (см. src.audio_out).
+
+        Пауза gap_seconds перед аудио дописывается в поток тишиной. Вызов
+        возвращается чуть раньше конца аудио, чтобы следующее предложение
+        встало в очередь без зазора. Если задано событие cancel,
+        воспроизведение прерывается, как только оно установлено.
+        """
+        cancel = cancel or threading.Event()
+        output = self._audio_output()
+        if output is not None:
+            output.play(audio, cancel, gap_seconds)
+            return
+        if gap_seconds > 0 and cancel.wait(gap_seconds):
+            return
+        self._play_file(audio, cancel)
+
+    def _play_file(self, audio: np.ndarray, cancel: threading.Event) -> None:
+        """Воспроизводит аудио через временный WAV-файл (если постоянный вывод не открылся)."""
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            path = tmp.name
+        sf.write(path, audio, self.sample_rate)
+        try:
+            if sys.platform.startswith("win"):
+                import winsound
 
-                    winsound.PlaySound(path, winsound.SND_FILENAME)
+                winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+                if cancel.wait(audio.size / self.sample_rate):
+                    winsound.PlaySound(None, winsound.SND_PURGE)
+            else:
+                if sys.platform == "darwin":
+                    command = ["afplay", path]
                 else:
-                    subprocess.run(["ffplay", "-autoexit", "-nodisp", path], check=False)
+                    command = ["ffplay", "-autoexit", "-nodisp", "-loglevel", "quiet", path]
+                player = subprocess.Popen(command)
+                while player.poll() is None:
+                    if cancel.wait(0.02):
+                        player.terminate()
+                        player.wait()
+                        break
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def speak_async(
+        self,
+        sentences: AsyncIterator[str],
+        gap_seconds: float = 0.25,
+        on_event: Callable[[str], None] | None = None,
+        run: Callable[..., Awaitable] | None = None,
+        total: int | None = None,
+    ) -> str:
+        """
+        Синтезирует и воспроизводит предложения двумя задачами, связанными очередью.
+
+        Задача синтеза (synthesize_stream) синтезирует куски не более чем на
+        lookahead вперёд, пока воспроизводятся уже готовые: первый кусок
+        отдельно, чтобы он зазвучал раньше, остальные — пакетами, в том числе
+        через границы предложений. Через on_event сообщаются события
+        "tts_first_audio" и "first_play".
+        Отмена задачи останавливает звук и синтез; поток предложений при этом
+        закрывается. Метрики конвейера сохраняются в last_stats.
+
+        Args:
+            sentences: Поток предложений (например, ответ LLM по мере генерации)
+            gap_seconds: Пауза между кусками в секундах
+            on_event: Обработчик событий конвейера (например, TurnTrace.mark)
+            run: Выполняет блокирующий вызов: await run(kind, func, *args), где kind —
+                 "synth" или "play" (по умолчанию — asyncio.to_thread)
+            total: Число предложений для счётчика в логе, если известно заранее
+
+        Returns:
+            Текст синтезированных предложений
+        """
+        run = run or _run_in_thread
+        emit = on_event or (lambda event: None)
+        stats = SpeakStats()
+        synth_spans: list[tuple[float, float]] = []
+        play_spans: list[tuple[float, float]] = []
+        ready: asyncio.Queue = asyncio.Queue(maxsize=self.lookahead)
+        spoken: list[str] = []
+        # Поток воспроизведения нельзя отменить через asyncio — только событием
+        cancel = threading.Event()
+
+        async def run_synth(kind: str, func, *args):
+            return await run(kind, _timed, synth_spans, func, *args)
+
+        async def produce() -> None:
+            stream = self.synthesize_stream(sentences, run_synth, spoken)
+            try:
+                async for item in stream:
+                    emit("tts_first_audio")
+                    await ready.put(item)
             finally:
-                try:
-                    os.remove(path)
-                except OSError:
-                    pass
+                await stream.aclose()
+            await ready.put(None)
 
-    def speak(self, text: str, gap_seconds: float = 0.25) -> None:
+        producer = asyncio.create_task(produce(), name="tts-synth")
+        try:
+            idx = 0
+            while True:
+                waited = time.perf_counter()
+                item = await _next_ready(ready, producer)
+                stats.wait_seconds += time.perf_counter() - waited
+                if item is None:
+                    break
+                number, chunk, audio = item
+                idx += 1
+                preview = chunk[:80] + ("..." if len(chunk) > 80 else "")
+                counter = f"{number}/{total}" if total is not None else str(number)
+                print(f"▶ {counter}: {preview}")
+                emit("first_play")
+                gap = gap_seconds if idx > 1 else 0.0
+                await run("play", _timed, play_spans, self.play_audio, audio, cancel, gap)
+                stats.sentences = number
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+            stats.synth_seconds = sum(end - start for start, end in synth_spans)
+            stats.play_seconds = sum(end - start for start, end in play_spans)
+            stats.hidden_seconds = _overlap_seconds(synth_spans, play_spans)
+            self.last_stats = stats
+
+        if stats.sentences > 1:
+            print(
+                f"[TTS] Синтез {stats.synth_seconds:.2f} с, скрыто за воспроизведением "
+                f"{stats.hidden_seconds:.2f} с ({stats.hidden_ratio:.0%})"
+            )
+        if self.cache is not None:
+            print(f"[TTS] Кэш аудио: {self.cache.summary()}")
+        return " ".join(spoken)
+
+    def speak(
+        self,
+        text: str,
+        gap_seconds: float = 0.25,
+        on_event: Callable[[str], None] | None = None,
+    ) -> None:
         """
-        Озвучивает текст.
+        Озвучивает текст (блокирующая обёртка над speak_async).
 
         Args:
             text: Текст для озвучивания
             gap_seconds: Пауза между предложениями в секундах
+            on_event: Обработчик событий конвейера (например, TurnTrace.mark)
         """
         sentences = self._split_sentences(text)
-        for idx, sentence in enumerate(sentences, 1):
-            preview = sentence[:80] + ("..." if len(sentence) > 80 else "")
-            print(f"▶ {idx}/{len(sentences)}: {preview}")
-            audio = self._synthesize(sentence)
-            self._play_audio(audio)
-            if idx < len(sentences):
-                time.sleep(gap_seconds)
+        asyncio.run(
+            self.speak_async(
+                _iterate(sentences), gap_seconds, on_event=on_event, total=len(sentences)
+            )
+        )
+
+
+async def _iterate(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+async def _run_in_thread(kind: str, func, *args):
+    """Исполнитель speak_async по умолчанию: вызов в потоке asyncio."""
+    return await asyncio.to_thread(func, *args)
+
+
+def _timed(spans: list[tuple[float, float]], func, *args):
+    """Выполняет func и добавляет интервал выполнения в spans (в потоке исполнителя)."""
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        spans.append((started, time.perf_counter()))
+
+
+async def _next_ready(ready: asyncio.Queue, producer: asyncio.Task):
+    """Очередной элемент очереди; если производитель упал — его исключение."""
+    getter = asyncio.ensure_future(ready.get())
+    try:
+        await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        getter.cancel()
+        raise
+    if not getter.done() and producer.done() and not producer.cancelled():
+        error = producer.exception()
+        if error is not None:
+            getter.cancel()
+            raise error
+    return await getter
 
 
 def read_text(
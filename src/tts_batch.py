@@ -0,0 +1,103 @@
+"""Пакетный синтез Silero: несколько кусков текста за один вызов модели."""
+
+from __future__ import annotations
+
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# Пауза-разделитель между кусками в SSML, мс
+BREAK_MS = 800
+# Тишина не короче этого считается разделителем (паузы на запятых и точках короче)
+MIN_GAP_MS = 600
+# Порог тишины относительно пика всего аудио
+SILENCE_RATIO = 0.01
+# Сколько тишины оставить по краям каждого куска, мс
+EDGE_MS = 60
+# Длина кадра при поиске тишины, мс
+FRAME_MS = 10
+
+
+def group_chunks(chunks: list[str], max_chars: int, max_items: int = 8) -> list[list[int]]:
+    """
+    Группирует подряд идущие куски для одного вызова модели.
+
+    Порядок сохраняется: группы озвучиваются одна за другой. Кусок длиннее
+    max_chars образует группу сам по себе.
+
+    Args:
+        chunks: Подготовленные куски текста
+        max_chars: Бюджет символов на группу
+        max_items: Максимум кусков в группе
+
+    Returns:
+        Индексы кусков по группам
+    """
+    groups: list[list[int]] = []
+    size = 0
+    for idx, chunk in enumerate(chunks):
+        if groups and len(groups[-1]) < max_items and size + len(chunk) <= max_chars:
+            groups[-1].append(idx)
+            size += len(chunk)
+        else:
+            groups.append([idx])
+            size = len(chunk)
+    return groups
+
+
+def build_ssml(chunks: list[str], break_ms: int = BREAK_MS) -> str:
+    """SSML с длинной паузой между кусками, по которой аудио потом режется обратно."""
+    pause = f'<break time="{break_ms}ms"/>'
+    body = pause.join(f"<s>{escape(chunk)}</s>" for chunk in chunks)
+    return f"<speak>{body}</speak>"
+
+
+def split_on_breaks(
+    audio: np.ndarray,
+    count: int,
+    sample_rate: int,
+    min_gap_ms: float = MIN_GAP_MS,
+    edge_ms: float = EDGE_MS,
+) -> list[np.ndarray] | None:
+    """
+    Режет аудио пакетного вызова на куски по паузам-разделителям.
+
+    Args:
+        audio: Аудио всего пакета
+        count: Сколько кусков было в пакете
+        sample_rate: Частота дискретизации
+        min_gap_ms: Минимальная длина паузы-разделителя, мс
+        edge_ms: Сколько тишины оставить по краям куска, мс
+
+    Returns:
+        Аудио кусков по порядку или None, если пауз не столько, сколько
+        нужно (тогда куски синтезируются по одному)
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    frame = max(1, int(sample_rate * FRAME_MS / 1000))
+    n_frames = audio.size // frame
+    if count <= 1 or n_frames == 0:
+        return [audio] if count == 1 else None
+    peaks = np.abs(audio[: n_frames * frame]).reshape(n_frames, frame).max(axis=1)
+    silent = peaks < SILENCE_RATIO * (float(peaks.max()) or 1.0)
+
+    # Участки тишины внутри аудио (без тишины в начале и в конце)
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], silent.astype(np.int8), [0]])))
+    runs = [(start, end) for start, end in zip(edges[::2], edges[1::2])]
+    min_frames = min_gap_ms / FRAME_MS
+    gaps = [
+        (start, end)
+        for start, end in runs
+        if end - start >= min_frames and start > 0 and end < n_frames
+    ]
+    if len(gaps) != count - 1:
+        return None
+
+    edge = int(edge_ms / FRAME_MS)
+    pieces = []
+    begin = 0
+    for start, end in gaps:
+        pieces.append(audio[begin * frame : (start + edge) * frame])
+        begin = end - edge
+    pieces.append(audio[begin * frame :])
+    return pieces
@@ -0,0 +1,169 @@
+"""Кэш синтезированного аудио TTS с адресацией по содержимому."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+@dataclass
+class CacheStats:
+    """Счётчики обращений к кэшу."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTSCache:
+    """
+    Двухуровневый кэш аудио: LRU в памяти с бюджетом в байтах и
+    необязательное хранилище на диске, переживающее перезапуск.
+
+    Ключ — хэш от нормализованного предложения, голоса, частоты
+    дискретизации и версии модели, поэтому смена любого из параметров
+    не приводит к воспроизведению устаревшего аудио.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Path | str | None = None):
+        """
+        Инициализирует кэш.
+
+        Args:
+            max_bytes: Бюджет памяти для аудио float32 (0 — не хранить в памяти)
+            disk_dir: Каталог для хранения на диске (None — только память)
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.stats = CacheStats()
+        self._items: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def normalize(sentence: str) -> str:
+        """Приводит текст к каноническому виду для ключа кэша."""
+        return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+    @classmethod
+    def make_key(cls, sentence: str, speaker: str, sample_rate: int, model_version: str) -> str:
+        """
+        Вычисляет ключ кэша.
+
+        Args:
+            sentence: Текст предложения
+            speaker: Голосовой профиль
+            sample_rate: Частота дискретизации
+            model_version: Версия модели TTS
+
+        Returns:
+            Шестнадцатеричный SHA-256
+        """
+        parts = [cls.normalize(sentence), str(speaker), str(sample_rate), model_version]
+        payload = "\x1f".join(parts)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def memory_bytes(self) -> int:
+        """Объём аудио, занятый в памяти."""
+        return self._bytes
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, audio: np.ndarray) -> None:
+        """Кладёт аудио в LRU, вытесняя старые записи сверх бюджета."""
+        if audio.nbytes > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._items[key] = audio
+        self._bytes += audio.nbytes
+        while self._bytes > self.max_bytes and self._items:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def get(self, key: str) -> np.ndarray | None:
+        """
+        Ищет аудио в памяти, затем на диске.
+
+        Returns:
+            Копия аудио float32 либо None
+        """
+        with self._lock:
+            audio = self._items.get(key)
+            if audio is not None:
+                self._items.move_to_end(key)
+                self.stats.memory_hits += 1
+                return audio.copy()
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                audio = np.load(path).astype(np.float32)
+            except (OSError, ValueError):
+                audio = None
+            if audio is not None:
+                with self._lock:
+                    self.stats.disk_hits += 1
+                    self._remember(key, audio)
+                return audio.copy()
+
+        with self._lock:
+            self.stats.misses += 1
+        return None
+
+    def put(self, key: str, audio: np.ndarray) -> None:
+        """
+        Сохраняет аудио в кэш.
+
+        На диск аудио пишется в float16: вдвое компактнее, а для уже
+        нормализованного сигнала точности достаточно.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        with self._lock:
+            self._remember(key, audio.copy())
+
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".npy", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, audio.astype(np.float16))
+            os.replace(tmp_path, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def summary(self) -> str:
+        """Короткая строка со статистикой для логов."""
+        return (
+            f"попаданий {self.stats.hits} (память {self.stats.memory_hits}, "
+            f"диск {self.stats.disk_hits}), промахов {self.stats.misses}, "
+            f"hit rate {self.stats.hit_rate:.0%}, в памяти {self._bytes / 1e6:.1f} МБ"
+        )
@@ -0,0 +1,149 @@
+"""Тесты для кэша ответов LLM (src/answer_cache.py)."""
+
+import asyncio
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.ollama_stub import OllamaStub
+
+STUB = OllamaStub(tokens_per_second=500, first_token_delay=0.0).start()
+
+from benchmarks.fake_clients import run_client
+from src.answer_cache import AnswerCache
+from src.config import AppConfig
+from src.conversation import Conversation
+from src.llm import OllamaClient
+from src.net_server import NetworkServer
+from src.tts import SileroTTS
+
+PROMPT = "Ты помощник."
+
+
+def test_normalized_question_hits_and_volatile_questions_are_skipped():
+    cache = AnswerCache()
+    cache.put("Что такое фотосинтез?", "qwen", PROMPT, "Это процесс в растениях.")
+    assert cache.get("Скажи, пожалуйста, что такое ФОТОСИНТЕЗ", "qwen", PROMPT) == (
+        "Это процесс в растениях."
+    )
+    # Другая модель или промпт — другой ключ
+    assert cache.get("что такое фотосинтез", "llama", PROMPT) is None
+    assert cache.get("что такое фотосинтез", "qwen", "Отвечай кратко.") is None
+
+    for question in ("Какая сейчас погода в Москве", "Какой курс доллара к рублю", "а почему?"):
+        cache.put(question, "qwen", PROMPT, "Ответ.")
+        assert cache.get(question, "qwen", PROMPT) is None
+    assert cache.stats.hits == 1 and cache.stats.misses == 2 and cache.stats.skipped == 3
+
+    custom = AnswerCache(exclude=[r"\bанекдот\w*"])
+    custom.put("расскажи смешной анекдот", "qwen", PROMPT, "Шутка.")
+    assert custom.get("расскажи смешной анекдот", "qwen", PROMPT) is None
+
+
+def test_ttl_lru_and_persistence():
+    cache = AnswerCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("столица франции какой город", "m", PROMPT, "Париж.")
+    time.sleep(0.1)
+    assert cache.get("столица франции какой город", "m", PROMPT) is None
+
+    cache = AnswerCache(max_entries=2)
+    for idx in range(3):
+        cache.put(f"что значит слово номер {idx}", "m", PROMPT, f"Ответ {idx}.")
+    assert cache.get("что значит слово номер 0", "m", PROMPT) is None
+    assert cache.get("что значит слово номер 2", "m", PROMPT) == "Ответ 2."
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "answers.json"
+        cache = AnswerCache(path=path)
+        cache.put("сколько планет в солнечной системе", "m", PROMPT, "Восемь.")
+        assert not path.exists()  # put не пишет файл: это делает flush
+        cache.flush()
+        reloaded = AnswerCache(path=path)
+        assert reloaded.get("Сколько планет в Солнечной системе?", "m", PROMPT) == "Восемь."
+        assert AnswerCache(path=path, ttl_seconds=0).get(
+            "сколько планет в солнечной системе", "m", PROMPT
+        ) is None
+
+
+def test_repeated_question_hits_after_unrelated_turn():
+    """Повтор вопроса после реплики на другую тему отвечается из кэша, уточнения — нет."""
+    conversation = Conversation(PROMPT)
+    cache = AnswerCache()
+    cache.put("сколько весит взрослый кит", "m", PROMPT, "До ста пятидесяти тонн.")
+    conversation.add("сколько весит взрослый кит", "До ста пятидесяти тонн.")
+    conversation.add("как зовут первого космонавта", "Юрий Гагарин.")
+    assert cache.get("Сколько весит взрослый кит?", "m", PROMPT) == "До ста пятидесяти тонн."
+    assert cache.stats.hits == 1
+
+    for follow_up in ("А у слона сколько весит взрослый?", "И сколько весит взрослый слон"):
+        cache.put(follow_up, "m", PROMPT, "Шесть тонн.")
+        assert cache.get(follow_up, "m", PROMPT) is None
+    assert cache.get("синий кит весит тоже столько", "m", PROMPT) is None
+    assert cache.stats.skipped == 3
+
+
+class FakeSilero:
+    """apply_tts без модели: ровный сигнал на любой текст."""
+
+    def apply_tts(self, text=None, ssml_text=None, speaker=None, sample_rate=24000):
+        return np.full(2400, 0.1, dtype=np.float32)
+
+
+class FakeSTT:
+    def transcribe_batch(self, audios, language="ru"):
+        return ["Что такое фотосинтез?" for _ in audios]
+
+
+def test_repeated_question_is_answered_without_llm():
+    """
+    Повторный вопрос не доходит до Ollama ни в том же разговоре, ни у другого
+    клиента, но звучит и попадает в историю.
+    """
+    tts = SileroTTS(sample_rate=24000, device="cpu", batch_chars=0, model=FakeSilero())
+    llm = OllamaClient("stub", system_prompt=PROMPT, host=STUB.url)
+    calls = []
+    ask_stream_async = llm.ask_stream_async
+    llm.ask_stream_async = lambda *args: calls.append(args) or ask_stream_async(*args)
+    answers = AnswerCache()
+    server = NetworkServer(AppConfig(), FakeSTT(), llm, tts, answers=answers)
+
+    async def replay(path):
+        await server.start("127.0.0.1", 0)
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            first = await run_client(url, "room-a", [path], repeat=2)
+            return first + await run_client(url, "room-b", [path], repeat=1)
+        finally:
+            await server.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "question.wav"
+        with wave.open(str(path), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(16000)
+            wav_file.writeframes(np.zeros(16000, dtype=np.int16).tobytes())
+        results = asyncio.run(replay(path))
+
+    assert len(results) == 3 and all(r.error is None for r in results)
+    assert len(calls) == 1
+    assert results[0].sentences == results[1].sentences == results[2].sentences > 0
+    assert answers.stats.hits == 2 and answers.stats.misses == 1
+    assert len(server.sessions["room-a"].conversation.turns) == 2
+    assert len(server.sessions["room-b"].conversation.turns) == 1
+
+
+if __name__ == "__main__":
+    test_normalized_question_hits_and_volatile_questions_are_skipped()
+    test_ttl_lru_and_persistence()
+    test_repeated_question_hits_after_unrelated_turn()
+    test_repeated_question_is_answered_without_llm()
+    print("Все тесты пройдены.")
@@ -0,0 +1,129 @@
+"""Тесты для асинхронного конвейера на заглушках моделей и локальной заглушке Ollama."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.ollama_stub import OllamaStub
+
+STUB = OllamaStub(tokens_per_second=200, first_token_delay=0.01).start()
+
+from src.async_runtime import AsyncRuntime
+from src.config import AppConfig
+from src.intents import create_default_router
+from src.llm import OllamaClient
+from src.tts import SileroTTS
+
+
+class FakeRecorder:
+    """Детектор перебивания срабатывает через interrupt_after секунд (None — никогда)."""
+
+    def __init__(self, interrupt_after=None):
+        self.interrupt_after = interrupt_after
+        self.resumed = []
+
+    def wait_for_speech(self, stop, min_speech_ms):
+        if self.interrupt_after is None:
+            stop.wait()
+            return None
+        return None if stop.wait(self.interrupt_after) else 1000
+
+    def resume_from(self, position):
+        self.resumed.append(position)
+
+
+class FakeSilero:
+    """apply_tts без модели: короткая тишина на любой текст."""
+
+    def apply_tts(self, text=None, ssml_text=None, speaker=None, sample_rate=16000):
+        return np.zeros(160, dtype=np.float32)
+
+
+class QuietTTS(SileroTTS):
+    """SileroTTS на заглушке модели; воспроизведение только записывается."""
+
+    def __init__(self, play_seconds=0.0):
+        super().__init__(sample_rate=16000, device="cpu", batch_chars=0, model=FakeSilero())
+        self.play_seconds = play_seconds
+        self.played = []
+
+    def play_audio(self, audio, cancel=None, gap_seconds=0.0):
+        self.played.append(audio.size)
+        cancel.wait(self.play_seconds)
+
+
+class FakeServer:
+    """Сервер с мгновенным «распознаванием» заранее заданных фраз."""
+
+    def __init__(self, phrases, barge_in=False, interrupt_after=None, play_seconds=0.0):
+        self.config = AppConfig(barge_in=barge_in)
+        self.recorder = FakeRecorder(interrupt_after)
+        self.threads = None
+        self.intents = create_default_router()
+        self.answers = None
+        self.llm = OllamaClient("stub", host=STUB.url)
+        self.tts = QuietTTS(play_seconds)
+        self.played = self.tts.played
+        self.traces = []
+        self._phrases = iter(phrases)
+
+    def _capture(self):
+        time.sleep(0.01)
+        return np.zeros(1600, dtype=np.float32)
+
+    def _passes_gate(self, audio):
+        return True
+
+    def _transcribe(self, audio):
+        return next(self._phrases)
+
+    def _should_stop(self, text):
+        return text == "стоп"
+
+    def _gap_seconds(self):
+        return 0.0
+
+    def _finish_trace(self, trace):
+        self.traces.append(trace)
+
+
+def test_turns_flow_through_stages_until_stop():
+    """Команда отвечается локально, вопрос — через LLM; «стоп» завершает работу."""
+    server = FakeServer(["который час", "расскажи что-нибудь", "стоп"])
+    asyncio.run(asyncio.wait_for(AsyncRuntime(server).run(), timeout=10))
+    assert len(server.traces) == 2
+    assert server.traces[0].attrs == {"intent": "time"}
+    assert "llm_ttft" in server.traces[1].spans()
+    assert len(server.played) == 1 + 3  # ответ команды и три предложения заглушки
+    # Метрики синтеза/воспроизведения считаются и в асинхронном конвейере
+    stats = server.tts.last_stats
+    assert stats.sentences == 3 and stats.synth_seconds > 0 and stats.play_seconds > 0
+
+
+def test_barge_in_cancels_reply_and_resumes_capture():
+    """Перебивание отменяет ответ и переносит начало следующей записи."""
+    server = FakeServer(
+        ["расскажи что-нибудь", "стоп"], barge_in=True, interrupt_after=0.05, play_seconds=1.0
+    )
+    started = time.perf_counter()
+    asyncio.run(asyncio.wait_for(AsyncRuntime(server).run(), timeout=10))
+    assert time.perf_counter() - started < 1.0  # воспроизведение не доиграно до конца
+    assert server.traces[0].attrs.get("barge_in") is True
+    assert server.recorder.resumed == [1000]
+    assert len(server.played) <= 1
+
+
+if __name__ == "__main__":
+    try:
+        test_turns_flow_through_stages_until_stop()
+        test_barge_in_cancels_reply_and_resumes_capture()
+        print("Все тесты пройдены.")
+    finally:
+        STUB.stop()
@@ -0,0 +1,70 @@
+"""Тесты для постоянного вывода звука (src/audio_out.py) на процессе-заглушке плеера."""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.audio_out import PipeOutput
+
+
+def recorder_command(path):
+    """«Плеер», который дописывает всё, что пришло в stdin, в файл."""
+    script = (
+        "import sys\n"
+        f"out = open({str(path)!r}, 'ab')\n"
+        "for chunk in iter(lambda: sys.stdin.buffer.read(4096), b''):\n"
+        "    out.write(chunk); out.flush()\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+def test_sentences_and_gaps_go_to_one_player_process():
+    """Все предложения и паузы между ними пишутся в один процесс плеера."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.pcm"
+        output = PipeOutput(1000, recorder_command(path), lead_seconds=0.05)
+        sentence = np.full(200, 0.5, dtype=np.float32)  # 0.2 с
+
+        started = time.perf_counter()
+        assert output.play(sentence)
+        first = output._process
+        assert output.play(sentence, gap_seconds=0.1)
+        elapsed = time.perf_counter() - started
+        assert output._process is first
+        # Возврат за lead_seconds до конца: 0.2 + 0.1 + 0.2 - 0.05
+        assert 0.4 <= elapsed < 0.6
+
+        output.close()
+        samples = np.frombuffer(path.read_bytes(), dtype="<i2")
+    assert samples.size == 200 + 100 + 200
+    assert (samples[200:300] == 0).all() and (samples[300:] > 0).all()
+
+
+def test_cancel_drops_queued_audio():
+    """Отмена сбрасывает очередь, следующая запись запускает плеер заново."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = PipeOutput(1000, recorder_command(Path(tmp) / "out.pcm"))
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        started = time.perf_counter()
+        assert not output.play(np.zeros(5000, dtype=np.float32), cancel)  # 5 с
+        assert time.perf_counter() - started < 1.0
+        assert output.pending_seconds() == 0.0 and output._process is None
+
+        assert output.play(np.zeros(100, dtype=np.float32))
+        assert output._process is not None
+        output.close()
+
+
+if __name__ == "__main__":
+    test_sentences_and_gaps_go_to_one_player_process()
+    test_cancel_drops_queued_audio()
+    print("Все тесты пройдены.")
@@ -0,0 +1,70 @@
+"""Тесты для истории диалога (src/conversation.py) на локальной заглушке Ollama."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.ollama_stub import OllamaStub
+
+STUB = OllamaStub(tokens_per_second=500, first_token_delay=0.0).start()
+
+from src.conversation import Conversation
+from src.llm import OllamaClient
+
+
+def test_history_is_evicted_in_blocks_and_prefix_stays_stable():
+    """Переполнение сокращает историю до половины бюджета, а не на одну реплику за раз."""
+    conversation = Conversation("Ты помощник.", max_tokens=600)
+    prefixes = []
+    for idx in range(40):
+        conversation.add(f"Вопрос номер {idx} про погоду", "Ответ " + "слово " * 15)
+        prefixes.append(conversation.messages("")[:3])
+        assert conversation.prompt_tokens() <= 600
+
+    assert 0 < len(conversation.turns) < 40
+    # Вытесненные вопросы остаются в кратком содержании в системном промпте
+    evicted = 39 - len(conversation.turns)
+    assert f"Вопрос номер {evicted} про погоду" in conversation.messages("ещё")[0]["content"]
+    # Начало промпта менялось только при вытеснении пачкой, а не на каждой реплике
+    changes = sum(1 for a, b in zip(prefixes, prefixes[1:]) if a != b)
+    assert changes <= 5
+
+    disabled = Conversation("Ты помощник.", max_tokens=0)
+    disabled.add("Привет", "Здравствуйте")
+    assert disabled.messages("Как дела?") == [
+        {"role": "system", "content": "Ты помощник."},
+        {"role": "user", "content": "Как дела?"},
+    ]
+
+
+def test_turns_reuse_prompt_prefix_in_ollama():
+    """Вторая реплика пересчитывает только новый хвост промпта; метрики берутся из ответа."""
+    client = OllamaClient(
+        "stub", system_prompt="Ты помощник. " * 50, history_tokens=4096, host=STUB.url
+    )
+
+    async def turn(text):
+        return "".join([token async for token in client.ask_stream_async(text)])
+
+    async def dialog():
+        first = await turn("Привет")
+        first_stats = client.last_stats
+        await turn("Расскажи ещё")
+        return first, first_stats, client.last_stats
+
+    answer, first, second = asyncio.run(dialog())
+    assert client.conversation.turns[0] == ("Привет", answer.strip())
+    assert first.done and second.done and second.history_turns == 1
+    assert second.prompt_eval_tokens < first.prompt_eval_tokens
+    assert second.reused_ratio > 0.5
+    assert set(second.as_attrs()) >= {"llm_prompt_eval_tokens", "llm_prompt_eval_ms"}
+
+
+if __name__ == "__main__":
+    test_history_is_evicted_in_blocks_and_prefix_stays_stable()
+    test_turns_reuse_prompt_prefix_in_ollama()
+    print("Все тесты пройдены.")
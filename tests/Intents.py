@@ -0,0 +1,53 @@
+"""Тесты для локальных команд без LLM."""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.intents import create_default_router, normalize_command, say_date, say_time
+
+
+def test_normalize_drops_punctuation_and_fillers():
+    """Регистр, «ё», пунктуация и вежливые слова не мешают сопоставлению."""
+    assert normalize_command("Скажи, пожалуйста, который час?") == "который час"
+    assert normalize_command("Повтори ещё раз!") == "повтори еще раз"
+
+
+def test_time_and_date_are_spoken_in_words():
+    """Время и дата формулируются прописью с правильными окончаниями."""
+    assert say_time(datetime(2024, 5, 1, 21, 1)) == "Сейчас двадцать один час одна минута."
+    assert say_time(datetime(2024, 5, 1, 14, 0)) == "Сейчас ровно четырнадцать часов."
+    assert say_time(datetime(2024, 5, 1, 3, 22)) == "Сейчас три часа двадцать две минуты."
+    assert say_date(datetime(2024, 5, 23)) == "Сегодня четверг, двадцать третье мая."
+    assert say_date(datetime(2024, 3, 30)) == "Сегодня суббота, тридцатое марта."
+
+
+def test_router_matches_whole_phrase_only():
+    """Команда срабатывает только на фразу целиком; остальное уходит в LLM."""
+    router = create_default_router(clock=lambda: datetime(2024, 5, 1, 9, 5))
+    match = router.match("Который час?")
+    assert match is not None and match.intent == "time"
+    assert match.reply == "Сейчас девять часов пять минут."
+    assert router.match("Который час в Токио?") is None
+    assert router.match("Расскажи про космос") is None
+
+
+def test_repeat_returns_last_answer():
+    """«Повтори» возвращает последний озвученный ответ."""
+    router = create_default_router()
+    assert router.match("повтори").reply == "Мне пока нечего повторить."
+    router.remember("Луна — спутник Земли.")
+    assert router.match("Повтори ещё раз.").reply == "Луна — спутник Земли."
+    assert "Привет! Чем могу помочь?" in router.canned_replies()
+
+
+if __name__ == "__main__":
+    test_normalize_drops_punctuation_and_fillers()
+    test_time_and_date_are_spoken_in_words()
+    test_router_matches_whole_phrase_only()
+    test_repeat_returns_last_answer()
+    print("Все тесты пройдены.")
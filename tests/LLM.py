@@ -1,5 +1,6 @@
-"""Тесты для модуля LLM."""
+"""Тесты для модуля LLM на локальной заглушке Ollama (без модели и GPU)."""
 
+import asyncio
 import sys
 from pathlib import Path
 
@@ -7,29 +8,94 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.llm import OllamaClient
+from benchmarks.ollama_stub import OllamaStub
+
+STUB = OllamaStub(tokens_per_second=500, first_token_delay=0.0).start()
+
+import ollama
+
 from src.config import AppConfig
+from src.llm import OllamaClient
+
 
 def test_ollama_client_ask():
     """Тест отправки запроса и получения ответа от Ollama."""
-    # Загружаем конфигурацию
+    # Модель из конфига, сервер — заглушка
     config = AppConfig.from_file(project_root / "config.json")
-    
-    # Создаём клиент с моделью из конфига
-    model = config.ollama_model
-    client = OllamaClient(model=model)
-    
+    client = OllamaClient(model=config.ollama_model, host=STUB.url)
+
     # Отправляем простой запрос
-    user_message = "Привет! Ответь одним словом: 'работает'"
-    response = client.ask(user_message, stream=False)
-    
+    response = client.ask("Привет! Ответь одним словом: 'работает'", stream=False)
+
     # Проверяем, что получили ответ (не пустой)
-    assert response is not None, "Ответ не должен быть None"
-    assert len(response) > 0, "Ответ не должен быть пустым"
-    assert isinstance(response, str), "Ответ должен быть строкой"
-    
-    print(f"\n[TEST] Получен ответ: {response}")
-    print(f"[TEST] Длина ответа: {len(response)} символов")
+    assert isinstance(response, str) and len(response) > 0
+    assert response == STUB.reply
+    assert STUB.last_request["model"] == config.ollama_model
+    client.close()
+
+
+def test_options_from_config_limit_answer():
+    """num_predict и stop из options доходят до Ollama и ограничивают ответ."""
+    client = OllamaClient(
+        "stub", host=STUB.url, options={"num_ctx": 2048, "num_predict": 3, "stop": ["\n"]}
+    )
+    answer = "".join(client.ask_stream("Расскажи что-нибудь", echo=False))
+    assert len(answer.split()) == 3
+    options = STUB.last_request["options"]
+    assert options["num_ctx"] == 2048 and options["stop"] == ["\n"]
+    assert options["temperature"] == 0.7  # значение по умолчанию сохраняется
+
+    # Прогрев идёт с теми же num_ctx, иначе Ollama перезагрузила бы модель
+    assert client.warmup()
+    assert STUB.last_request["options"]["num_ctx"] == 2048
+    assert STUB.last_request["options"]["num_predict"] == 1
+
+    client.options["stop"] = ["день"]
+    answer = client.ask("Расскажи что-нибудь", stream=False)
+    assert "день" not in answer and answer
+    client.close()
+
+
+def test_retries_before_first_token():
+    """Ответ 503 до первого токена повторяется; после исчерпания повторов — ошибка."""
+    client = OllamaClient("stub", host=STUB.url, retries=2, retry_delay=0.01)
+    STUB.failures = 2
+    answer = "".join(client.ask_stream("Привет", echo=False))
+    assert answer == STUB.reply and STUB.failures == 0
+
+    async def ask_async():
+        answer = "".join([token async for token in client.ask_stream_async("Привет")])
+        pool = client._async_client
+        await client.aclose()  # в том же цикле, что открыл соединения
+        return answer, pool
+
+    STUB.failures = 1
+    answer, pool = asyncio.run(ask_async())
+    assert answer == STUB.reply
+    assert pool._client.is_closed and client._async_client is None
+
+    STUB.failures = 3
+    try:
+        client.ask("Привет", stream=False)
+    except ollama.ResponseError as exc:
+        assert exc.status_code == 503
+    else:
+        raise AssertionError("ожидалась ошибка после исчерпания повторов")
+    STUB.failures = 0
+
+    # Недоступный сервер: ошибка соединения после повторов, без зависания
+    offline = OllamaClient("stub", host="http://127.0.0.1:9", retries=1, retry_delay=0.01)
+    try:
+        offline.ask("Привет", stream=False)
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("ожидалась ошибка соединения")
+    client.close()
+
 
 if __name__ == "__main__":
-    test_ollama_client_ask()
\ No newline at end of file
+    test_ollama_client_ask()
+    test_options_from_config_limit_answer()
+    test_retries_before_first_token()
+    print("Все тесты пройдены.")
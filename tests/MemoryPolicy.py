@@ -0,0 +1,75 @@
+"""Тесты для выгрузки простаивающих моделей (src/memory_policy.py)."""
+
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.memory_policy import MemoryPolicy, rss_mb
+
+
+class FakeModel:
+    """Модель, которая занимает ~20 МБ, пока загружена."""
+
+    def __init__(self):
+        self.weights = None
+        self.loads = 0
+        self.load()
+
+    @property
+    def loaded(self):
+        return self.weights is not None
+
+    def load(self):
+        time.sleep(0.02)
+        self.weights = bytearray(20 * 1024 * 1024)
+        self.loads += 1
+
+    def unload(self):
+        self.weights = None
+
+
+def test_idle_model_is_unloaded_and_reloaded_on_use():
+    policy = MemoryPolicy(check_interval=60.0)
+    model, resident = FakeModel(), FakeModel()
+    policy.register("stt", model, idle_seconds=10.0)
+    policy.register("tts", resident, idle_seconds=None)  # держать всегда
+
+    assert policy.unload_idle() == []  # простой ещё не истёк
+    assert policy.unload_idle(now=time.monotonic() + 11.0) == ["stt"]
+    assert not model.loaded and resident.loaded
+
+    with policy.use("stt"):
+        assert model.loaded and model.loads == 2
+        # Модель в работе не выгружается, даже если «простой» истёк
+        assert policy.unload_idle(now=time.monotonic() + 60.0) == []
+    with policy.use("tts"):
+        assert resident.loads == 1
+
+    unload, reload = policy.events
+    assert (unload.action, reload.action) == ("unload", "reload")
+    assert reload.seconds >= 0.02
+    if rss_mb() is not None:  # Linux: RSS из /proc
+        assert reload.rss_after_mb > reload.rss_before_mb
+        assert "RSS" in reload.summary()
+    policy.close()
+
+
+def test_background_thread_unloads_after_timeout():
+    policy = MemoryPolicy(check_interval=0.02)
+    model = FakeModel()
+    policy.register("tts", model, idle_seconds=0.05)
+    deadline = time.monotonic() + 2.0
+    while model.loaded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    policy.close()
+    assert not model.loaded
+
+
+if __name__ == "__main__":
+    test_idle_model_is_unloaded_and_reloaded_on_use()
+    test_background_thread_unloads_after_timeout()
+    print("Все тесты пройдены.")
@@ -0,0 +1,137 @@
+"""Тесты сетевого режима: фейковые клиенты проигрывают WAV-файлы в общий сервер."""
+
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.ollama_stub import OllamaStub
+
+STUB = OllamaStub(tokens_per_second=200, first_token_delay=0.01).start()
+
+from benchmarks.fake_clients import run_clients
+from src.config import AppConfig
+from src.llm import OllamaClient
+from src.net_server import NetworkServer
+from src.tts import SileroTTS
+
+
+class FakeSTT:
+    """Распознаёт «который час» для коротких записей и «расскажи» для длинных."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def transcribe_batch(self, audios, language="ru"):
+        self.threads.add(threading.get_ident())
+        return ["который час" if audio.size < 16000 else "расскажи что-нибудь" for audio in audios]
+
+
+class FakeSilero:
+    """apply_tts без модели: ровный сигнал на любой текст."""
+
+    def apply_tts(self, text=None, ssml_text=None, speaker=None, sample_rate=24000):
+        return np.full(2400, 0.1, dtype=np.float32)
+
+
+def make_tts():
+    return SileroTTS(sample_rate=24000, device="cpu", batch_chars=0, model=FakeSilero())
+
+
+def write_wav(path, seconds):
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(np.zeros(int(16000 * seconds), dtype=np.int16).tobytes())
+
+
+async def serve_and_replay(server, files, clients, slow_client=0.0):
+    await server.start("127.0.0.1", 0)
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        return await run_clients(url, files, clients, slow_client=slow_client)
+    finally:
+        await server.stop()
+
+
+def test_clients_share_models_and_stt_is_batched():
+    """Одновременные клиенты получают ответы, фразы распознаются общими батчами."""
+    stt = FakeSTT()
+    config = AppConfig(net_stt_batch_wait_ms=200)
+    server = NetworkServer(config, stt, OllamaClient("stub", host=STUB.url), make_tts())
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(tmp) / "short.wav", Path(tmp) / "long.wav"]
+        write_wav(files[0], 0.5)
+        write_wav(files[1], 2.0)
+        results = asyncio.run(serve_and_replay(server, files, clients=3))
+
+    assert len(results) == 6 and all(r.error is None for r in results)
+    by_file = {r.file: r for r in results}
+    assert by_file["short.wav"].transcript == "который час"
+    assert by_file["short.wav"].sentences == 1  # ответ локальной команды
+    assert by_file["long.wav"].sentences == 3  # три предложения заглушки Ollama
+    assert max(server.transcriber.batch_sizes) > 1
+    assert len(stt.threads) == 1  # модель вызывается из одного потока
+    assert set(server.sessions) == {"room-1", "room-2", "room-3"}
+
+
+def test_slow_client_does_not_block_others():
+    """Клиент, медленно читающий ответ, не задерживает остальных."""
+    server = NetworkServer(AppConfig(), FakeSTT(), OllamaClient("stub", host=STUB.url), make_tts())
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(tmp) / "long.wav"]
+        write_wav(files[0], 2.0)
+        results = asyncio.run(serve_and_replay(server, files, clients=2, slow_client=0.5))
+
+    slow = [r for r in results if r.client == "room-slow"]
+    fast = [r for r in results if r.client != "room-slow"]
+    assert slow[0].total_seconds > 1.0
+    assert all(r.total_seconds < slow[0].total_seconds / 2 for r in fast)
+
+
+def test_idle_sessions_are_evicted():
+    """Сессии клиентов без реплик дольше net_session_idle_seconds удаляются с обработчиком."""
+    config = AppConfig(net_session_idle_seconds=60)
+    server = NetworkServer(config, FakeSTT(), OllamaClient("stub", host=STUB.url), make_tts())
+
+    async def scenario(path):
+        await server.start("127.0.0.1", 0)
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            await run_clients(url, [path], clients=2)
+            workers = [session.worker for session in server.sessions.values()]
+            assert server.evict_idle() == []  # простой ещё не истёк
+            evicted = server.evict_idle(now=time.monotonic() + 61)
+            await asyncio.gather(*workers, return_exceptions=True)
+            return evicted, workers
+        finally:
+            await server.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "short.wav"
+        write_wav(path, 0.5)
+        evicted, workers = asyncio.run(scenario(path))
+
+    assert sorted(evicted) == ["room-1", "room-2"]
+    assert server.sessions == {}
+    assert all(worker.cancelled() for worker in workers)
+
+
+if __name__ == "__main__":
+    try:
+        test_clients_share_models_and_stt_is_batched()
+        test_slow_client_does_not_block_others()
+        test_idle_sessions_are_evicted()
+        print("Все тесты пройдены.")
+    finally:
+        STUB.stop()
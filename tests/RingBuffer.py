@@ -0,0 +1,33 @@
+"""Тесты для кольцевого буфера аудио (core/ring_buffer.py)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.ring_buffer import AudioRingBuffer
+
+
+def test_positions_follow_real_time_after_oversized_write():
+    """Запись длиннее буфера сдвигает позицию на всю длину, чтение видит хвост."""
+    buffer = AudioRingBuffer(capacity=8)
+    buffer.write(np.arange(3, dtype=np.int16))
+    buffer.write(np.arange(100, 120, dtype=np.int16))  # 20 отсчётов в буфер на 8
+    assert buffer.total_written == 23
+    assert buffer.oldest == 15
+    assert buffer.read(0, 23).tolist() == list(range(112, 120))
+    assert buffer.read(20, 23).tolist() == [117, 118, 119]
+
+    buffer.write(np.array([7, 8], dtype=np.int16))
+    assert buffer.total_written == 25
+    assert buffer.read(22, 25).tolist() == [119, 7, 8]
+    assert buffer.wait_for(25, timeout=0) and not buffer.wait_for(26, timeout=0)
+
+
+if __name__ == "__main__":
+    test_positions_follow_real_time_after_oversized_write()
+    print("Все тесты пройдены.")
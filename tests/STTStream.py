@@ -0,0 +1,138 @@
+"""Тесты для потокового распознавания."""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.stt_stream import SAMPLE_RATE, StreamingTranscriber
+
+
+class FakeSTT:
+    """Распознаёт «слово» в каждой секунде аудио: номер секунды закодирован амплитудой."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay  # Длительность прохода, с
+        self.calls = 0
+        self.decoded_seconds = 0.0
+
+    def transcribe_segments(self, audio, language="ru", initial_prompt=None, word_timestamps=False):
+        time.sleep(self.delay)
+        self.calls += 1
+        self.decoded_seconds += audio.size / SAMPLE_RATE
+        segments = []
+        for start in range(0, audio.size - SAMPLE_RATE + 1, SAMPLE_RATE):
+            word = int(round(audio[start] * 100))
+            t = start / SAMPLE_RATE
+            segments.append({"text": f"w{word}", "start": t, "end": t + 1.0})
+            if word_timestamps:
+                segments[-1]["words"] = [dict(segments[-1])]
+        return segments
+
+
+class OneSegmentSTT(FakeSTT):
+    """Вся гипотеза — один сегмент, как у Whisper на короткой фразе; последнее слово плавает."""
+
+    def transcribe_segments(self, audio, language="ru", initial_prompt=None, word_timestamps=False):
+        words = super().transcribe_segments(audio, language, initial_prompt, word_timestamps)
+        if not words:
+            return []
+        words[-1] = {**words[-1], "text": words[-1]["text"] + "?"}  # неустойчивый конец
+        segment = {
+            "text": " ".join(word["text"] for word in words),
+            "start": 0.0,
+            "end": words[-1]["end"],
+        }
+        if word_timestamps:
+            segment["words"] = [{k: w[k] for k in ("text", "start", "end")} for w in words]
+        return [segment]
+
+
+def _utterance(seconds: int) -> np.ndarray:
+    return np.repeat(np.arange(seconds, dtype=np.float32) / 100, SAMPLE_RATE)
+
+
+def test_streaming_commits_prefix_and_decodes_only_tail():
+    """Во время речи фиксируется префикс, а после неё декодируется только хвост."""
+    stt = FakeSTT()
+    transcriber = StreamingTranscriber(stt, guard_seconds=1.0)
+    audio = _utterance(8)
+
+    transcriber.begin()
+    for seconds in range(2, 9):
+        transcriber.update(audio[: seconds * SAMPLE_RATE])
+        time.sleep(0.02)  # даём фоновому проходу завершиться
+    text = transcriber.finish(audio)
+
+    assert text == " ".join(f"w{i}" for i in range(8))
+    stats = transcriber.last_stats
+    assert stats.passes > 0
+    assert stats.committed_seconds >= 4.0
+    assert stats.tail_seconds <= 4.0
+
+
+def test_finish_without_updates_decodes_everything():
+    """Без промежуточных обновлений результат совпадает с обычным распознаванием."""
+    transcriber = StreamingTranscriber(FakeSTT())
+    transcriber.begin()
+    assert transcriber.finish(_utterance(3)) == "w0 w1 w2"
+    assert transcriber.last_stats.committed_seconds == 0.0
+
+
+def test_single_segment_commits_word_prefix():
+    """Если фраза — один растущий сегмент, фиксируется совпавший префикс слов."""
+    stt = OneSegmentSTT()
+    transcriber = StreamingTranscriber(stt, guard_seconds=1.0)
+    audio = _utterance(8)
+
+    transcriber.begin()
+    for seconds in range(2, 9):
+        transcriber.update(audio[: seconds * SAMPLE_RATE])
+        time.sleep(0.02)
+    # Хвост докодируется: последнее слово финальной гипотезы — с «?»
+    text = transcriber.finish(np.concatenate([audio, np.full(SAMPLE_RATE, 0.08, np.float32)]))
+
+    assert text == " ".join(f"w{i}" for i in range(9)) + "?"
+    stats = transcriber.last_stats
+    assert stats.committed_seconds >= 4.0
+    assert stats.tail_seconds <= 5.0
+
+
+def test_finish_during_slow_pass():
+    """
+    Проход, который идёт в момент finish, дожидается и учитывается во времени:
+    если его окно покрывает всю речь, хвост не декодируется повторно.
+    """
+    audio = _utterance(4)
+
+    stt = FakeSTT(delay=0.3)
+    transcriber = StreamingTranscriber(stt)
+    transcriber.begin()
+    transcriber.update(audio)
+    time.sleep(0.05)  # проход начался
+    assert transcriber.finish(audio, speech_seconds=4.0) == "w0 w1 w2 w3"
+    stats = transcriber.last_stats
+    assert stt.calls == 1 and stats.tail_seconds == 0.0
+    assert stats.final_seconds >= 0.2
+
+    # Окно прохода короче речи: хвост докодируется после прохода
+    stt = FakeSTT(delay=0.3)
+    transcriber = StreamingTranscriber(stt)
+    transcriber.begin()
+    transcriber.update(audio[: 2 * SAMPLE_RATE])
+    time.sleep(0.05)
+    assert transcriber.finish(audio, speech_seconds=4.0) == "w0 w1 w2 w3"
+    assert stt.calls == 2 and transcriber.last_stats.final_seconds >= 0.5
+
+
+if __name__ == "__main__":
+    test_streaming_commits_prefix_and_decodes_only_tail()
+    test_finish_without_updates_decodes_everything()
+    test_single_segment_commits_word_prefix()
+    test_finish_during_slow_pass()
+    print("Все тесты пройдены.")
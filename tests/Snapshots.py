@@ -0,0 +1,70 @@
+"""Тесты для каталога снимков моделей (src/snapshots.py)."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.snapshots import SnapshotStore
+
+KEY = {"source": "model-v1", "torch": "2.4.0"}
+
+
+def write_weights(path):
+    path.write_bytes(b"weights" * 1000)
+
+
+def read_weights(path):
+    return path.read_bytes()
+
+
+def test_snapshot_is_reused_until_key_changes():
+    """Сохранённый снимок загружается тёплым стартом; другой ключ — устаревший снимок."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(Path(tmp) / "snapshots")
+        assert store.load("model", KEY, read_weights) is None  # снимка ещё нет
+        store.save("model", KEY, write_weights, cold_seconds=5.0)
+        assert store.report["model"] == {"mode": "cold", "seconds": 5.0, "saved": True}
+
+        store = SnapshotStore(Path(tmp) / "snapshots")
+        assert store.load("model", KEY, read_weights) == b"weights" * 1000
+        assert store.report["model"]["mode"] == "warm"
+        assert store.report["model"]["cold_seconds"] == 5.0
+        assert "тёплый старт" in store.summary_lines()[0]
+
+        assert store.load("model", {**KEY, "torch": "2.5.0"}, read_weights) is None
+        assert not list(Path(tmp, "snapshots").glob("*.tmp"))
+
+
+def test_corrupted_or_unloadable_snapshot_falls_back():
+    """Подменённый файл не проходит проверку суммы; сбой загрузчика — тоже холодный путь."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(tmp)
+        store.save("model", KEY, write_weights, cold_seconds=1.0)
+        data = Path(tmp) / "model.bin"
+
+        # Тот же размер, другое содержимое и время изменения
+        data.write_bytes(b"WEIGHTS" * 1000)
+        stat = data.stat()
+        os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert store.load("model", KEY, read_weights) is None
+
+        # Файл только «тронут»: сумма совпадает, снимок принимается и время обновляется
+        write_weights(data)
+        os.utime(data, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+        assert store.load("model", KEY, read_weights) is not None
+
+        def broken(path):
+            raise RuntimeError("несовместимый формат")
+
+        assert store.load("model", KEY, broken) is None
+
+
+if __name__ == "__main__":
+    test_snapshot_is_reused_until_key_changes()
+    test_corrupted_or_unloadable_snapshot_falls_back()
+    print("Все тесты пройдены.")
@@ -0,0 +1,70 @@
+"""Тесты для проверки «речь или нет» перед Whisper (core/speech_gate.py)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.speech_gate import SpeechGate
+
+SR = 16000
+RNG = np.random.default_rng(0)
+
+
+def with_background(x, level=0.002):
+    """Добавляет тихий фон и паузы до и после, как у фразы из VoiceRecorder."""
+    pause = np.zeros(int(SR * 0.3))
+    x = np.concatenate([pause, x, pause])
+    return (x + RNG.normal(0, level, x.size)).astype(np.float32)
+
+
+def voice(seconds=1.5):
+    """Гармонический сигнал с плавающим основным тоном и слогами 4 Гц."""
+    t = np.arange(int(SR * seconds)) / SR
+    phase = 2 * np.pi * np.cumsum(130 + 20 * np.sin(2 * np.pi * 1.3 * t)) / SR
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    return with_background(0.2 * harmonics * syllables)
+
+
+def door_slam():
+    n = int(SR * 0.4)
+    return with_background(RNG.normal(0, 0.5, n) * np.exp(-np.arange(n) / 800))
+
+
+def beep(seconds=3.0):
+    t = np.arange(int(SR * seconds)) / SR
+    return with_background(0.2 * sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 6)))
+
+
+def test_speech_passes_and_noise_is_rejected():
+    gate = SpeechGate()
+    assert gate.check(voice()).passed
+    assert not gate.check(door_slam()).passed
+    assert gate.check(RNG.normal(0, 0.1, SR * 2).astype(np.float32)).reason == "noise"
+    assert gate.check(beep()).reason == "tone"
+    assert gate.check(voice(seconds=0.1)).reason == "short"
+
+    decision = gate.check(voice(seconds=5.0))
+    assert decision.passed and decision.elapsed_ms < 50.0  # дешевле любого прохода Whisper
+
+
+def test_counters_and_saved_stt_time():
+    gate = SpeechGate()
+    gate.check(RNG.normal(0, 0.1, SR * 2).astype(np.float32))
+    assert gate.stats.rejected == {"noise": 1}
+    assert gate.stats.saved_stt_seconds == 0.0  # время Whisper ещё не измерено
+
+    gate.record_stt(audio_seconds=2.0, stt_seconds=1.0)
+    assert abs(gate.stats.saved_stt_seconds - gate.stats.rejected_audio_seconds * 0.5) < 1e-9
+    assert "отклонено 1 из 1" in gate.summary() and "сэкономлено" in gate.summary()
+
+
+if __name__ == "__main__":
+    test_speech_passes_and_noise_is_rejected()
+    test_counters_and_saved_stt_time()
+    print("Все тесты пройдены.")
@@ -0,0 +1,122 @@
+"""Тесты для пакетного синтеза Silero (src/tts_batch.py) на модели-заглушке."""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.async_runtime import text_sentences
+from src.tts import SileroTTS
+from src.tts_batch import build_ssml, group_chunks, split_on_breaks
+from src.tts_cache import TTSCache
+
+SR = 24000
+
+
+def speech(text, sample_rate=SR):
+    """«Речь»: тон по 40 мс на символ с короткими паузами на запятых, как у Silero."""
+    parts = []
+    for word_group in text.split(","):
+        t = np.arange(int(sample_rate * 0.04 * len(word_group))) / sample_rate
+        parts.append(0.5 * np.sin(2 * np.pi * 200 * t))
+        parts.append(np.zeros(int(sample_rate * 0.25)))
+    return np.concatenate(parts[:-1]).astype(np.float32)
+
+
+class FakeSilero:
+    """apply_tts как у Silero: text или ssml_text с <s> и <break>."""
+
+    def __init__(self):
+        self.calls = []
+
+    def apply_tts(self, text=None, ssml_text=None, speaker=None, sample_rate=SR):
+        self.calls.append(ssml_text or text)
+        if text is not None:
+            return speech(text, sample_rate)
+        parts = re.split(r'<break time="(\d+)ms"/>', ssml_text)
+        audio = []
+        for idx, part in enumerate(parts):
+            if idx % 2:
+                audio.append(np.zeros(int(sample_rate * int(part) / 1000)))
+            else:
+                audio.append(speech(re.sub(r"<[^>]+>", "", part), sample_rate))
+        return np.concatenate(audio).astype(np.float32)
+
+
+def make_tts(batch_chars=600):
+    return SileroTTS(
+        sample_rate=SR, device="cpu", cache=TTSCache(), batch_chars=batch_chars, model=FakeSilero()
+    )
+
+
+def test_grouping_ssml_and_split():
+    chunks = ["Первое.", "Второе, с запятой.", "x" * 50, "Четвёртое."]
+    assert group_chunks(chunks, max_chars=30) == [[0, 1], [2], [3]]
+    assert group_chunks(chunks, max_chars=1000, max_items=3) == [[0, 1, 2], [3]]
+    assert "&lt;b&gt;" in build_ssml(["<b>", "ok"]) and build_ssml(["a", "b"]).count("<break") == 1
+
+    audio = FakeSilero().apply_tts(ssml_text=build_ssml(chunks[:3]))
+    pieces = split_on_breaks(audio, 3, SR)
+    assert pieces is not None and len(pieces) == 3
+    for piece, chunk in zip(pieces, chunks[:3]):
+        # Длительность куска совпадает с отдельным синтезом с точностью до краёв
+        assert abs(piece.size - speech(chunk).size) < SR * 0.15
+    assert split_on_breaks(audio, 4, SR) is None  # пауз меньше, чем нужно
+
+
+def test_synthesize_many_uses_one_call_and_cache():
+    tts = make_tts()
+    chunks = ["Первое предложение.", "Второе, с паузой внутри.", "Третье."]
+    batched = tts.synthesize_many(chunks)
+    assert len(tts.model.calls) == 1 and tts.model.calls[0].startswith("<speak>")
+
+    single = make_tts(batch_chars=0)
+    separate = single.synthesize_many(chunks)
+    assert len(single.model.calls) == 3
+    for a, b in zip(batched, separate):
+        assert abs(a.size - b.size) < SR * 0.15
+        assert abs(np.abs(a).max() - 0.98) < 1e-3  # та же нормализация пика
+
+    # Повтор берётся из кэша, новый кусок синтезируется отдельным вызовом
+    tts.synthesize_many(chunks + ["Четвёртое."])
+    assert tts.model.calls[1:] == ["Четвёртое."]
+    assert tts.cache.stats.misses == 4 and tts.cache.stats.hits == 3
+
+
+def test_unsplit_batch_counts_each_miss_once():
+    """Если пакет не разделился, куски синтезируются по одному без повторного промаха."""
+    tts = make_tts()
+    tts._synthesize_batch = lambda chunks: None
+    chunks = ["Первое предложение.", "Второе предложение."]
+    tts.synthesize_many(chunks)
+    assert tts.model.calls == chunks
+    assert tts.cache.stats.misses == 2
+    tts.synthesize_many(chunks)
+    assert tts.cache.stats.hits == 2 and len(tts.model.calls) == 2
+
+
+def test_answer_is_batched_across_sentences():
+    """Ответ из нескольких коротких предложений: первый кусок отдельно, остальные одним пакетом."""
+    tts = make_tts()
+    played = []
+    tts.play_audio = lambda audio, cancel=None, gap_seconds=0.0: played.append(audio.size) or True
+    answer = "Кит — млекопитающее. Он дышит воздухом. Детёнышей кормит молоком. Живёт долго."
+    spoken = asyncio.run(tts.speak_async(text_sentences(answer), gap_seconds=0.0))
+    assert spoken == answer and len(played) == 4
+    assert len(tts.model.calls) == 2 < len(played)
+    assert tts.model.calls[1].startswith("<speak>")
+    assert tts.last_stats.sentences == 4
+
+
+if __name__ == "__main__":
+    test_grouping_ssml_and_split()
+    test_synthesize_many_uses_one_call_and_cache()
+    test_unsplit_batch_counts_each_miss_once()
+    test_answer_is_batched_across_sentences()
+    print("Все тесты пройдены.")
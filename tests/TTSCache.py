@@ -0,0 +1,55 @@
+"""Тесты для кэша аудио TTS."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.tts_cache import TTSCache
+
+
+def test_key_depends_on_voice_and_ignores_spacing():
+    """Ключ не зависит от пробелов, но различает голос и частоту."""
+    key = TTSCache.make_key("Готово.", "kseniya", 48000, "v5_ru")
+    assert key == TTSCache.make_key("  Готово. ", "kseniya", 48000, "v5_ru")
+    assert key != TTSCache.make_key("Готово.", "aidar", 48000, "v5_ru")
+    assert key != TTSCache.make_key("Готово.", "kseniya", 24000, "v5_ru")
+
+
+def test_lru_respects_byte_budget():
+    """При превышении бюджета вытесняется давно не использованная запись."""
+    audio = np.zeros(1000, dtype=np.float32)  # 4000 байт
+    cache = TTSCache(max_bytes=10_000)
+    cache.put("a", audio)
+    cache.put("b", audio)
+    assert cache.get("a") is not None  # "a" становится самой свежей
+    cache.put("c", audio)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.memory_bytes <= 10_000
+    assert cache.stats.misses == 1
+
+
+def test_disk_store_survives_restart():
+    """Аудио с диска доступно новому экземпляру кэша."""
+    audio = np.linspace(-0.5, 0.5, 480, dtype=np.float32)
+    with tempfile.TemporaryDirectory() as tmp:
+        TTSCache(disk_dir=tmp).put("key", audio)
+        restored = TTSCache(disk_dir=tmp)
+        loaded = restored.get("key")
+
+    assert loaded is not None and loaded.dtype == np.float32
+    assert np.allclose(loaded, audio, atol=1e-3)
+    assert restored.stats.disk_hits == 1
+
+
+if __name__ == "__main__":
+    test_key_depends_on_voice_and_ignores_spacing()
+    test_lru_respects_byte_budget()
+    test_disk_store_survives_restart()
@@ -0,0 +1,57 @@
+"""Тесты для подготовки текста к синтезу (src/text_prep.py)."""
+
+import sys
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.text_prep import TextPreparer, chunk_sentence, normalize_text, spell_number
+
+
+def test_long_sentence_is_cut_at_clause_boundaries():
+    """Куски не длиннее бюджета и режутся по «;», запятым и союзам, а не посреди слов."""
+    sentence = (
+        "Рост замедлился в третьем квартале; однако выручка выросла, потому что "
+        "компания снизила издержки, пересмотрела договоры с поставщиками "
+        "и перенесла часть производства в регионы с дешёвой энергией."
+    )
+    chunks = chunk_sentence(sentence, 60)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks) == sentence
+    assert chunks[0] == "Рост замедлился в третьем квартале;"
+    assert chunk_sentence("Короткое предложение.", 60) == ["Короткое предложение."]
+
+
+def test_markdown_numbers_and_units_are_spoken():
+    """Разметка, числа, единицы и сокращения превращаются в произносимый текст."""
+    text = normalize_text("## План\n- **Встреча** в 14:30, т.е. скоро\n- Бюджет $250 и 1 500 руб.")
+    assert text == (
+        "План. Встреча в четырнадцать тридцать, то есть скоро. "
+        "Бюджет двести пятьдесят долларов и одна тысяча пятьсот рублей."
+    )
+    assert normalize_text("Рост на 2,5% за [год](https://x.ru) 😀") == (
+        "Рост на две целых пять десятых процента за год."
+    )
+
+    preparer = TextPreparer(max_chars=150)
+    assert preparer.prepare("```python\nprint(1)\n```") == []
+    assert preparer.prepare("Скидка 21 %. Доставка 3 км.") == [
+        "Скидка двадцать один процент.",
+        "Доставка три километра.",
+    ]
+
+
+def test_spell_number():
+    assert spell_number(2025) == "две тысячи двадцать пять"
+    assert spell_number(1_001_001) == "один миллион одна тысяча один"
+    assert spell_number(12, feminine=True) == "двенадцать"
+    assert spell_number(-40) == "минус сорок"
+
+
+if __name__ == "__main__":
+    test_long_sentence_is_cut_at_clause_boundaries()
+    test_markdown_numbers_and_units_are_spoken()
+    test_spell_number()
+    print("Все тесты пройдены.")
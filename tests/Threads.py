@@ -0,0 +1,111 @@
+"""Тесты для бюджета потоков CPU (src/threads.py)."""
+
+import sys
+import threading
+import types
+from pathlib import Path
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import AppConfig
+from src.threads import ThreadBudget
+
+
+class FakeTorch(types.ModuleType):
+    """Число потоков хранится отдельно для каждого потока, как в сборках с OpenMP."""
+
+    def __init__(self):
+        super().__init__("torch")
+        self._local = threading.local()
+        self.calls = 0
+
+    def get_num_threads(self):
+        return getattr(self._local, "threads", 8)
+
+    def set_num_threads(self, count):
+        self.calls += 1
+        self._local.threads = count
+
+
+def with_fake_torch(test):
+    def wrapper():
+        saved = sys.modules.get("torch")
+        sys.modules["torch"] = FakeTorch()
+        try:
+            test(sys.modules["torch"])
+        finally:
+            if saved is None:
+                del sys.modules["torch"]
+            else:
+                sys.modules["torch"] = saved
+
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+def test_plan_leaves_audio_cores_and_does_not_oversubscribe():
+    """Ядра звука не отдаются моделям, STT и TTS вместе укладываются в остальные."""
+    budget = ThreadBudget(cores=list(range(8)), audio_cores=1)
+    assert budget.plan["stt"].threads + budget.plan["tts"].threads == 7
+    assert budget.plan["stt"].threads >= budget.plan["tts"].threads
+    assert budget.plan["audio"].threads is None
+
+    budget = ThreadBudget(cores=list(range(8)), tts_threads=2, pin=True)
+    stt, tts, audio = (budget.plan[name].cores for name in ("stt", "tts", "audio"))
+    assert budget.plan["stt"].threads == 5
+    if budget.pin:  # Привязка есть только там, где есть sched_setaffinity
+        assert audio == {7}
+        assert len(stt) == 5 and len(tts) == 2
+        assert not (stt & tts) and not ((stt | tts) & audio)
+
+    config = AppConfig(cpu_stt_threads=3, cpu_tts_threads=2, cpu_audio_cores=2)
+    budget = ThreadBudget.from_config(config)
+    assert (budget.plan["stt"].threads, budget.plan["tts"].threads) == (3, 2)
+
+
+@with_fake_torch
+def test_stage_switches_threads_and_restores(torch):
+    """Этап выставляет свои потоки на время вызова и возвращает прежние."""
+    budget = ThreadBudget(stt_threads=4, tts_threads=2, cores=list(range(8)))
+    with budget.stage("stt"):
+        assert torch.get_num_threads() == 4
+        with budget.stage("tts"):
+            assert torch.get_num_threads() == 2
+        assert torch.get_num_threads() == 4
+    assert torch.get_num_threads() == 8
+
+    # Повторный вход в тот же этап не дёргает torch лишний раз
+    budget.bind("stt")
+    calls = torch.calls
+    with budget.stage("stt"):
+        pass
+    assert torch.calls == calls
+
+
+@with_fake_torch
+def test_concurrent_stages_keep_their_own_budget(torch):
+    """STT и TTS в разных потоках одновременно работают каждый со своим числом потоков."""
+    budget = ThreadBudget(stt_threads=5, tts_threads=2, cores=list(range(8)))
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    def run(stage):
+        with budget.stage(stage):
+            barrier.wait()
+            seen[stage] = torch.get_num_threads()
+
+    workers = [threading.Thread(target=run, args=(stage,)) for stage in ("stt", "tts")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert seen == {"stt": 5, "tts": 2}
+
+
+if __name__ == "__main__":
+    test_plan_leaves_audio_cores_and_does_not_oversubscribe()
+    test_stage_switches_threads_and_restores()
+    test_concurrent_stages_keep_their_own_budget()
+    print("Все тесты пройдены.")
@@ -0,0 +1,72 @@
+"""Тесты для детекторов голосовой активности."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Добавляем корневую директорию проекта в путь
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from core.vad import AdaptiveVAD, EnergyVAD, create_vad
+
+SAMPLE_RATE = 16000
+
+
+def _noise(seconds: float, level: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(SAMPLE_RATE * seconds)) * level * 32768).astype(np.int16)
+
+
+def _voice(seconds: float, level: float) -> np.ndarray:
+    """Грубая имитация гласного звука: основной тон с гармониками."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    return (wave / np.max(np.abs(wave)) * level * 32768).astype(np.int16)
+
+
+def _feed(vad, samples: np.ndarray, chunk: int = 1024) -> np.ndarray:
+    return np.concatenate([vad.process(samples[i : i + chunk]) for i in range(0, samples.size, chunk)])
+
+
+def test_adaptive_vad_ignores_steady_noise():
+    """Постоянный фон (вентилятор) не должен вызывать срабатываний."""
+    vad = AdaptiveVAD(SAMPLE_RATE)
+    decisions = _feed(vad, _noise(5.0, 0.05))
+    assert not decisions.any(), "VAD сработал на постоянном шуме"
+
+
+def test_adaptive_vad_detects_quiet_voice_over_noise():
+    """Тихая речь над фоном должна определяться, а после неё — отпускаться."""
+    vad = AdaptiveVAD(SAMPLE_RATE, hangover_ms=100)
+    noise = _noise(4.0, 0.005)
+    voice = _voice(1.0, 0.05) + noise[: SAMPLE_RATE]
+    decisions = _feed(vad, np.concatenate([noise[:-SAMPLE_RATE], voice, _noise(1.0, 0.005, 1)]))
+    frames_per_second = 1000 // 20
+    assert decisions[3 * frames_per_second + 10 : 4 * frames_per_second].all()
+    assert not decisions[-frames_per_second // 2 :].any()
+
+
+def test_onset_rejects_short_click():
+    """Щелчок короче onset_ms не должен включать VAD."""
+    vad = AdaptiveVAD(SAMPLE_RATE, onset_ms=60)
+    silence = _noise(1.0, 0.001)
+    click = _voice(0.02, 0.5)
+    decisions = _feed(vad, np.concatenate([silence, click, silence]))
+    assert not decisions.any()
+
+
+def test_energy_vad_matches_fixed_threshold():
+    """VAD 'energy' повторяет прежнее поведение с фиксированным порогом RMS."""
+    vad = create_vad("energy", SAMPLE_RATE, threshold=900, onset_ms=20, hangover_ms=0)
+    assert isinstance(vad, EnergyVAD)
+    assert not vad.is_speech(_noise(0.1, 0.01))
+    assert vad.is_speech(_voice(0.1, 0.2))
+
+
+if __name__ == "__main__":
+    test_adaptive_vad_ignores_steady_noise()
+    test_adaptive_vad_detects_quiet_voice_over_noise()
+    test_onset_rejects_short_click()
+    test_energy_vad_matches_fixed_threshold()